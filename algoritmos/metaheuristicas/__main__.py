@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Os módulos deste diretório se importam pelo nome (ex: `from utils import ...`),
+# como quando cada script é executado diretamente.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cli import main  # noqa: E402
+
+main()
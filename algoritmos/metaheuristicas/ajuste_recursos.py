@@ -0,0 +1,151 @@
+import json
+import os
+import random
+import socket
+import time
+
+from avaliacao import avaliar_lote, encerrar_executor, iniciar_executor
+from redeneural import calcular_fitness_rmse
+from solucao_inicial import DIRETORIO, solucao_inicial_genetico
+
+# Arquivo onde a melhor divisão workers x threads é guardada para as próximas execuções
+ARQUIVO_AJUSTE = os.path.join(DIRETORIO, "ajuste_recursos.json")
+
+
+def num_cpus_disponiveis():
+    """CPUs que este processo pode usar (respeita cgroups/taskset no Linux)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def divisoes_candidatas(num_cpus):
+    """
+    Divisões (workers, threads_blas) que ocupam até `num_cpus` núcleos.
+
+    Vão de um worker com todas as threads até um worker por núcleo com uma
+    thread cada, passando pelas potências de 2 intermediárias.
+    """
+    divisoes = []
+    workers = 1
+    while workers <= num_cpus:
+        divisoes.append((workers, max(1, num_cpus // workers)))
+        workers *= 2
+    if divisoes[-1][0] != num_cpus:
+        divisoes.append((num_cpus, 1))
+    return divisoes
+
+
+def arquiteturas_representativas(definicoes_hp, num_amostras=8, semente=0):
+    """
+    Amostra de indivíduos do espaço de busca usada no ajuste.
+
+    É sorteada com uma semente própria, sem alterar o estado do gerador global
+    (que os otimizadores usam depois).
+    """
+    estado = random.getstate()
+    random.seed(semente)
+    try:
+        return solucao_inicial_genetico(definicoes_hp, num_amostras)
+    finally:
+        random.setstate(estado)
+
+
+def medir_divisao(workers, threads_blas, individuos, funcao_fitness=calcular_fitness_rmse, **opcoes):
+    """
+    Avaliações por segundo de uma divisão workers x threads sobre `individuos`.
+
+    Um primeiro lote (um indivíduo por worker) aquece o pool (criação dos
+    processos e importação do scikit-learn) e não entra na medição.
+    """
+    executor, limite_threads = iniciar_executor(workers, threads_blas)
+    try:
+        avaliar_lote(individuos[:max(1, workers)], funcao_fitness, executor, **opcoes)
+        inicio = time.perf_counter()
+        avaliar_lote(individuos, funcao_fitness, executor, **opcoes)
+        return len(individuos) / (time.perf_counter() - inicio)
+    finally:
+        encerrar_executor(executor, limite_threads)
+
+
+def ajustar_recursos(definicoes_hp, funcao_fitness=calcular_fitness_rmse, num_cpus=None, num_amostras=8,
+                     fidelidade=0.2, caminho=ARQUIVO_AJUSTE):
+    """
+    Escolhe por medição a divisão da CPU entre workers e threads BLAS.
+
+    Cada divisão de `divisoes_candidatas` avalia a mesma amostra de
+    arquiteturas do espaço de busca com uma fração `fidelidade` das épocas
+    (o bastante para comparar a vazão, sem o custo de uma execução). A
+    divisão com mais avaliações por segundo é gravada em `caminho`, junto com
+    todas as medições, e reaproveitada por `carregar_ajuste`.
+
+    Args:
+        definicoes_hp (dict): Espaço de busca de onde vêm as arquiteturas.
+        funcao_fitness (callable): Função de fitness medida (aceita `fidelidade`).
+        num_cpus (int): Núcleos a dividir (padrão: os disponíveis ao processo).
+        num_amostras (int): Indivíduos avaliados em cada divisão (no mínimo 2 por worker).
+        fidelidade (float): Fração das épocas usada nas avaliações de teste.
+        caminho (str): Arquivo JSON onde o resultado é gravado (None = não grava).
+
+    Returns:
+        tuple: (workers, threads_blas) da divisão mais rápida.
+    """
+    num_cpus = num_cpus or num_cpus_disponiveis()
+    divisoes = divisoes_candidatas(num_cpus)
+    maximo_workers = max(workers for workers, _ in divisoes)
+    individuos = arquiteturas_representativas(definicoes_hp, max(num_amostras, 2 * maximo_workers))
+
+    medicoes = []
+    for workers, threads_blas in divisoes:
+        vazao = medir_divisao(workers, threads_blas, individuos, funcao_fitness, fidelidade=fidelidade)
+        medicoes.append({"workers": workers, "threads_blas": threads_blas, "avaliacoes_por_segundo": vazao})
+        print(f"Workers: {workers:3d} | Threads BLAS: {threads_blas:3d} | {vazao:.2f} avaliações/s")
+
+    melhor = max(medicoes, key=lambda medicao: medicao["avaliacoes_por_segundo"])
+    print(f"Melhor divisão: {melhor['workers']} workers x {melhor['threads_blas']} threads BLAS")
+
+    if caminho is not None:
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump({
+                "maquina": socket.gethostname(),
+                "num_cpus": num_cpus,
+                "workers": melhor["workers"],
+                "threads_blas": melhor["threads_blas"],
+                "medicoes": medicoes,
+            }, f, ensure_ascii=False, indent=4)
+    return melhor["workers"], melhor["threads_blas"]
+
+
+def carregar_ajuste(caminho=ARQUIVO_AJUSTE):
+    """
+    Lê um ajuste gravado por `ajustar_recursos`.
+
+    Returns:
+        tuple | None: (workers, threads_blas), ou None se o arquivo não existe
+        ou foi gerado em outra máquina ou com outro número de núcleos.
+    """
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            ajuste = json.load(f)
+    except FileNotFoundError:
+        return None
+    if ajuste.get("maquina") != socket.gethostname() or ajuste.get("num_cpus") != num_cpus_disponiveis():
+        return None
+    return ajuste["workers"], ajuste["threads_blas"]
+
+
+def configuracao_recursos(definicoes_hp, caminho=ARQUIVO_AJUSTE, **opcoes_ajuste):
+    """Ajuste gravado para esta máquina ou, se não houver, um ajuste novo."""
+    ajuste = carregar_ajuste(caminho)
+    if ajuste is not None:
+        print(f"Usando ajuste gravado em '{caminho}': {ajuste[0]} workers x {ajuste[1]} threads BLAS")
+        return ajuste
+    return ajustar_recursos(definicoes_hp, caminho=caminho, **opcoes_ajuste)
+
+
+if __name__ == '__main__':
+    from redeneural import definicoes_hiperparametros
+
+    print("############################ AJUSTE WORKERS x THREADS BLAS ##############################")
+    workers, threads_blas = ajustar_recursos(definicoes_hiperparametros)
+    print(f"-> Use workers={workers} e threads_blas={threads_blas} no algoritmo_genetico/tempera_simulada")
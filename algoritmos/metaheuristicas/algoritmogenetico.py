@@ -1,10 +1,25 @@
 import json
+import math
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import instrumentacao
+from avaliacao import avaliar_lote, encerrar_executor, iniciar_executor, submeter
+from cache_fitness import FitnessComCache
+from checkpoint import carregar_checkpoint, estado_geradores, restaurar_geradores, salvar_checkpoint
+from orcamento import diversidade_populacao
 from redeneural import calcular_fitness_rmse
-from solucao_inicial import solucao_inicial_genetico
-from utils import calcular_fitness, cruzamento, mutacao, selecao_torneio, seleciona_melhores
+from sementes import FLUXO_ESTADO_ESTACIONARIO, FLUXO_GENETICO, FluxosAleatorios, semear_fitness
+from solucao_inicial import ARQUIVO_POPULACAO, solucao_inicial_genetico
+from utils import cruzamento, mutacao, selecao_torneio, seleciona_melhores
 
 
-def algoritmo_genetico(populacao_inicial, tamanho_populacao, num_geracoes, pm, definicoes_hp):
+def algoritmo_genetico(populacao_inicial, tamanho_populacao, num_geracoes, pm, definicoes_hp,
+                       funcao_fitness=calcular_fitness_rmse, workers=1, multifidelidade=None,
+                       poda=False, substituto=None, caminho_checkpoint=None,
+                       intervalo_checkpoint=1, estado_checkpoint=None, orcamento=None, threads_blas=None,
+                       semente=None):
     """
     Executa o algoritmo genético conforme o pseudocódigo.
     
@@ -14,47 +29,207 @@ def algoritmo_genetico(populacao_inicial, tamanho_populacao, num_geracoes, pm, d
         num_geracoes (int): Número de gerações.
         pm (float): Probabilidade de mutação.
         definicoes_hp (dict): Definições dos hiperparâmetros para a mutação.
+        funcao_fitness (callable): Função que recebe um indivíduo e retorna o RMSE
+            (ex: `calcular_fitness_rmse` ou uma `FitnessComCache`).
+        workers (int): Número de processos usados para avaliar cada lote de
+            indivíduos. Com 1 a avaliação é serial; o resultado é o mesmo.
+        multifidelidade (SuccessiveHalving | Hyperband): Se informado, os filhos de
+            cada geração passam por triagem com poucas épocas e só os promissores
+            são treinados com a fidelidade total; os descartados na triagem não
+            entram na seleção dos sobreviventes.
+        poda (bool): Se True, o treino de cada filho é abortado assim que ele
+            claramente não consegue superar o pior indivíduo da população atual,
+            pois nesse caso ele seria descartado por `seleciona_melhores`.
+        substituto (ModeloSubstituto): Se informado, cada geração gera mais filhos
+            do que o necessário e só os mais promissores segundo o modelo
+            substituto são treinados de verdade.
+        caminho_checkpoint (str): Se informado, o estado da execução (população com
+            fitness, geração, estado dos geradores aleatórios, do orçamento e do
+            substituto) é gravado nesse arquivo a cada `intervalo_checkpoint` gerações.
+        intervalo_checkpoint (int): Gerações entre dois checkpoints.
+        estado_checkpoint (dict): Estado lido de um checkpoint, para continuar a
+            execução (ver `retomar_algoritmo_genetico`).
+        orcamento (Orcamento): Se informado, a execução para antes de
+            `num_geracoes` quando o orçamento de tempo/avaliações se esgota, o
+            RMSE alvo é atingido ou a população estagna/perde diversidade. Na
+            última geração, só são avaliados os filhos que cabem no orçamento.
+            Contam os treinos executados: não os acertos da cache, e os filhos
+            descartados pela multi-fidelidade só pela fração treinada.
+        threads_blas (int): Threads BLAS de cada worker (ver `avaliacao.criar_executor`).
+        semente (int): Se informada, cada filho da geração g é gerado com o
+            fluxo aleatório (g, índice do filho) de `sementes.FluxosAleatorios`,
+            e cada avaliação recebe uma semente derivada do fenótipo
+            (`sementes.FitnessSemeada`). A execução então dá o mesmo resultado
+            em modo serial, com `workers`, com cache ou com o broker. Sem
+            semente, os operadores usam o gerador global `random`.
 
     Returns:
         dict: O melhor indivíduo encontrado após todas as gerações.
     """
-    # avaliar população inicial
-    populacao = []
-    for individuo_sem_fitness in populacao_inicial:
-
-        fitness = calcular_fitness_rmse(individuo_sem_fitness)
-        individuo_com_fitness = individuo_sem_fitness.copy()
-        individuo_com_fitness['fitness'] = fitness
-        populacao.append(individuo_com_fitness)
-
-    for geracao in range(num_geracoes):
-        #2.Pnew ← ∅
-        populacao_nova = []
-        
-        # 3.while |Pnew| < N do
-        while len(populacao_nova) < tamanho_populacao:
-            # 4. pai1, pai2 ← SelecaoTorneio(P)
-            pai1 = selecao_torneio(populacao)
-            pai2 = selecao_torneio(populacao)
+    def salvar(proxima_geracao):
+        salvar_checkpoint(caminho_checkpoint, {
+            "algoritmo": "genetico",
+            "populacao": populacao,
+            "geracao": proxima_geracao,
+            "tamanho_populacao": tamanho_populacao,
+            "num_geracoes": num_geracoes,
+            "pm": pm,
+            "semente": semente,
+            "geradores": estado_geradores(),
+            "orcamento": None if orcamento is None else orcamento.estado(),
+            "substituto": None if substituto is None else substituto.estado(),
+        })
+
+    fluxos = None
+    if semente is not None:
+        fluxos = FluxosAleatorios(semente)
+        funcao_fitness = semear_fitness(funcao_fitness, semente)
+
+    if orcamento is not None:
+        orcamento.iniciar()
+        orcamento.acompanhar(funcao_fitness)
+    motivo_parada = None
+
+    executor, limite_threads = iniciar_executor(workers, threads_blas)
+    try:
+        if estado_checkpoint is None:
+            # avaliar população inicial
+            fitness_iniciais = avaliar_lote(populacao_inicial, funcao_fitness, executor)
+            if orcamento is not None:
+                orcamento.contar(len(populacao_inicial))
+            populacao = []
+            for individuo_sem_fitness, fitness in zip(populacao_inicial, fitness_iniciais):
+                individuo_com_fitness = individuo_sem_fitness.copy()
+                individuo_com_fitness['fitness'] = fitness
+                populacao.append(individuo_com_fitness)
+            geracao_inicial = 0
+            if caminho_checkpoint is not None:
+                salvar(geracao_inicial)
+        else:
+            # continua exatamente de onde o checkpoint parou
+            populacao = estado_checkpoint["populacao"]
+            geracao_inicial = estado_checkpoint["geracao"]
+            restaurar_geradores(estado_checkpoint["geradores"])
+            print(f"Retomando da geração {geracao_inicial + 1}/{num_geracoes}")
+
+        # o substituto e o orçamento continuam do estado gravado, se houver
+        estado_substituto = None if estado_checkpoint is None else estado_checkpoint.get("substituto")
+        estado_orcamento = None if estado_checkpoint is None else estado_checkpoint.get("orcamento")
+        if substituto is not None:
+            if estado_substituto is not None:
+                substituto.restaurar(estado_substituto)
+            else:
+                substituto.registrar(populacao, [individuo['fitness'] for individuo in populacao])
+        if orcamento is not None:
+            if estado_orcamento is not None:
+                orcamento.restaurar(estado_orcamento)
+            else:
+                orcamento.atualizar(min(individuo['fitness'] for individuo in populacao))
+            motivo_parada = orcamento.esgotado()
+
+        for geracao in range(geracao_inicial, num_geracoes):
+            if motivo_parada is not None:
+                break
+            inicio_geracao = time.perf_counter()
+
+            #2.Pnew ← ∅
+            populacao_nova = []
+
+            # com o substituto, geramos mais filhos e filtramos antes de treinar
+            usar_substituto = substituto is not None and substituto.pronto()
+            num_filhos = tamanho_populacao
+            if usar_substituto:
+                num_filhos = tamanho_populacao * substituto.fator_sobregeracao
             
-            filho = cruzamento(pai1, pai2)
-            filho = mutacao(filho, pm, definicoes_hp)
+            # 3.while |Pnew| < N do
+            # Os filhos são todos gerados antes e avaliados em lote, o que permite
+            # treinar as redes em paralelo sem alterar a sequência de sorteios.
+            while len(populacao_nova) < num_filhos:
+                rng = random if fluxos is None else fluxos.gerador(FLUXO_GENETICO, geracao, len(populacao_nova))
+
+                # 4. pai1, pai2 ← SelecaoTorneio(P)
+                pai1 = selecao_torneio(populacao, rng=rng)
+                pai2 = selecao_torneio(populacao, rng=rng)
+                
+                filho = cruzamento(pai1, pai2, rng)
+                filho = mutacao(filho, pm, definicoes_hp, rng)
+                
+                # 7. adicione filho a Pnew
+                populacao_nova.append(filho)
+            # 8. end
+
+            if usar_substituto:
+                populacao_nova = substituto.selecionar(populacao_nova, tamanho_populacao)
+            if orcamento is not None and orcamento.avaliacoes_restantes() is not None:
+                populacao_nova = populacao_nova[:orcamento.avaliacoes_restantes()]
+
+            # avalia os novos filhos
+            opcoes = {}
+            if poda:
+                pior_sobrevivente = max(individuo['fitness'] for individuo in populacao)
+                if math.isfinite(pior_sobrevivente):
+                    opcoes["limiar_poda"] = pior_sobrevivente
+
+            inicio_avaliacao = time.perf_counter()
+            if multifidelidade is None:
+                fitness_filhos = avaliar_lote(populacao_nova, funcao_fitness, executor, **opcoes)
+                fidelidades = [1.0] * len(populacao_nova)
+                num_treinos = len(populacao_nova)
+            else:
+                custo_antes = multifidelidade.custo_total
+                fitness_filhos, fidelidades = multifidelidade.avaliar(populacao_nova, funcao_fitness, executor, **opcoes)
+                # filhos descartados em baixa fidelidade custam só a fração treinada
+                num_treinos = multifidelidade.custo_total - custo_antes
+            tempo_avaliacao = time.perf_counter() - inicio_avaliacao
+            for filho, fitness_filho in zip(populacao_nova, fitness_filhos):
+                filho['fitness'] = fitness_filho
+
+            if substituto is not None:
+                # só avaliações completas alimentam o substituto
+                completos = [i for i, fidelidade in enumerate(fidelidades) if fidelidade >= 1.0]
+                substituto.registrar([populacao_nova[i] for i in completos], [fitness_filhos[i] for i in completos])
             
-            # avalia o novo filho
-            fitness_filho = calcular_fitness_rmse(filho)
-            filho['fitness'] = fitness_filho
+            # 9. P ← SelecionaMelhores(P ∪ Pnew, N)
+            # filhos descartados em baixa fidelidade não disputam as vagas com um RMSE parcial
+            P_combinada = populacao + [filho for filho, fidelidade in zip(populacao_nova, fidelidades) if fidelidade >= 1.0]
+            populacao = seleciona_melhores(P_combinada, tamanho_populacao)
             
-            # 7. adicione filho a Pnew
-            populacao_nova.append(filho)
-        # 8. end
-        
-        # 9. P ← SelecionaMelhores(P ∪ Pnew, N)
-        P_combinada = populacao + populacao_nova
-        populacao = seleciona_melhores(P_combinada, tamanho_populacao)
-        
-        # log do progresso
-        melhor_da_geracao = populacao[0]
-        print(f"Geração {geracao+1}/{num_geracoes} | Melhor RMSE: {melhor_da_geracao['fitness']:.4f}")
+            # log do progresso
+            melhor_da_geracao = populacao[0]
+            print(f"Geração {geracao+1}/{num_geracoes} | Melhor RMSE: {melhor_da_geracao['fitness']:.4f}")
+
+            if orcamento is not None:
+                orcamento.contar(num_treinos)
+                diversidade = diversidade_populacao(populacao) if orcamento.diversidade_minima is not None else None
+                orcamento.atualizar(melhor_da_geracao['fitness'], diversidade)
+                motivo_parada = orcamento.esgotado()
+
+            if instrumentacao.ativo():
+                tempo_geracao = time.perf_counter() - inicio_geracao
+                instrumentacao.emitir(
+                    "geracao",
+                    geracao=geracao + 1,
+                    filhos_avaliados=len(populacao_nova),
+                    tempo=tempo_geracao,
+                    tempo_avaliacao=tempo_avaliacao,
+                    tempo_otimizador=tempo_geracao - tempo_avaliacao,
+                    filhos=instrumentacao.resumo_fitness(fitness_filhos),
+                    populacao=instrumentacao.resumo_fitness([individuo['fitness'] for individuo in populacao]),
+                )
+
+            if caminho_checkpoint is not None and (
+                (geracao + 1) % intervalo_checkpoint == 0 or geracao + 1 == num_geracoes
+                or motivo_parada is not None
+            ):
+                salvar(geracao + 1)
+    finally:
+        encerrar_executor(executor, limite_threads)
+
+    if motivo_parada is not None:
+        print(f"Parada antecipada: {motivo_parada}")
+        instrumentacao.emitir("parada", motivo=motivo_parada, **orcamento.resumo())
+    if multifidelidade is not None:
+        print(f"Custo de avaliação (multi-fidelidade): {multifidelidade.relatorio()}")
     
     melhor_final = populacao[0]
     return melhor_final
@@ -75,16 +250,181 @@ def algoritmo_genetico(populacao_inicial, tamanho_populacao, num_geracoes, pm, d
     s6: Nível de açúcar no sangue (Glicose - GLU)'''
 
 
+def retomar_algoritmo_genetico(caminho_checkpoint, definicoes_hp, **kwargs):
+    """
+    Continua uma execução do Algoritmo Genético a partir de um checkpoint.
+
+    Tamanho da população, número de gerações e probabilidade de mutação vêm do
+    checkpoint; os demais argumentos de `algoritmo_genetico` (função de fitness,
+    workers, ...) podem ser passados novamente em `kwargs`; a semente gravada
+    no checkpoint é reaproveitada se nenhuma for passada. Um `orcamento` ou
+    `substituto` passado em `kwargs` continua do estado gravado no checkpoint.
+    Os novos checkpoints continuam sendo gravados no mesmo arquivo.
+
+    Returns:
+        dict: O melhor indivíduo encontrado após todas as gerações.
+    """
+    estado = carregar_checkpoint(caminho_checkpoint)
+    kwargs.setdefault("semente", estado.get("semente"))
+    return algoritmo_genetico(
+        None,
+        estado["tamanho_populacao"],
+        estado["num_geracoes"],
+        estado["pm"],
+        definicoes_hp,
+        caminho_checkpoint=caminho_checkpoint,
+        estado_checkpoint=estado,
+        **kwargs,
+    )
+
+
+def algoritmo_genetico_assincrono(populacao_inicial, tamanho_populacao, pm, definicoes_hp,
+                                  funcao_fitness=calcular_fitness_rmse, workers=1,
+                                  max_avaliacoes=None, tempo_maximo=None, poda=False, threads_blas=None,
+                                  semente=None, orcamento=None):
+    """
+    Algoritmo Genético de estado estacionário, sem barreira entre gerações.
+
+    Cada worker treina um filho por vez. Assim que um treino termina, o filho
+    entra na população no lugar do pior indivíduo (se for melhor que ele), e um
+    novo filho é gerado a partir da população atual e enviado ao worker livre.
+    Redes pequenas não ficam esperando as grandes terminarem, e todos os
+    processos permanecem ocupados.
+
+    A execução é limitada por número de avaliações e/ou tempo de parede, e não
+    por gerações. Como a ordem de chegada dos resultados depende do tempo de
+    treino, execuções com mais de um worker não são reprodutíveis, mesmo com
+    `semente`: ela fixa os sorteios de cada filho e as avaliações, mas não o
+    estado da população quando o filho é gerado.
+
+    Args:
+        populacao_inicial (list): Lista de dicionários, onde cada dicionário é um indivíduo.
+        tamanho_populacao (int): Tamanho da população.
+        pm (float): Probabilidade de mutação.
+        definicoes_hp (dict): Definições dos hiperparâmetros para a mutação.
+        funcao_fitness (callable): Função que recebe um indivíduo e retorna o RMSE.
+        workers (int): Número de processos; também é o número de filhos em treino ao mesmo tempo.
+        max_avaliacoes (int): Número máximo de filhos avaliados (sem contar a população inicial).
+        tempo_maximo (float): Tempo máximo de execução, em segundos. Ao estourar,
+            os treinos em andamento ainda são aproveitados, mas nenhum filho novo é gerado.
+        poda (bool): Se True, cada filho é treinado com o pior indivíduo da
+            população no momento do envio como `limiar_poda`.
+        threads_blas (int): Threads BLAS de cada worker (ver `avaliacao.criar_executor`).
+        semente (int): Se informada, o n-ésimo filho enviado é gerado com o fluxo
+            (n,) de `sementes.FluxosAleatorios` e cada avaliação recebe a semente
+            do seu fenótipo. Com um worker, a execução é reprodutível.
+        orcamento (Orcamento): Critérios de parada adicionais (ou no lugar de
+            `max_avaliacoes`/`tempo_maximo`). Sem gerações, a paciência é
+            contada a cada `tamanho_populacao` avaliações; nenhum filho novo é
+            enviado além das avaliações restantes do orçamento.
+
+    Returns:
+        dict: O melhor indivíduo encontrado.
+    """
+    if max_avaliacoes is None and tempo_maximo is None and orcamento is None:
+        raise ValueError("Informe max_avaliacoes, tempo_maximo e/ou orcamento")
+    fluxos = None
+    if semente is not None:
+        fluxos = FluxosAleatorios(semente)
+        funcao_fitness = semear_fitness(funcao_fitness, semente)
+
+    inicio = time.perf_counter()
+    if orcamento is not None:
+        orcamento.iniciar()
+        orcamento.acompanhar(funcao_fitness)
+    motivo_parada = None
+    executor, limite_threads = iniciar_executor(workers, threads_blas)
+    try:
+        fitness_iniciais = avaliar_lote(populacao_inicial, funcao_fitness, executor)
+        if orcamento is not None:
+            orcamento.contar(len(populacao_inicial))
+        populacao = []
+        for individuo_sem_fitness, fitness in zip(populacao_inicial, fitness_iniciais):
+            individuo_com_fitness = individuo_sem_fitness.copy()
+            individuo_com_fitness['fitness'] = fitness
+            populacao.append(individuo_com_fitness)
+        populacao = seleciona_melhores(populacao, tamanho_populacao)
+
+        enviados = 0
+        avaliados = 0
+
+        def pode_enviar():
+            nonlocal motivo_parada
+            if max_avaliacoes is not None and enviados >= max_avaliacoes:
+                return False
+            if tempo_maximo is not None and time.perf_counter() - inicio >= tempo_maximo:
+                return False
+            if orcamento is None:
+                return True
+            motivo_parada = motivo_parada or orcamento.esgotado(populacao[0]['fitness'])
+            restantes = orcamento.avaliacoes_restantes()
+            # os filhos em treino já vão consumir parte das avaliações restantes
+            return motivo_parada is None and (restantes is None or restantes > len(pendentes))
+
+        def enviar_filho():
+            rng = random if fluxos is None else fluxos.gerador(FLUXO_ESTADO_ESTACIONARIO, enviados)
+            pai1 = selecao_torneio(populacao, rng=rng)
+            pai2 = selecao_torneio(populacao, rng=rng)
+            filho = mutacao(cruzamento(pai1, pai2, rng), pm, definicoes_hp, rng)
+            opcoes = {}
+            if poda and math.isfinite(populacao[-1]['fitness']):
+                opcoes["limiar_poda"] = populacao[-1]['fitness']
+            return submeter(filho, funcao_fitness, executor, **opcoes), filho
+
+        pendentes = {}
+        while pode_enviar() and len(pendentes) < max(1, workers):
+            futuro, filho = enviar_filho()
+            pendentes[futuro] = filho
+            enviados += 1
+
+        while pendentes:
+            concluidos, _ = wait(list(pendentes), return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                filho = pendentes.pop(futuro)
+                filho['fitness'] = futuro.result()
+                avaliados += 1
+                if orcamento is not None:
+                    orcamento.contar(1)
+
+                # substitui o pior (a população é mantida ordenada)
+                substituiu = filho['fitness'] < populacao[-1]['fitness']
+                if substituiu:
+                    populacao = seleciona_melhores(populacao[:-1] + [filho], tamanho_populacao)
+
+                if avaliados % tamanho_populacao == 0:
+                    if orcamento is not None:
+                        diversidade = diversidade_populacao(populacao) if orcamento.diversidade_minima is not None else None
+                        orcamento.atualizar(populacao[0]['fitness'], diversidade)
+                    print(f"Avaliações {avaliados} | {time.perf_counter() - inicio:.1f}s | "
+                          f"Melhor RMSE: {populacao[0]['fitness']:.4f}")
+                if instrumentacao.ativo():
+                    instrumentacao.emitir(
+                        "estado_estacionario",
+                        avaliacoes=avaliados,
+                        fitness=filho['fitness'],
+                        substituiu=substituiu,
+                        em_treino=len(pendentes),
+                        populacao=instrumentacao.resumo_fitness([individuo['fitness'] for individuo in populacao]),
+                    )
+
+                if pode_enviar():
+                    futuro_novo, filho_novo = enviar_filho()
+                    pendentes[futuro_novo] = filho_novo
+                    enviados += 1
+    finally:
+        encerrar_executor(executor, limite_threads)
+
+    if motivo_parada is not None:
+        print(f"Parada antecipada: {motivo_parada}")
+        instrumentacao.emitir("parada", motivo=motivo_parada, **orcamento.resumo())
+    print(f"Avaliações: {avaliados} em {time.perf_counter() - inicio:.1f}s | Melhor RMSE: {populacao[0]['fitness']:.4f}")
+    return populacao[0]
+
+
 if __name__ == '__main__':
-    definicoes_hiperparametros = {
-        "taxa_aprendizado": {"type": "float", "min": 0.0001, "max": 0.1},
-        "numero_camadas": {"type": "int", "min": 1, "max": 15},
-        "ativacao": {"type": "choice", "options": ["relu", "tanh", "identity", "logistic"]},
-    }
-    for i in range(1, 16):
-        definicoes_hiperparametros[f"neuronios_camada_{i}"] = {"type": "int", "min": 30, "max": 100}
-    
-    nome_arquivo_genetico = "/home/gmarinho/code/topicos-especiais-otimizacao/algoritmos/metaheuristicas/populacao_genetico.json"
+    from redeneural import definicoes_hiperparametros
+
+    nome_arquivo_genetico = ARQUIVO_POPULACAO
     pop_inicial = []
     
     try:
@@ -104,11 +444,15 @@ if __name__ == '__main__':
     N_POPULACAO = len(pop_inicial)
     N_GERACOES = 50   
     PROB_MUTACAO = 0.4
+    N_WORKERS = 1     # processos usados para treinar as redes de cada geração
     
     print("\nIniciando Algoritmo Genético...")
     print(f"Tamanho da População: {N_POPULACAO} (do arquivo), Gerações: {N_GERACOES}, Prob. Mutação: {PROB_MUTACAO}")
     print("-" * 30)
 
+    # Cache persistente: configurações com o mesmo fenótipo não são treinadas de novo
+    fitness_cache = FitnessComCache(calcular_fitness_rmse, caminho_banco="cache_fitness.sqlite")
+
     # O resto do código permanece o mesmo, agora usando a 'pop_inicial' lida do arquivo
     melhor_individuo_encontrado = algoritmo_genetico(
         pop_inicial,
@@ -116,10 +460,14 @@ if __name__ == '__main__':
         N_GERACOES,
         PROB_MUTACAO,
         definicoes_hiperparametros,
+        fitness_cache,
+        workers=N_WORKERS,
     )
     
     print("-" * 30)
     print("Otimização Concluída!")
+    print(f"Cache de fitness: {fitness_cache.estatisticas()}")
+    fitness_cache.fechar()
 
     print("\nMelhor indivíduo encontrado:")
     for nome, valor_gerado in melhor_individuo_encontrado.items():
@@ -0,0 +1,197 @@
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+
+import redeneural
+from redeneural import calcular_fitness_rmse
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # sem threadpoolctl, vale só o limite pelas variáveis de ambiente
+    threadpool_limits = None
+
+# Variáveis lidas pelas bibliotecas BLAS/OpenMP ao serem carregadas
+VARIAVEIS_THREADS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "BLIS_NUM_THREADS")
+
+
+class LimiteThreadsBlas:
+    """
+    Limite de threads de BLAS/OpenMP aplicado ao processo atual, que pode ser
+    desfeito com `restaurar` (ou usado com `with`).
+
+    As bibliotecas já carregadas (ex: o OpenBLAS do NumPy) são limitadas pelo
+    threadpoolctl; as variáveis de ambiente valem para as carregadas depois
+    (ex: ao importar o scikit-learn sob demanda).
+    """
+
+    def __init__(self, threads_blas):
+        self.variaveis_originais = {variavel: os.environ.get(variavel) for variavel in VARIAVEIS_THREADS}
+        for variavel in VARIAVEIS_THREADS:
+            os.environ[variavel] = str(threads_blas)
+        self.controlador = None if threadpool_limits is None else threadpool_limits(limits=threads_blas)
+
+    def restaurar(self):
+        """Volta às variáveis de ambiente e aos limites de antes."""
+        for variavel, valor in self.variaveis_originais.items():
+            if valor is None:
+                os.environ.pop(variavel, None)
+            else:
+                os.environ[variavel] = valor
+        if self.controlador is not None:
+            self.controlador.restore_original_limits()
+            self.controlador = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.restaurar()
+
+
+def limitar_threads_blas(threads_blas):
+    """
+    Limita as threads de BLAS/OpenMP do processo atual.
+
+    Returns:
+        LimiteThreadsBlas | None: O limite aplicado (None se `threads_blas` é
+        None). Nos workers do pool ele vale até o fim do processo; no processo
+        principal, chame `restaurar()` ao terminar.
+    """
+    if threads_blas is None:
+        return None
+    return LimiteThreadsBlas(threads_blas)
+
+
+def inicializar_worker(diretorio_dados, threads_blas=None):
+    """Inicializador dos processos do pool: mesmo conjunto de dados e limite de threads BLAS."""
+    redeneural.inicializar_worker(diretorio_dados)
+    limitar_threads_blas(threads_blas)
+
+
+def criar_executor(workers, threads_blas=None):
+    """
+    Cria o pool de processos usado na avaliação em lote.
+
+    Os workers são apontados para o mesmo conjunto de dados do processo
+    principal (ver `redeneural.usar_conjunto_dados`). Com vários workers, cada
+    treino abriria o seu próprio pool de threads BLAS e a CPU ficaria
+    sobrecarregada; `threads_blas` limita as threads de cada worker (ver
+    `ajuste_recursos.ajustar_recursos` para escolher a divisão).
+
+    Args:
+        workers (int): Número de processos. Com 1 (ou None) a avaliação é serial.
+        threads_blas (int): Threads BLAS por worker (None = padrão da biblioteca).
+            No modo serial o limite não é aplicado aqui (ver `iniciar_executor`).
+
+    Returns:
+        ProcessPoolExecutor | None: O executor, ou None para o modo serial.
+    """
+    if workers is None or workers <= 1:
+        return None
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=inicializar_worker,
+        initargs=(redeneural.diretorio_dados, threads_blas),
+    )
+
+
+def iniciar_executor(workers, threads_blas=None):
+    """
+    `criar_executor` com o limite de threads BLAS também no modo serial.
+
+    Returns:
+        tuple: (executor, limite) — passe os dois a `encerrar_executor` ao terminar.
+    """
+    executor = criar_executor(workers, threads_blas)
+    limite = limitar_threads_blas(threads_blas) if executor is None else None
+    return executor, limite
+
+
+def encerrar_executor(executor, limite=None):
+    """Encerra o pool de `iniciar_executor` ou, no modo serial, restaura o limite de threads."""
+    if executor is not None:
+        executor.shutdown()
+    if limite is not None:
+        limite.restaurar()
+
+
+def avaliar_lote(individuos, funcao_fitness=calcular_fitness_rmse, executor=None, **opcoes):
+    """
+    Avalia uma lista de indivíduos, em série ou no pool de processos.
+
+    Se `funcao_fitness` expuser um método `avaliar_lote(individuos, executor)`
+    (como a `FitnessComCache`), a avaliação do lote é delegada a ele.
+
+    Args:
+        individuos (list): Lista de dicionários de hiperparâmetros.
+        funcao_fitness (callable): Função de fitness (precisa ser serializável
+            com pickle quando há executor).
+        executor (Executor): Pool retornado por `criar_executor`, ou None.
+        **opcoes: Argumentos extras repassados à função de fitness (ex: `fidelidade`).
+
+    Returns:
+        list: Os valores de fitness, na mesma ordem de `individuos`.
+    """
+    avaliar = getattr(funcao_fitness, "avaliar_lote", None)
+    if avaliar is not None:
+        return avaliar(individuos, executor, **opcoes)
+
+    if opcoes:
+        funcao_fitness = partial(funcao_fitness, **opcoes)
+
+    if executor is None:
+        return [funcao_fitness(individuo) for individuo in individuos]
+    return list(executor.map(funcao_fitness, individuos))
+
+
+def encadear(original, funcao):
+    """
+    `Future` com `funcao(resultado)` do `original`, repassando a exceção, se houver.
+
+    `funcao` roda na thread que conclui o `original`; não deve alterar estado
+    do processo principal (ver o uso de `concluidas` na `FitnessComCache`).
+    """
+    futuro = Future()
+
+    def concluir(original):
+        if original.exception() is not None:
+            futuro.set_exception(original.exception())
+            return
+        try:
+            futuro.set_result(funcao(original.result()))
+        except Exception as e:
+            futuro.set_exception(e)
+
+    original.add_done_callback(concluir)
+    return futuro
+
+
+def submeter(individuo, funcao_fitness=calcular_fitness_rmse, executor=None, **opcoes):
+    """
+    Dispara a avaliação de um único indivíduo sem esperar pelo resultado.
+
+    No pool, a função de fitness roda em um worker e o `Future` fica pendente
+    até o treino terminar. Se `funcao_fitness` expuser um método
+    `submeter(individuo, executor)` (como a `FitnessComCache`, que responde
+    acertos na hora e envia as falhas ao pool, ou o `AvaliadorRemoto`), a
+    submissão é delegada a ele.
+    Sem executor, ou quando `funcao_fitness` mantém estado no processo
+    principal sem expor `submeter` (só `avaliar_lote`), a avaliação é feita na
+    hora e o `Future` já volta concluído.
+
+    Returns:
+        Future: Futuro com o valor de fitness.
+    """
+    submeter_proprio = getattr(funcao_fitness, "submeter", None)
+    if submeter_proprio is not None:
+        return submeter_proprio(individuo, executor, **opcoes)
+
+    if executor is not None and not hasattr(funcao_fitness, "avaliar_lote"):
+        return executor.submit(funcao_fitness, individuo, **opcoes)
+
+    futuro = Future()
+    try:
+        futuro.set_result(avaliar_lote([individuo], funcao_fitness, executor, **opcoes)[0])
+    except Exception as e:
+        futuro.set_exception(e)
+    return futuro
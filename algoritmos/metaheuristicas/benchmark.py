@@ -0,0 +1,236 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import time
+from collections import deque
+
+from algoritmogenetico import algoritmo_genetico
+from avaliacao import avaliar_lote, submeter
+from cache_fitness import FitnessComCache
+from multifidelidade import SuccessiveHalving
+from redeneural import calcular_fitness_rmse, definicoes_hiperparametros
+from solucao_inicial import solucao_inicial_genetico, solucao_inicial_tempera
+from temperasimulada import tempera_simulada
+from utils import fitness_sintetica
+
+FUNCOES_FITNESS = {
+    "real": calcular_fitness_rmse,
+    "sintetica": fitness_sintetica,
+}
+
+# Tamanho das execuções de cada algoritmo (o bastante para comparar modos, não para otimizar)
+CONFIG_GENETICO = {"tamanho_populacao": 10, "num_geracoes": 4, "pm": 0.4}
+CONFIG_TEMPERA = {
+    "temperatura_inicial": 1.0,
+    "taxa_resfriamento": 0.2,
+    "temperatura_minima": 0.001,
+    "max_iter_sem_melhora_global": 10,
+    "max_iter_por_temperatura": 10,
+}
+
+
+class FitnessCronometrada:
+    """
+    Envolve uma função de fitness medindo o tempo gasto nela e registrando a
+    curva melhor-RMSE x tempo de parede. Mede também os lotes, de modo que
+    funciona nos modos paralelo, com cache e multi-fidelidade.
+    """
+
+    def __init__(self, funcao_fitness):
+        self.funcao_fitness = funcao_fitness
+        self.semente = getattr(funcao_fitness, "semente", None)
+        self.inicio = time.perf_counter()
+        self.tempo_fitness = 0.0
+        self.avaliacoes = 0
+        self.melhor = float('inf')
+        self.curva = []
+        self.concluidas = deque()  # (instante, valor, opcoes) preenchida pelos callbacks de `submeter`
+
+    def semear(self, semente):
+        """Aplica a semente por avaliação na função envolvida (ver `sementes.semear_fitness`)."""
+        from sementes import semear_fitness
+
+        self.funcao_fitness = semear_fitness(self.funcao_fitness, semente)
+        self.semente = semente
+
+    def __call__(self, hiperparametros, **opcoes):
+        t0 = time.perf_counter()
+        valor = self.funcao_fitness(hiperparametros, **opcoes)
+        self._registrar([valor], t0, opcoes)
+        return valor
+
+    def avaliar_lote(self, individuos, executor=None, **opcoes):
+        t0 = time.perf_counter()
+        valores = avaliar_lote(individuos, self.funcao_fitness, executor, **opcoes)
+        self._registrar(valores, t0, opcoes)
+        return valores
+
+    def submeter(self, hiperparametros, executor=None, **opcoes):
+        """
+        Versão assíncrona de `__call__`, usada por `avaliacao.submeter`. Só o
+        tempo em que o processo principal fica parado na submissão conta como
+        tempo de fitness; o valor entra na curva quando o futuro termina.
+        """
+        def concluir(futuro):
+            if futuro.exception() is None:
+                self.concluidas.append((time.perf_counter(), futuro.result(), opcoes))
+
+        t0 = time.perf_counter()
+        futuro = submeter(hiperparametros, self.funcao_fitness, executor, **opcoes)
+        futuro.add_done_callback(concluir)
+        self._registrar([], t0, opcoes)
+        return futuro
+
+    def _registrar(self, valores, t0, opcoes):
+        agora = time.perf_counter()
+        self.tempo_fitness += agora - t0
+        self.registrar_concluidas()
+        self._atualizar_curva(agora, valores, opcoes)
+
+    def registrar_concluidas(self):
+        """Contabiliza as avaliações de `submeter` já concluídas."""
+        while self.concluidas:
+            instante, valor, opcoes = self.concluidas.popleft()
+            self._atualizar_curva(instante, [valor], opcoes)
+
+    def _atualizar_curva(self, instante, valores, opcoes):
+        self.avaliacoes += len(valores)
+        # avaliações de baixa fidelidade não entram na curva de qualidade
+        if opcoes.get("fidelidade", 1.0) >= 1.0 and valores and min(valores) < self.melhor:
+            self.melhor = min(valores)
+            self.curva.append((instante - self.inicio, self.melhor))
+
+
+def preparar_fitness(nome_fitness, modo):
+    """Monta a função de fitness de um cenário. Retorna (cronometrada, cache, escalonador)."""
+    funcao = FUNCOES_FITNESS[nome_fitness]
+    cache = None
+    escalonador = None
+    if modo == "cache":
+        cache = FitnessComCache(funcao)
+        funcao = cache
+    elif modo == "multifidelidade":
+        escalonador = SuccessiveHalving()
+    return FitnessCronometrada(funcao), cache, escalonador
+
+
+def executar_cenario(algoritmo, nome_fitness, modo, semente, workers):
+    """
+    Executa um cenário e retorna um registro com as métricas de desempenho.
+
+    Args:
+        algoritmo (str): 'genetico' ou 'tempera'.
+        nome_fitness (str): 'real' (MLP) ou 'sintetica' (`avalia_rede_func`).
+        modo (str): 'serial', 'paralelo', 'cache' ou 'multifidelidade'.
+        semente (int): Semente do `random` global e das execuções (ver `sementes`).
+        workers (int): Processos usados no modo 'paralelo'.
+    """
+    random.seed(semente)
+    fitness, cache, escalonador = preparar_fitness(nome_fitness, modo)
+    num_workers = workers if modo == "paralelo" else 1
+    log = io.StringIO()
+
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        if algoritmo == "genetico":
+            populacao_inicial = solucao_inicial_genetico(
+                definicoes_hiperparametros, CONFIG_GENETICO["tamanho_populacao"]
+            )
+            melhor = algoritmo_genetico(
+                populacao_inicial,
+                CONFIG_GENETICO["tamanho_populacao"],
+                CONFIG_GENETICO["num_geracoes"],
+                CONFIG_GENETICO["pm"],
+                definicoes_hiperparametros,
+                fitness,
+                workers=num_workers,
+                multifidelidade=escalonador,
+                semente=semente,
+            )
+            melhor_score = melhor["fitness"]
+            num_niveis = CONFIG_GENETICO["num_geracoes"]
+        else:
+            # no modo multi-fidelidade a têmpera usa o lote especulativo com triagem
+            lote = CONFIG_TEMPERA["max_iter_por_temperatura"] if escalonador is not None else 1
+            if modo == "paralelo":
+                lote = num_workers
+            _, melhor_score = tempera_simulada(
+                solucao_inicial_tempera(definicoes_hiperparametros),
+                config_hiperparametros=definicoes_hiperparametros,
+                funcao_fitness=fitness,
+                lote_especulativo=lote,
+                workers=num_workers,
+                multifidelidade=escalonador,
+                semente=semente,
+                **CONFIG_TEMPERA,
+            )
+            num_niveis = log.getvalue().count("Ciclo de Resfriamento")
+    tempo_total = time.perf_counter() - inicio
+    fitness.registrar_concluidas()
+    # `avaliacoes` conta as consultas à fitness; acertos da cache não treinam redes
+    treinos = cache.estatisticas()["falhas"] if cache is not None else fitness.avaliacoes
+
+    registro = {
+        "algoritmo": algoritmo,
+        "fitness": nome_fitness,
+        "modo": modo,
+        "semente": semente,
+        "workers": num_workers,
+        "tempo_total": tempo_total,
+        "tempo_fitness": fitness.tempo_fitness,
+        "avaliacoes": fitness.avaliacoes,
+        "avaliacoes_por_segundo": fitness.avaliacoes / tempo_total if tempo_total > 0 else 0.0,
+        "treinos": treinos,
+        "treinos_por_segundo": treinos / tempo_total if tempo_total > 0 else 0.0,
+        "niveis": num_niveis,
+        "overhead_por_nivel": (tempo_total - fitness.tempo_fitness) / max(1, num_niveis),
+        "melhor": melhor_score,
+        "curva": fitness.curva,
+    }
+    if cache is not None:
+        registro["cache"] = cache.estatisticas()
+    if escalonador is not None:
+        registro["multifidelidade"] = escalonador.relatorio()
+    return registro
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de vazão e desempenho anytime dos otimizadores.")
+    parser.add_argument("--algoritmos", nargs="+", default=["genetico", "tempera"], choices=["genetico", "tempera"])
+    parser.add_argument("--fitness", nargs="+", default=["sintetica", "real"], choices=list(FUNCOES_FITNESS))
+    parser.add_argument("--modos", nargs="+", default=["serial", "paralelo", "cache", "multifidelidade"],
+                        choices=["serial", "paralelo", "cache", "multifidelidade"])
+    parser.add_argument("--sementes", nargs="+", type=int, default=[0, 1, 2])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--saida", default="benchmark_resultados.json")
+    args = parser.parse_args()
+
+    resultados = []
+    for algoritmo in args.algoritmos:
+        for nome_fitness in args.fitness:
+            for modo in args.modos:
+                for semente in args.sementes:
+                    registro = executar_cenario(algoritmo, nome_fitness, modo, semente, args.workers)
+                    resultados.append(registro)
+                    print(f"{algoritmo:9s} {nome_fitness:9s} {modo:16s} semente={semente} | "
+                          f"{registro['avaliacoes_por_segundo']:9.1f} aval/s | "
+                          f"{registro['treinos_por_segundo']:9.1f} treinos/s | "
+                          f"overhead/nível {registro['overhead_por_nivel'] * 1000:8.2f} ms | "
+                          f"melhor {registro['melhor']:.4f}")
+
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump({
+            "python": platform.python_version(),
+            "maquina": platform.machine(),
+            "config_genetico": CONFIG_GENETICO,
+            "config_tempera": CONFIG_TEMPERA,
+            "resultados": resultados,
+        }, f, ensure_ascii=False, indent=4)
+    print(f"-> Resultados salvos em '{args.saida}'")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,406 @@
+import argparse
+import itertools
+import multiprocessing
+import os
+import secrets
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.managers import BaseManager
+
+import redeneural
+from redeneural import calcular_fitness_rmse
+
+PORTA_PADRAO = 50000
+# só a máquina local; para aceitar workers de outras máquinas, informe o endereço da interface
+ENDERECO_PADRAO = ("127.0.0.1", PORTA_PADRAO)
+
+
+class EstadoBroker:
+    """
+    Fila de trabalhos compartilhada entre o otimizador e os workers.
+
+    Vive no processo do broker e é acessada por proxies de
+    `multiprocessing.managers` (cada conexão é atendida em uma thread, daí a
+    trava). Trabalhos de workers que param de enviar batimentos por mais de
+    `timeout_batimento` segundos voltam para o início da fila.
+    """
+
+    def __init__(self, timeout_batimento=10.0):
+        self.timeout_batimento = timeout_batimento
+        self.trava = threading.Lock()
+        self.ids = itertools.count()
+        self.pendentes = deque()    # (id, individuo, opcoes)
+        self.em_andamento = {}      # id -> (worker, individuo, opcoes)
+        self.resultados = {}        # id -> valor
+        self.batimentos = {}        # worker -> instante do último sinal
+        self.reenfileirados = 0
+        self.concluidos = 0
+
+    def enviar(self, tarefas):
+        """Enfileira uma lista de (individuo, opcoes). Retorna os ids dos trabalhos."""
+        with self.trava:
+            ids = []
+            for individuo, opcoes in tarefas:
+                id_trabalho = next(self.ids)
+                self.pendentes.append((id_trabalho, individuo, opcoes))
+                ids.append(id_trabalho)
+            return ids
+
+    def pegar(self, worker, max_tarefas):
+        """Entrega até `max_tarefas` trabalhos ao worker (vale também como batimento)."""
+        with self.trava:
+            self.batimentos[worker] = time.monotonic()
+            self._reenfileirar_abandonados()
+            lote = []
+            while self.pendentes and len(lote) < max_tarefas:
+                id_trabalho, individuo, opcoes = self.pendentes.popleft()
+                self.em_andamento[id_trabalho] = (worker, individuo, opcoes)
+                lote.append((id_trabalho, individuo, opcoes))
+            return lote
+
+    def entregar(self, worker, resultados):
+        """
+        Recebe uma lista de (id, valor). Resultados de trabalhos já concluídos
+        (ainda não coletados ou já coletados) são ignorados.
+        """
+        with self.trava:
+            self.batimentos[worker] = time.monotonic()
+            for id_trabalho, valor in resultados:
+                if id_trabalho in self.resultados:
+                    continue
+                if self.em_andamento.pop(id_trabalho, None) is None:
+                    # trabalho reenfileirado, mas o worker "morto" terminou antes de outro pegá-lo
+                    restantes = deque(t for t in self.pendentes if t[0] != id_trabalho)
+                    if len(restantes) == len(self.pendentes):
+                        # entrega duplicada de um trabalho já coletado
+                        continue
+                    self.pendentes = restantes
+                self.resultados[id_trabalho] = valor
+                self.concluidos += 1
+
+    def pulsar(self, worker):
+        with self.trava:
+            self.batimentos[worker] = time.monotonic()
+
+    def desconectar(self, worker):
+        """Saída normal de um worker: seus trabalhos voltam à fila imediatamente."""
+        with self.trava:
+            self.batimentos[worker] = float('-inf')
+            # `_reenfileirar_abandonados` já remove o worker dos batimentos
+            self._reenfileirar_abandonados()
+
+    def coletar(self, ids):
+        """Retorna {id: valor} dos trabalhos de `ids` já concluídos, removendo-os do broker."""
+        with self.trava:
+            self._reenfileirar_abandonados()
+            prontos = {i: self.resultados.pop(i) for i in ids if i in self.resultados}
+            return prontos
+
+    def estatisticas(self):
+        with self.trava:
+            agora = time.monotonic()
+            return {
+                "pendentes": len(self.pendentes),
+                "em_andamento": len(self.em_andamento),
+                "concluidos": self.concluidos,
+                "reenfileirados": self.reenfileirados,
+                "workers_ativos": sum(agora - t <= self.timeout_batimento for t in self.batimentos.values()),
+            }
+
+    def _reenfileirar_abandonados(self):
+        agora = time.monotonic()
+        mortos = {w for w, t in self.batimentos.items() if agora - t > self.timeout_batimento}
+        if not mortos:
+            return
+        for id_trabalho, (worker, individuo, opcoes) in list(self.em_andamento.items()):
+            if worker in mortos:
+                del self.em_andamento[id_trabalho]
+                self.pendentes.appendleft((id_trabalho, individuo, opcoes))
+                self.reenfileirados += 1
+        for worker in mortos:
+            self.batimentos.pop(worker, None)
+
+
+_estado = None
+
+
+def _configurar_estado(timeout_batimento):
+    global _estado
+    _estado = EstadoBroker(timeout_batimento)
+
+
+def _obter_estado():
+    return _estado
+
+
+class GerenciadorBroker(BaseManager):
+    pass
+
+
+GerenciadorBroker.register("broker", callable=_obter_estado)
+
+
+def gerar_chave():
+    """
+    Chave de autenticação aleatória para um broker.
+
+    O protocolo de `multiprocessing.managers` desserializa (pickle) o que os
+    clientes enviam: quem conhece a chave e alcança a porta pode executar
+    código no broker. Por isso não há chave padrão.
+    """
+    return secrets.token_hex(16).encode()
+
+
+def conectar(endereco, chave):
+    """Conecta a um broker em execução e retorna o proxy de `EstadoBroker`."""
+    gerenciador = GerenciadorBroker(address=tuple(endereco), authkey=chave)
+    gerenciador.connect()
+    return gerenciador.broker()
+
+
+def iniciar_broker(endereco=ENDERECO_PADRAO, chave=None, timeout_batimento=10.0):
+    """
+    Inicia o broker em um processo filho.
+
+    Args:
+        endereco (tuple): (host, porta). O padrão só aceita conexões locais.
+        chave (bytes): Chave de autenticação. Se None, uma nova é gerada
+            (`gerar_chave`) e fica em `gerenciador.chave`.
+        timeout_batimento (float): Ver `EstadoBroker`.
+
+    Returns:
+        GerenciadorBroker: O gerenciador (use `shutdown()` para encerrar).
+    """
+    chave = chave if chave is not None else gerar_chave()
+    gerenciador = GerenciadorBroker(address=tuple(endereco), authkey=chave)
+    gerenciador.start(initializer=_configurar_estado, initargs=(timeout_batimento,))
+    gerenciador.chave = chave
+    return gerenciador
+
+
+def servir_broker(endereco=ENDERECO_PADRAO, chave=None, timeout_batimento=10.0):
+    """
+    Executa o broker no processo atual até ser interrompido.
+
+    Sem `chave`, uma nova é gerada e impressa uma vez, para ser passada aos workers.
+    """
+    if chave is None:
+        chave = gerar_chave()
+        print(f"Chave do broker (passe aos workers com --chave): {chave.decode()}")
+    _configurar_estado(timeout_batimento)
+    gerenciador = GerenciadorBroker(address=tuple(endereco), authkey=chave)
+    print(f"Broker escutando em {endereco[0] or '0.0.0.0'}:{endereco[1]}")
+    gerenciador.get_server().serve_forever()
+
+
+def _enviar_batimentos(endereco, chave, worker, intervalo, parar):
+    # conexão própria: proxies não devem ser compartilhados entre threads
+    broker = conectar(endereco, chave)
+    while not parar.wait(intervalo):
+        broker.pulsar(worker)
+
+
+def executar_worker(endereco, chave, funcao_fitness=calcular_fitness_rmse,
+                    tamanho_lote=4, intervalo_batimento=2.0, intervalo_espera=0.1,
+                    diretorio_dados=None, max_trabalhos=None):
+    """
+    Laço de um worker: pega lotes de hiperparâmetros no broker, avalia e devolve os RMSEs.
+
+    Uma thread envia batimentos enquanto os treinos rodam, para que treinos
+    longos não sejam confundidos com um worker morto.
+
+    Args:
+        endereco (tuple): (host, porta) do broker.
+        chave (bytes): Chave de autenticação do broker.
+        funcao_fitness (callable): Função avaliada para cada trabalho.
+        tamanho_lote (int): Trabalhos pegos por ida ao broker.
+        intervalo_batimento (float): Segundos entre batimentos.
+        intervalo_espera (float): Espera quando a fila está vazia.
+        diretorio_dados (str): Conjunto preparado por `dados.preparar_conjunto`, se houver.
+        max_trabalhos (int): Encerra após avaliar esse número de trabalhos (None = nunca).
+    """
+    redeneural.inicializar_worker(diretorio_dados)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    broker = conectar(endereco, chave)
+
+    parar = threading.Event()
+    threading.Thread(
+        target=_enviar_batimentos, args=(endereco, chave, worker, intervalo_batimento, parar), daemon=True
+    ).start()
+
+    avaliados = 0
+    try:
+        while max_trabalhos is None or avaliados < max_trabalhos:
+            lote = broker.pegar(worker, tamanho_lote)
+            if not lote:
+                time.sleep(intervalo_espera)
+                continue
+            resultados = []
+            for id_trabalho, individuo, opcoes in lote:
+                try:
+                    valor = funcao_fitness(individuo, **opcoes)
+                except Exception as e:
+                    print(f"Erro durante a avaliação: {e}")
+                    valor = float('inf')
+                resultados.append((id_trabalho, valor))
+            broker.entregar(worker, resultados)
+            avaliados += len(lote)
+    except (EOFError, ConnectionError):
+        print(f"Worker {worker}: conexão com o broker encerrada")
+    else:
+        broker.desconectar(worker)
+    finally:
+        parar.set()
+
+
+class AvaliadorRemoto:
+    """
+    Função de fitness que delega as avaliações aos workers conectados a um broker.
+
+    Pode ser passada como `funcao_fitness` para o Algoritmo Genético ou para a
+    Têmpera Simulada: os lotes (`avaliar_lote`) são enviados de uma vez ao
+    broker e distribuídos entre todos os workers, em quantas máquinas houver.
+
+    Com `semente`, cada trabalho leva a sua semente por avaliação (ver
+    `sementes.FluxosAleatorios.semente_avaliacao`), calculada aqui; os workers
+    não precisam conhecer a semente da execução.
+    """
+
+    def __init__(self, endereco, chave, intervalo_consulta=0.05, semente=None):
+        self.endereco = tuple(endereco)
+        self.chave = chave
+        self.intervalo_consulta = intervalo_consulta
+        self.broker = conectar(self.endereco, chave)
+        self.semente = None
+        self.fluxos = None
+        self._iniciar_coleta()
+        if semente is not None:
+            self.semear(semente)
+
+    def _iniciar_coleta(self):
+        # trabalhos de `submeter` ainda sem resultado: id -> Future
+        self.aguardando = {}
+        self.trava = threading.Lock()
+        self.coletor = None
+
+    def semear(self, semente):
+        """Passa a enviar a semente por avaliação em cada trabalho (ver `sementes.semear_fitness`)."""
+        from sementes import FluxosAleatorios
+
+        self.semente = semente
+        self.fluxos = FluxosAleatorios(semente)
+
+    def __call__(self, hiperparametros, **opcoes):
+        return self.avaliar_lote([hiperparametros], **opcoes)[0]
+
+    def _tarefas(self, individuos, opcoes):
+        if self.fluxos is None:
+            return [(individuo, opcoes) for individuo in individuos]
+        return [(individuo, dict(opcoes, semente=self.fluxos.semente_avaliacao(individuo)))
+                for individuo in individuos]
+
+    def avaliar_lote(self, individuos, executor=None, **opcoes):
+        ids = self.broker.enviar(self._tarefas(individuos, opcoes))
+        resultados = {}
+        while len(resultados) < len(ids):
+            resultados.update(self.broker.coletar([i for i in ids if i not in resultados]))
+            if len(resultados) < len(ids):
+                time.sleep(self.intervalo_consulta)
+        return [resultados[i] for i in ids]
+
+    def submeter(self, hiperparametros, executor=None, **opcoes):
+        """
+        Versão assíncrona de `__call__`, usada por `avaliacao.submeter`.
+
+        O trabalho é enviado ao broker na hora; uma thread com conexão própria
+        consulta os resultados dos trabalhos pendentes e conclui os futuros.
+        """
+        [id_trabalho] = self.broker.enviar(self._tarefas([hiperparametros], opcoes))
+        futuro = Future()
+        with self.trava:
+            self.aguardando[id_trabalho] = futuro
+            if self.coletor is None:
+                self.coletor = threading.Thread(target=self._coletar_aguardando, daemon=True)
+                self.coletor.start()
+        return futuro
+
+    def _coletar_aguardando(self):
+        # conexão própria: proxies não devem ser compartilhados entre threads
+        broker = conectar(self.endereco, self.chave)
+        while True:
+            with self.trava:
+                ids = list(self.aguardando)
+                if not ids:
+                    self.coletor = None
+                    return
+            resultados = broker.coletar(ids)
+            with self.trava:
+                futuros = [(self.aguardando.pop(i), valor) for i, valor in resultados.items()]
+            for futuro, valor in futuros:
+                futuro.set_result(valor)
+            if len(resultados) < len(ids):
+                time.sleep(self.intervalo_consulta)
+
+    def estatisticas(self):
+        return self.broker.estatisticas()
+
+    def __getstate__(self):
+        # o proxy e a coleta não são serializáveis; reconecta ao ser desserializado
+        estado = self.__dict__.copy()
+        for atributo in ("broker", "aguardando", "trava", "coletor"):
+            del estado[atributo]
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self.broker = conectar(self.endereco, self.chave)
+        self._iniciar_coleta()
+
+
+def iniciar_workers_locais(endereco, num_workers, chave, **opcoes_worker):
+    """Inicia `num_workers` workers como processos locais (útil para testes em uma máquina)."""
+    processos = []
+    for _ in range(num_workers):
+        processo = multiprocessing.Process(
+            target=executar_worker, args=(tuple(endereco), chave), kwargs=opcoes_worker, daemon=True
+        )
+        processo.start()
+        processos.append(processo)
+    return processos
+
+
+def _endereco(texto):
+    host, _, porta = texto.rpartition(":")
+    return (host, int(porta))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Broker e workers para avaliar a fitness em várias máquinas.")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    parser_broker = subparsers.add_parser("broker", help="Inicia o broker")
+    parser_broker.add_argument("--endereco", type=_endereco, default=ENDERECO_PADRAO,
+                               help="host:porta (padrão: só conexões locais; use 0.0.0.0:porta para a rede)")
+    parser_broker.add_argument("--chave", default=None, help="Chave de autenticação (padrão: gera uma nova)")
+    parser_broker.add_argument("--timeout-batimento", type=float, default=10.0)
+
+    parser_worker = subparsers.add_parser("worker", help="Conecta workers a um broker")
+    parser_worker.add_argument("--endereco", type=_endereco, required=True, help="host:porta do broker")
+    parser_worker.add_argument("--chave", required=True, help="Chave impressa pelo broker")
+    parser_worker.add_argument("--processos", type=int, default=1)
+    parser_worker.add_argument("--lote", type=int, default=4)
+    parser_worker.add_argument("--dados", default=None, help="Diretório preparado por dados.py")
+
+    args = parser.parse_args()
+    if args.comando == "broker":
+        servir_broker(args.endereco, args.chave and args.chave.encode(), args.timeout_batimento)
+    else:
+        workers = iniciar_workers_locais(
+            args.endereco, args.processos, args.chave.encode(),
+            tamanho_lote=args.lote, diretorio_dados=args.dados,
+        )
+        for processo in workers:
+            processo.join()
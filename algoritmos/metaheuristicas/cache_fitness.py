@@ -0,0 +1,291 @@
+import json
+import math
+import sqlite3
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+import instrumentacao
+from avaliacao import avaliar_lote as _avaliar_lote
+from avaliacao import submeter as _submeter
+from redeneural import calcular_fitness_rmse
+
+
+def chave_fenotipo(hiperparametros, digitos_lr=3):
+    """
+    Gera a chave canônica da arquitetura *efetiva* descrita pelos hiperparâmetros.
+
+    Os genes `neuronios_camada_k` com k > `numero_camadas` não influenciam a rede
+    treinada e por isso ficam de fora da chave. A taxa de aprendizado é
+    quantizada em `digitos_lr` algarismos significativos, de modo que valores
+    praticamente iguais compartilhem a mesma entrada da cache.
+
+    Args:
+        hiperparametros (dict): Dicionário com os valores dos hiperparâmetros.
+        digitos_lr (int): Algarismos significativos mantidos na taxa de aprendizado.
+
+    Returns:
+        str: Chave textual (JSON) que identifica o fenótipo.
+    """
+    num_camadas = int(hiperparametros["numero_camadas"])
+    camadas = [int(hiperparametros[f"neuronios_camada_{i+1}"]) for i in range(num_camadas)]
+    taxa = float(hiperparametros["taxa_aprendizado"])
+    taxa_quantizada = float(f"{taxa:.{digitos_lr - 1}e}")
+    return json.dumps([hiperparametros["ativacao"], taxa_quantizada, camadas])
+
+
+def _copiar_resultado(origem, destino):
+    if origem.exception() is not None:
+        destino.set_exception(origem.exception())
+    else:
+        destino.set_result(origem.result())
+
+
+class FitnessComCache:
+    """
+    Memoização da função de fitness, indexada pelo fenótipo da rede.
+
+    Mantém uma cache LRU em memória e, opcionalmente, um banco SQLite em disco
+    que sobrevive entre execuções. A instância é chamável e pode ser passada
+    diretamente como `funcao_fitness` para o Algoritmo Genético ou para a
+    Têmpera Simulada.
+
+    Se a função envolvida tiver semente (`sementes.FitnessSemeada`), ela faz
+    parte da chave: execuções com sementes diferentes não compartilham valores.
+
+    O `limiar_poda` não faz parte da chave. Um valor calculado com limiar pode
+    vir de um treino abortado, então fica só em memória, marcado com o seu
+    limiar, e só é reaproveitado por consultas com limiar igual ou menor (que
+    também teriam abortado o treino). Apenas avaliações sem limiar, sempre
+    completas, são gravadas no disco.
+
+    Se a função envolvida expõe `aquecera(hiperparametros)` (como a
+    `RepositorioPesos`), avaliações que partem de pesos pré-treinados não são
+    guardadas: o valor de um treino aquecido não substitui o de um treino do zero.
+    """
+
+    def __init__(self, funcao_fitness=calcular_fitness_rmse, max_entradas=1024,
+                 caminho_banco=None, max_entradas_banco=None, digitos_lr=3):
+        """
+        Args:
+            funcao_fitness (callable): Função avaliada em caso de falha na cache.
+            max_entradas (int): Limite de entradas da LRU em memória.
+            caminho_banco (str): Caminho do banco SQLite. Se None, usa só memória.
+            max_entradas_banco (int): Limite de entradas no disco (None = ilimitado).
+            digitos_lr (int): Algarismos significativos da taxa de aprendizado na chave.
+        """
+        self.funcao_fitness = funcao_fitness
+        self.max_entradas = max_entradas
+        self.max_entradas_banco = max_entradas_banco
+        self.digitos_lr = digitos_lr
+        self.semente = getattr(funcao_fitness, "semente", None)
+        self.memoria = OrderedDict()
+        self.limiares = {}          # chave -> limiar_poda das entradas em memória possivelmente podadas
+        self.em_voo = {}            # chave -> Future das avaliações submetidas e ainda não registradas
+        self.concluidas = deque()   # (chave, valor, limiar, guardar) preenchida pelos callbacks dos futuros
+
+        self.acertos_memoria = 0
+        self.acertos_disco = 0
+        self.falhas = 0
+
+        self.caminho_banco = caminho_banco
+        self.banco = None
+        if caminho_banco is not None:
+            self.banco = sqlite3.connect(caminho_banco)
+            self.banco.execute(
+                "CREATE TABLE IF NOT EXISTS fitness ("
+                "chave TEXT PRIMARY KEY, valor REAL NOT NULL, ultimo_acesso INTEGER NOT NULL)"
+            )
+            self.banco.commit()
+            self._relogio = self.banco.execute(
+                "SELECT COALESCE(MAX(ultimo_acesso), 0) FROM fitness"
+            ).fetchone()[0]
+
+    def semear(self, semente):
+        """Aplica a semente por avaliação na função envolvida (ver `sementes.semear_fitness`)."""
+        from sementes import semear_fitness
+
+        self.funcao_fitness = semear_fitness(self.funcao_fitness, semente)
+        self.semente = getattr(self.funcao_fitness, "semente", None)
+
+    def chave(self, hiperparametros, **opcoes):
+        # o limiar muda a cada geração/nível e é tratado à parte (ver `_consultar`)
+        opcoes.pop("limiar_poda", None)
+        chave = chave_fenotipo(hiperparametros, self.digitos_lr)
+        if self.semente is not None:
+            opcoes = dict(opcoes, semente=self.semente)
+        if opcoes:
+            # opções da avaliação (ex: fidelidade) fazem parte da chave
+            chave = json.dumps([chave, sorted(opcoes.items())])
+        return chave
+
+    def __call__(self, hiperparametros, **opcoes):
+        self._registrar_concluidas()
+        chave = self.chave(hiperparametros, **opcoes)
+        limiar = opcoes.get("limiar_poda")
+
+        valor = self._consultar(chave, limiar)
+        if valor is not None:
+            return valor
+
+        self.falhas += 1
+        instrumentacao.emitir("cache", status="falha", chave=chave)
+        guardar = not self._aquecera(hiperparametros)
+        valor = self.funcao_fitness(hiperparametros, **opcoes)
+        if guardar:
+            self._registrar(chave, valor, limiar)
+        return valor
+
+    def avaliar_lote(self, individuos, executor=None, **opcoes):
+        """
+        Avalia um lote consultando a cache antes; apenas os fenótipos ausentes
+        (sem repetição dentro do lote) são enviados à função de fitness.
+        """
+        self._registrar_concluidas()
+        chaves = [self.chave(individuo, **opcoes) for individuo in individuos]
+        limiar = opcoes.get("limiar_poda")
+        valores = {}
+        pendentes = {}
+        for chave, individuo in zip(chaves, individuos):
+            if chave in valores or chave in pendentes:
+                # repetição dentro do lote conta como acerto, como no caminho serial
+                self.acertos_memoria += 1
+                instrumentacao.emitir("cache", status="acerto_memoria", chave=chave)
+                continue
+            valor = self._consultar(chave, limiar)
+            if valor is None:
+                self.falhas += 1
+                instrumentacao.emitir("cache", status="falha", chave=chave)
+                pendentes[chave] = individuo
+            else:
+                valores[chave] = valor
+
+        aquecidos = {chave for chave, individuo in pendentes.items() if self._aquecera(individuo)}
+        resultados = _avaliar_lote(list(pendentes.values()), self.funcao_fitness, executor, **opcoes)
+        for chave, valor in zip(pendentes, resultados):
+            if chave not in aquecidos:
+                self._registrar(chave, valor, limiar)
+            valores[chave] = valor
+
+        return [valores[chave] for chave in chaves]
+
+    def submeter(self, hiperparametros, executor=None, **opcoes):
+        """
+        Versão assíncrona de `__call__`, usada por `avaliacao.submeter`.
+
+        Acertos voltam num `Future` já concluído; falhas são enviadas ao
+        `executor` e o valor entra na cache quando o treino termina. Um
+        fenótipo já em treino não é enviado de novo: o novo `Future` espera o
+        resultado do primeiro.
+        """
+        self._registrar_concluidas()
+        chave = self.chave(hiperparametros, **opcoes)
+        limiar = opcoes.get("limiar_poda")
+
+        valor = self._consultar(chave, limiar)
+        if valor is None and chave in self.em_voo and limiar == self.em_voo[chave][1]:
+            self.acertos_memoria += 1
+            instrumentacao.emitir("cache", status="acerto_memoria", chave=chave)
+            futuro = Future()
+            self.em_voo[chave][0].add_done_callback(lambda original: _copiar_resultado(original, futuro))
+            return futuro
+        if valor is not None:
+            futuro = Future()
+            futuro.set_result(valor)
+            return futuro
+
+        self.falhas += 1
+        instrumentacao.emitir("cache", status="falha", chave=chave)
+        guardar = not self._aquecera(hiperparametros)
+        futuro = _submeter(hiperparametros, self.funcao_fitness, executor, **opcoes)
+        self.em_voo[chave] = (futuro, limiar)
+
+        def concluir(original):
+            # roda na thread do executor: o SQLite só é usado pela thread principal
+            valor = original.result() if original.exception() is None else None
+            self.concluidas.append((chave, valor, limiar, guardar))
+
+        futuro.add_done_callback(concluir)
+        return futuro
+
+    def _registrar_concluidas(self):
+        while self.concluidas:
+            chave, valor, limiar, guardar = self.concluidas.popleft()
+            self.em_voo.pop(chave, None)
+            if guardar and valor is not None:
+                self._registrar(chave, valor, limiar)
+
+    def _aquecera(self, hiperparametros):
+        aquecera = getattr(self.funcao_fitness, "aquecera", None)
+        return aquecera is not None and aquecera(hiperparametros)
+
+    def _consultar(self, chave, limiar=None):
+        limiar_entrada = self.limiares.get(chave)
+        # um valor possivelmente podado só serve a consultas com limiar igual ou mais exigente
+        podado_valido = limiar_entrada is None or (limiar is not None and limiar <= limiar_entrada)
+        if chave in self.memoria and podado_valido:
+            self.memoria.move_to_end(chave)
+            self.acertos_memoria += 1
+            instrumentacao.emitir("cache", status="acerto_memoria", chave=chave)
+            return self.memoria[chave]
+
+        if self.banco is not None:
+            linha = self.banco.execute("SELECT valor FROM fitness WHERE chave = ?", (chave,)).fetchone()
+            if linha is not None:
+                self._relogio += 1
+                self.banco.execute("UPDATE fitness SET ultimo_acesso = ? WHERE chave = ?", (self._relogio, chave))
+                self.banco.commit()
+                self.acertos_disco += 1
+                instrumentacao.emitir("cache", status="acerto_disco", chave=chave)
+                self.limiares.pop(chave, None)
+                self._guardar_memoria(chave, linha[0])
+                return linha[0]
+        return None
+
+    def _registrar(self, chave, valor, limiar=None):
+        self._guardar_memoria(chave, valor)
+        if limiar is not None:
+            self.limiares[chave] = limiar
+            return
+        self.limiares.pop(chave, None)
+
+        # Falhas de treino (inf) podem ser transitórias e não são persistidas em disco
+        if self.banco is not None and math.isfinite(valor):
+            self._relogio += 1
+            self.banco.execute(
+                "INSERT OR REPLACE INTO fitness (chave, valor, ultimo_acesso) VALUES (?, ?, ?)",
+                (chave, float(valor), self._relogio),
+            )
+            if self.max_entradas_banco is not None:
+                # remove as entradas acessadas há mais tempo além do limite
+                self.banco.execute(
+                    "DELETE FROM fitness WHERE chave IN ("
+                    "SELECT chave FROM fitness ORDER BY ultimo_acesso DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entradas_banco,),
+                )
+            self.banco.commit()
+
+    def _guardar_memoria(self, chave, valor):
+        self.memoria[chave] = valor
+        self.memoria.move_to_end(chave)
+        while len(self.memoria) > self.max_entradas:
+            chave_removida, _ = self.memoria.popitem(last=False)
+            self.limiares.pop(chave_removida, None)
+
+    def estatisticas(self):
+        """Retorna os contadores de acertos/falhas da cache."""
+        self._registrar_concluidas()
+        acertos = self.acertos_memoria + self.acertos_disco
+        total = acertos + self.falhas
+        return {
+            "acertos_memoria": self.acertos_memoria,
+            "acertos_disco": self.acertos_disco,
+            "falhas": self.falhas,
+            "taxa_acerto": acertos / total if total else 0.0,
+            "entradas_memoria": len(self.memoria),
+        }
+
+    def fechar(self):
+        self._registrar_concluidas()
+        if self.banco is not None:
+            self.banco.close()
+            self.banco = None
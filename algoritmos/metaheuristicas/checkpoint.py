@@ -0,0 +1,42 @@
+import os
+import pickle
+import random
+
+import numpy as np
+
+
+def estado_geradores():
+    """Captura o estado dos geradores aleatórios globais (`random` e NumPy)."""
+    return {"random": random.getstate(), "numpy": np.random.get_state()}
+
+
+def restaurar_geradores(estado):
+    """Restaura o estado capturado por `estado_geradores`."""
+    random.setstate(estado["random"])
+    np.random.set_state(estado["numpy"])
+
+
+def salvar_checkpoint(caminho, estado):
+    """
+    Grava o estado de uma execução de forma atômica.
+
+    O conteúdo é escrito em um arquivo temporário no mesmo diretório e só então
+    renomeado por cima do checkpoint anterior, de modo que uma interrupção no
+    meio da escrita nunca deixa um checkpoint corrompido.
+
+    Args:
+        caminho (str): Caminho do arquivo de checkpoint.
+        estado (dict): Estado a salvar (precisa ser serializável com pickle).
+    """
+    temporario = f"{caminho}.tmp"
+    with open(temporario, 'wb') as f:
+        pickle.dump(estado, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporario, caminho)
+
+
+def carregar_checkpoint(caminho):
+    """Lê um checkpoint gravado por `salvar_checkpoint`."""
+    with open(caminho, 'rb') as f:
+        return pickle.load(f)
@@ -0,0 +1,285 @@
+import argparse
+import json
+import os
+import random
+import time
+
+from solucao_inicial import ARQUIVO_POPULACAO, ARQUIVO_SOLUCAO_TEMPERA, solucao_inicial_genetico, solucao_inicial_tempera
+
+# Funções de fitness selecionáveis pela configuração
+FITNESS = ("real", "sintetica")
+
+
+def carregar_config(caminho):
+    """
+    Lê a configuração de uma execução a partir de um arquivo JSON ou YAML.
+
+    YAML exige o PyYAML (`pip install pyyaml`), importado só quando necessário.
+
+    Returns:
+        dict: A configuração (vazia se `caminho` for None).
+    """
+    if caminho is None:
+        return {}
+    with open(caminho, 'r', encoding='utf-8') as f:
+        if os.path.splitext(caminho)[1].lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Configurações em YAML precisam do PyYAML: pip install pyyaml") from None
+            return yaml.safe_load(f) or {}
+        return json.load(f)
+
+
+def criar_espaco_busca(config):
+    """O espaço de busca da configuração ('espaco_busca'), ou o padrão da MLP."""
+    if "espaco_busca" in config:
+        from espaco_busca import EspacoBusca
+
+        return EspacoBusca(config["espaco_busca"])
+    from redeneural import definicoes_hiperparametros
+
+    return definicoes_hiperparametros
+
+
+def criar_fitness(config):
+    """
+    Monta a função de fitness descrita pela configuração.
+
+    'fitness' escolhe entre o treino real da MLP e a fitness sintética (sem
+    scikit-learn); 'dados' aponta para um conjunto preparado por `dados.py`;
+    'cache' ativa a cache persistente no arquivo SQLite informado. Com
+    'semente', cada avaliação recebe uma semente própria, derivada do
+    fenótipo (ver `sementes.FitnessSemeada`), por baixo da cache.
+    """
+    nome = config.get("fitness", "real")
+    if nome not in FITNESS:
+        raise ValueError(f"Fitness '{nome}' não suportada. Use uma de {FITNESS}.")
+    if nome == "sintetica":
+        from utils import fitness_sintetica as funcao
+    else:
+        import redeneural
+
+        if config.get("dados"):
+            redeneural.usar_conjunto_dados(config["dados"])
+        funcao = redeneural.calcular_fitness_rmse
+
+    if config.get("semente") is not None:
+        from sementes import FitnessSemeada
+
+        funcao = FitnessSemeada(funcao, config["semente"])
+    if config.get("cache"):
+        from cache_fitness import FitnessComCache
+
+        return FitnessComCache(funcao, caminho_banco=config["cache"])
+    return funcao
+
+
+def criar_orcamento(config):
+    if not config.get("orcamento"):
+        return None
+    from orcamento import Orcamento
+
+    return Orcamento(**config["orcamento"])
+
+
+def criar_recursos(config):
+    """
+    (workers, threads_blas) da configuração. Com "workers": "auto", usa o ajuste
+    gravado para esta máquina ou mede as divisões (ver `ajuste_recursos`).
+    """
+    if config.get("workers") == "auto":
+        from ajuste_recursos import configuracao_recursos
+
+        return configuracao_recursos(criar_espaco_busca(config))
+    return config.get("workers", 1), config.get("threads_blas")
+
+
+def criar_multifidelidade(opcoes):
+    if not opcoes:
+        return None
+    from multifidelidade import SuccessiveHalving
+
+    return SuccessiveHalving(**(opcoes if isinstance(opcoes, dict) else {}))
+
+
+def ler_json(caminho, descricao):
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise SystemExit(f"ERRO: Arquivo de {descricao} '{caminho}' não encontrado. "
+                         f"Gere-o com o subcomando 'inicial'.")
+
+
+def gravar_json(caminho, conteudo):
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(conteudo, f, ensure_ascii=False, indent=4, default=float)
+    print(f"-> Salvo em '{caminho}'")
+
+
+def comando_inicial(args, config):
+    """Gera a população inicial do AG e a solução inicial da Têmpera Simulada."""
+    secao = config.get("inicial", {})
+    espaco = criar_espaco_busca(config)
+    tamanho = args.tamanho or secao.get("tamanho_populacao", 20)
+    rng = random
+    if config.get("semente") is not None:
+        from sementes import FLUXO_INICIAL, FluxosAleatorios
+
+        rng = FluxosAleatorios(config["semente"]).gerador(FLUXO_INICIAL)
+
+    gravar_json(args.saida_tempera or secao.get("solucao_tempera", ARQUIVO_SOLUCAO_TEMPERA),
+                solucao_inicial_tempera(espaco, rng))
+    gravar_json(args.saida_populacao or secao.get("populacao", ARQUIVO_POPULACAO),
+                solucao_inicial_genetico(espaco, tamanho, rng))
+    return None
+
+
+def comando_genetico(args, config):
+    """Executa o Algoritmo Genético com os parâmetros da seção 'genetico'."""
+    from algoritmogenetico import algoritmo_genetico
+
+    secao = dict(config.get("genetico", {}))
+    caminho_populacao = secao.pop("populacao", ARQUIVO_POPULACAO)
+    populacao = ler_json(args.populacao or caminho_populacao, "população inicial")
+    tamanho_populacao = secao.pop("tamanho_populacao", len(populacao))
+    multifidelidade = criar_multifidelidade(secao.pop("multifidelidade", None))
+    orcamento = criar_orcamento(config)
+    funcao_fitness = criar_fitness(config)
+    workers, threads_blas = criar_recursos(config)
+
+    melhor = algoritmo_genetico(
+        populacao,
+        tamanho_populacao,
+        secao.pop("num_geracoes", 50),
+        secao.pop("pm", 0.4),
+        criar_espaco_busca(config),
+        funcao_fitness,
+        workers=workers,
+        threads_blas=threads_blas,
+        multifidelidade=multifidelidade,
+        orcamento=orcamento,
+        semente=config.get("semente"),
+        **secao,
+    )
+    return {"melhor": melhor, "score": melhor["fitness"], "funcao_fitness": funcao_fitness, "orcamento": orcamento}
+
+
+def comando_tempera(args, config):
+    """Executa a Têmpera Simulada com os parâmetros da seção 'tempera'."""
+    from temperasimulada import tempera_simulada
+
+    secao = dict(config.get("tempera", {}))
+    caminho_solucao = secao.pop("solucao", ARQUIVO_SOLUCAO_TEMPERA)
+    solucao = ler_json(args.solucao or caminho_solucao, "solução inicial")
+    opcoes_resfriamento = secao.pop("resfriamento", None)
+    resfriamento = None
+    if opcoes_resfriamento:
+        from resfriamento import ResfriamentoAdaptativo
+
+        # `true` usa os valores padrão; um objeto repassa os parâmetros
+        resfriamento = ResfriamentoAdaptativo(**(opcoes_resfriamento if isinstance(opcoes_resfriamento, dict) else {}))
+    multifidelidade = criar_multifidelidade(secao.pop("multifidelidade", None))
+    orcamento = criar_orcamento(config)
+    funcao_fitness = criar_fitness(config)
+    workers, threads_blas = criar_recursos(config)
+
+    melhor, score = tempera_simulada(
+        solucao,
+        secao.pop("temperatura_inicial", 1.0),
+        secao.pop("taxa_resfriamento", 0.2),
+        secao.pop("temperatura_minima", 0.00001),
+        criar_espaco_busca(config),
+        funcao_fitness=funcao_fitness,
+        workers=workers,
+        threads_blas=threads_blas,
+        multifidelidade=multifidelidade,
+        orcamento=orcamento,
+        resfriamento=resfriamento,
+        semente=config.get("semente"),
+        **secao,
+    )
+    return {"melhor": melhor, "score": score, "funcao_fitness": funcao_fitness, "orcamento": orcamento}
+
+
+COMANDOS = {
+    "inicial": comando_inicial,
+    "genetico": comando_genetico,
+    "tempera": comando_tempera,
+}
+
+
+def _workers(texto):
+    return texto if texto == "auto" else int(texto)
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m algoritmos.metaheuristicas",
+        description="Busca de hiperparâmetros de MLPs com Algoritmo Genético e Têmpera Simulada.",
+    )
+    comum = argparse.ArgumentParser(add_help=False)
+    comum.add_argument("--config", help="Arquivo JSON ou YAML com espaço de busca, orçamento, workers, ...")
+    comum.add_argument("--semente", type=int, default=None,
+                       help="Semente da execução: o resultado não depende de workers, cache ou lote especulativo")
+    comum.add_argument("--workers", type=_workers, default=None,
+                       help="Processos de avaliação, ou 'auto' para ajustar workers x threads BLAS")
+    comum.add_argument("--threads-blas", dest="threads_blas", type=int, default=None, help="Threads BLAS por worker")
+    comum.add_argument("--fitness", choices=FITNESS, default=None, help="Sobrescreve 'fitness' da configuração")
+    comum.add_argument("--saida", help="Grava o resultado da execução neste arquivo JSON")
+
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    parser_inicial = subparsers.add_parser("inicial", parents=[comum], help="Gera as soluções iniciais")
+    parser_inicial.add_argument("--tamanho", type=int, default=None, help="Tamanho da população do AG")
+    parser_inicial.add_argument("--saida-populacao", default=None)
+    parser_inicial.add_argument("--saida-tempera", default=None)
+
+    parser_genetico = subparsers.add_parser("genetico", parents=[comum], help="Executa o Algoritmo Genético")
+    parser_genetico.add_argument("--populacao", default=None, help="JSON com a população inicial")
+
+    parser_tempera = subparsers.add_parser("tempera", parents=[comum], help="Executa a Têmpera Simulada")
+    parser_tempera.add_argument("--solucao", default=None, help="JSON com a solução inicial")
+    return parser
+
+
+def main(argv=None):
+    """
+    Ponto de entrada único: `python -m algoritmos.metaheuristicas <comando> [--config arquivo]`.
+
+    Argumentos da linha de comando têm precedência sobre a configuração. Com
+    `--saida`, o melhor indivíduo, o score, o tempo e o resumo do orçamento
+    são gravados em JSON, para que execuções em lote sejam comparadas por script.
+    """
+    args = criar_parser().parse_args(argv)
+    config = carregar_config(args.config)
+    for chave in ("semente", "workers", "threads_blas", "fitness"):
+        if getattr(args, chave) is not None:
+            config[chave] = getattr(args, chave)
+    if config.get("semente") is not None:
+        random.seed(config["semente"])
+
+    inicio = time.perf_counter()
+    resultado = COMANDOS[args.comando](args, config)
+    if resultado is None:
+        return
+
+    funcao_fitness = resultado.pop("funcao_fitness")
+    if hasattr(funcao_fitness, "estatisticas"):
+        print(f"Cache de fitness: {funcao_fitness.estatisticas()}")
+        funcao_fitness.fechar()
+    orcamento = resultado.pop("orcamento")
+
+    print("\nMelhor indivíduo encontrado:")
+    for nome, valor in resultado["melhor"].items():
+        print(f" | {nome}: {valor}")
+
+    if args.saida:
+        gravar_json(args.saida, {
+            "comando": args.comando,
+            "config": config,
+            "melhor": resultado["melhor"],
+            "score": resultado["score"],
+            "tempo": time.perf_counter() - inicio,
+            "orcamento": orcamento.resumo() if orcamento is not None else None,
+        })
@@ -0,0 +1,113 @@
+import argparse
+import os
+
+import numpy as np
+
+ARQUIVOS = ("X_treino", "X_teste", "y_treino", "y_teste")
+
+# Linhas processadas por vez ao escalar e gravar os arrays
+TAMANHO_BLOCO = 100_000
+
+
+def _ler_origem(origem, coluna_alvo):
+    """
+    Lê o dataset de origem e retorna (X, y), possivelmente como memmaps.
+
+    Aceita None (dataset Diabetes do scikit-learn), um `.npy` com a matriz
+    completa (alvo na coluna `coluna_alvo`), um `.npz` com os arrays `X` e `y`,
+    ou um CSV numérico com cabeçalho.
+    """
+    if origem is None:
+        from sklearn.datasets import load_diabetes
+
+        diabetes = load_diabetes()
+        return diabetes.data, diabetes.target
+
+    extensao = os.path.splitext(origem)[1].lower()
+    if extensao == ".npz":
+        arrays = np.load(origem)
+        return arrays["X"], arrays["y"]
+    if extensao == ".npy":
+        # mmap evita carregar um .npy grande inteiro na memória
+        matriz = np.load(origem, mmap_mode='r')
+    else:
+        matriz = np.loadtxt(origem, delimiter=",", skiprows=1, ndmin=2)
+
+    coluna_alvo = coluna_alvo % matriz.shape[1]
+    colunas_X = [j for j in range(matriz.shape[1]) if j != coluna_alvo]
+    return matriz[:, colunas_X], matriz[:, coluna_alvo]
+
+
+def preparar_conjunto(diretorio, origem=None, coluna_alvo=-1, test_size=0.25, random_state=42):
+    """
+    Particiona e normaliza o dataset uma única vez e grava os arrays em `.npy`.
+
+    A divisão treino/teste é a mesma de `train_test_split(random_state=42)`, e o
+    `StandardScaler` é ajustado só no treino, como em `carregar_dados_diabetes`.
+    O processamento é feito em blocos, então datasets maiores que a memória
+    disponível podem ser preparados a partir de um `.npy`.
+
+    Args:
+        diretorio (str): Diretório de destino (ex: em /dev/shm para ficar em RAM).
+        origem (str): Arquivo CSV/NPY/NPZ. Se None, usa o dataset Diabetes.
+        coluna_alvo (int): Coluna do alvo em arquivos CSV/NPY.
+        test_size (float): Fração reservada para teste.
+        random_state (int): Semente da divisão treino/teste.
+
+    Returns:
+        str: O diretório com os arrays preparados.
+    """
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+
+    X, y = _ler_origem(origem, coluna_alvo)
+    indices_treino, indices_teste = train_test_split(
+        np.arange(len(y)), test_size=test_size, random_state=random_state
+    )
+
+    scaler = StandardScaler()
+    for inicio in range(0, len(indices_treino), TAMANHO_BLOCO):
+        scaler.partial_fit(X[indices_treino[inicio:inicio + TAMANHO_BLOCO]])
+
+    os.makedirs(diretorio, exist_ok=True)
+    for nome_X, nome_y, indices in (("X_treino", "y_treino", indices_treino),
+                                    ("X_teste", "y_teste", indices_teste)):
+        destino_X = np.lib.format.open_memmap(
+            os.path.join(diretorio, f"{nome_X}.npy"), mode='w+', dtype=np.float64,
+            shape=(len(indices), X.shape[1]),
+        )
+        for inicio in range(0, len(indices), TAMANHO_BLOCO):
+            bloco = indices[inicio:inicio + TAMANHO_BLOCO]
+            destino_X[inicio:inicio + len(bloco)] = scaler.transform(X[bloco])
+        destino_X.flush()
+        del destino_X
+        np.save(os.path.join(diretorio, f"{nome_y}.npy"), np.asarray(y[indices], dtype=np.float64))
+
+    return diretorio
+
+
+def abrir_conjunto(diretorio):
+    """
+    Abre os arrays preparados como memmaps somente leitura.
+
+    Todos os processos que abrem o mesmo diretório compartilham as páginas do
+    arquivo através do cache do sistema operacional, sem cópias por worker.
+
+    Returns:
+        tuple: (X_treino, X_teste, y_treino, y_teste)
+    """
+    return tuple(np.load(os.path.join(diretorio, f"{nome}.npy"), mmap_mode='r') for nome in ARQUIVOS)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Prepara um dataset em .npy para uso compartilhado pelos workers.")
+    parser.add_argument("destino", help="Diretório onde os arrays serão gravados (ex: /dev/shm/diabetes)")
+    parser.add_argument("--origem", default=None, help="CSV/NPY/NPZ de origem (padrão: dataset Diabetes)")
+    parser.add_argument("--coluna-alvo", type=int, default=-1)
+    parser.add_argument("--test-size", type=float, default=0.25)
+    args = parser.parse_args()
+
+    preparar_conjunto(args.destino, args.origem, args.coluna_alvo, args.test_size)
+    X_treino, X_teste, _, _ = abrir_conjunto(args.destino)
+    print(f"-> Conjunto salvo em '{args.destino}': {X_treino.shape[0]} linhas de treino, "
+          f"{X_teste.shape[0]} de teste, {X_treino.shape[1]} atributos")
@@ -0,0 +1,121 @@
+import random
+
+from utils import _perturbar_choice, _perturbar_float, _perturbar_int
+
+TIPOS = ("int", "float", "choice")
+
+# Tentativas de sortear um valor diferente do atual antes de desistir (ex: intervalo de um só valor)
+MAX_TENTATIVAS = 20
+
+
+class EspacoBusca(dict):
+    """
+    Espaço de busca tipado e condicional.
+
+    É um dicionário no mesmo formato de `definicoes_hiperparametros` (nome ->
+    {"type", "min", "max"} ou {"type", "options"}), então pode ser passado a
+    qualquer função que espera as definições. Cada parâmetro pode ter uma
+    condição de atividade em "ativo_se": {"numero_camadas": 3} significa que o
+    gene só influencia a rede se `numero_camadas >= 3`.
+
+    Genes inativos continuam nos indivíduos (voltam a valer se o número de
+    camadas aumentar), mas os operadores deste espaço só alteram genes ativos,
+    de modo que mutações e perturbações sempre produzem um fenótipo diferente
+    do original. `utils.mutacao`, `utils.perturba` e `solucao_inicial` delegam
+    a estes operadores quando recebem um `EspacoBusca`. Como eles, todos os
+    operadores aceitam um gerador `rng` (padrão: o módulo `random`).
+    """
+
+    def __init__(self, definicoes):
+        super().__init__(definicoes)
+        for nome, definicao in self.items():
+            tipo = definicao.get("type")
+            if tipo not in TIPOS:
+                raise ValueError(f"Tipo de hiperparâmetro '{tipo}' não suportado para '{nome}'. Use 'int', 'float' ou 'choice'.")
+            if tipo == "choice" and not definicao.get("options"):
+                raise ValueError(f"Para o tipo 'choice', a chave 'options' com uma lista não vazia é obrigatória para '{nome}'.")
+            if tipo != "choice" and (definicao.get("min") is None or definicao.get("max") is None):
+                raise ValueError(f"Para o tipo '{tipo}', 'min' e 'max' são obrigatórios para '{nome}'.")
+            for condicionante in definicao.get("ativo_se", {}):
+                if condicionante not in self:
+                    raise ValueError(f"'{nome}' depende de '{condicionante}', que não está no espaço de busca.")
+
+    def ativo(self, nome, individuo):
+        """True se o gene `nome` influencia o fenótipo do indivíduo."""
+        return all(individuo[condicionante] >= limite
+                   for condicionante, limite in self[nome].get("ativo_se", {}).items())
+
+    def genes_ativos(self, individuo):
+        return [nome for nome in self if self.ativo(nome, individuo)]
+
+    def codificar(self, individuo):
+        """
+        Codificação canônica do fenótipo: os pares (gene, valor) dos genes ativos,
+        na ordem do espaço. Indivíduos que só diferem em genes inativos têm a
+        mesma codificação.
+        """
+        return tuple((nome, individuo[nome]) for nome in self.genes_ativos(individuo))
+
+    def sortear_valor(self, nome, rng=random):
+        definicao = self[nome]
+        tipo = definicao["type"]
+        if tipo == "choice":
+            return rng.choice(definicao["options"])
+        if tipo == "int":
+            return rng.randint(definicao["min"], definicao["max"])
+        return rng.uniform(definicao["min"], definicao["max"])
+
+    def amostrar(self, n, rng=random):
+        """
+        Sorteia `n` indivíduos uniformemente no espaço (todos os genes, inclusive
+        os inativos). Consome o gerador na mesma ordem que `gerar_solucao_inicial`.
+
+        Returns:
+            list: Lista de dicionários de hiperparâmetros.
+        """
+        return [{nome: self.sortear_valor(nome, rng) for nome in self} for _ in range(n)]
+
+    def mutar(self, individuo, pm, rng=random):
+        """
+        Mutação uniforme restrita aos genes ativos.
+
+        Cada gene ativo (avaliado já com as mutações anteriores, então aumentar
+        `numero_camadas` ativa as novas camadas) é sorteado de novo com
+        probabilidade `pm`. Se nenhum gene ativo mudar de valor, um deles é
+        forçado a mudar, para que o filho nunca repita o fenótipo do pai.
+        """
+        mutado = individuo.copy()
+        for nome in self:
+            if nome in mutado and self.ativo(nome, mutado) and rng.random() < pm:
+                mutado[nome] = self.sortear_valor(nome, rng)
+
+        if self.codificar(mutado) == self.codificar(individuo):
+            nome = rng.choice(self.genes_ativos(mutado))
+            for _ in range(MAX_TENTATIVAS):
+                mutado[nome] = self.sortear_valor(nome, rng)
+                if mutado[nome] != individuo[nome]:
+                    break
+        return mutado
+
+    def perturbar(self, H_atual, temperatura_atual, temperatura_inicial, rng=random):
+        """
+        Perturbação da Têmpera Simulada restrita aos genes ativos, com os mesmos
+        passos dependentes da temperatura de `utils.perturba`. Um passo que não
+        altera o valor (ex: cortado no limite do intervalo) é sorteado de novo.
+        """
+        H_novo = H_atual.copy()
+        nome = rng.choice(self.genes_ativos(H_atual))
+        definicao = self[nome]
+        fator_temperatura = temperatura_atual / (temperatura_inicial + 1e-9)
+
+        for _ in range(MAX_TENTATIVAS):
+            if definicao["type"] == "float":
+                novo_valor = _perturbar_float(nome, H_atual[nome], definicao, fator_temperatura, rng)
+            elif definicao["type"] == "int":
+                novo_valor = _perturbar_int(nome, H_atual[nome], definicao, fator_temperatura, rng)
+            else:
+                novo_valor = _perturbar_choice(H_atual[nome], definicao, rng)
+            if novo_valor != H_atual[nome]:
+                break
+        H_novo[nome] = novo_valor
+        return H_novo
@@ -0,0 +1,217 @@
+import json
+import multiprocessing
+import queue
+import random
+
+import redeneural
+from redeneural import calcular_fitness_rmse
+from sementes import FLUXO_ILHAS, FLUXO_INICIAL, FluxosAleatorios, semear_fitness, semente_aleatoria
+from solucao_inicial import ARQUIVO_POPULACAO, solucao_inicial_genetico
+from utils import cruzamento, mutacao, selecao_torneio, seleciona_melhores
+
+TOPOLOGIAS = ("anel", "completa")
+
+
+def destinos_migracao(indice, num_ilhas, topologia):
+    """
+    Ilhas que recebem os migrantes da ilha `indice`.
+
+    No anel cada ilha envia para a seguinte; na topologia completa, para todas
+    as outras.
+    """
+    if topologia == "anel":
+        return [(indice + 1) % num_ilhas] if num_ilhas > 1 else []
+    if topologia == "completa":
+        return [j for j in range(num_ilhas) if j != indice]
+    raise ValueError(f"Topologia '{topologia}' não suportada. Use uma de {TOPOLOGIAS}.")
+
+
+def evoluir(populacao, num_geracoes, pm, definicoes_hp, funcao_fitness, fluxos=None, indice=0, geracao_inicial=0):
+    """
+    Executa `num_geracoes` gerações do AG sobre uma população já avaliada,
+    com os mesmos operadores de `algoritmo_genetico`.
+
+    Com `fluxos` (`sementes.FluxosAleatorios`), o filho k da geração g da ilha
+    `indice` é gerado com o fluxo (indice, g, k); sem ele, com o `random` global.
+
+    Returns:
+        list: A nova população, ordenada do melhor para o pior.
+    """
+    tamanho_populacao = len(populacao)
+    for geracao in range(geracao_inicial, geracao_inicial + num_geracoes):
+        populacao_nova = []
+        while len(populacao_nova) < tamanho_populacao:
+            rng = random if fluxos is None else fluxos.gerador(FLUXO_ILHAS, indice, geracao, len(populacao_nova))
+            pai1 = selecao_torneio(populacao, rng=rng)
+            pai2 = selecao_torneio(populacao, rng=rng)
+            filho = mutacao(cruzamento(pai1, pai2, rng), pm, definicoes_hp, rng)
+            filho['fitness'] = funcao_fitness(filho)
+            populacao_nova.append(filho)
+        populacao = seleciona_melhores(populacao + populacao_nova, tamanho_populacao)
+    return populacao
+
+
+def executar_ilha(indice, populacao_inicial, tamanho_ilha, num_geracoes, intervalo_migracao,
+                  num_migrantes, pm, definicoes_hp, funcao_fitness, semente,
+                  caixas_entrada, destinos, num_origens, resultados, diretorio_dados):
+    """
+    Laço de uma ilha, executado em um processo próprio.
+
+    A cada `intervalo_migracao` gerações, os `num_migrantes` melhores indivíduos
+    são enviados às ilhas de `destinos` e a ilha espera os migrantes das suas
+    `num_origens` vizinhas, que substituem os piores indivíduos quando são
+    melhores que eles. A única comunicação entre processos são esses poucos
+    indivíduos por época.
+    """
+    redeneural.inicializar_worker(diretorio_dados)
+    fluxos = FluxosAleatorios(semente)
+
+    populacao = [individuo.copy() for individuo in populacao_inicial]
+    if len(populacao) < tamanho_ilha:
+        populacao += solucao_inicial_genetico(definicoes_hp, tamanho_ilha - len(populacao),
+                                              fluxos.gerador(FLUXO_INICIAL, indice))
+    for individuo in populacao:
+        individuo['fitness'] = funcao_fitness({k: v for k, v in individuo.items() if k != 'fitness'})
+    populacao = seleciona_melhores(populacao, tamanho_ilha)
+
+    historico = []
+    geracao = 0
+    while geracao < num_geracoes:
+        passo = min(intervalo_migracao, num_geracoes - geracao)
+        populacao = evoluir(populacao, passo, pm, definicoes_hp, funcao_fitness, fluxos, indice, geracao)
+        geracao += passo
+        historico.append(float(populacao[0]['fitness']))
+
+        if geracao < num_geracoes and destinos:
+            for destino in destinos:
+                caixas_entrada[destino].put([individuo.copy() for individuo in populacao[:num_migrantes]])
+            imigrantes = []
+            for _ in range(num_origens):
+                imigrantes += caixas_entrada[indice].get()
+            # ordena para que a ordem de chegada não altere o resultado
+            imigrantes.sort(key=lambda individuo: individuo['fitness'])
+            populacao = seleciona_melhores(populacao + imigrantes, tamanho_ilha)
+
+        print(f"Ilha {indice} | Geração {geracao}/{num_geracoes} | Melhor RMSE: {populacao[0]['fitness']:.4f}")
+
+    resultados.put((indice, populacao, historico))
+
+
+def algoritmo_genetico_ilhas(populacao_inicial, num_ilhas, num_geracoes, pm, definicoes_hp,
+                             funcao_fitness=calcular_fitness_rmse, tamanho_ilha=None,
+                             intervalo_migracao=5, num_migrantes=1, topologia="anel", semente=None):
+    """
+    Algoritmo Genético no modelo de ilhas.
+
+    A população inicial é dividida entre `num_ilhas` subpopulações, cada uma
+    evoluindo em um processo próprio com seu laço de torneio, cruzamento e
+    mutação. A cada `intervalo_migracao` gerações as ilhas trocam seus melhores
+    indivíduos seguindo a `topologia`. Como cada ilha só espera pelas suas
+    vizinhas e troca poucos indivíduos, a execução escala quase linearmente com
+    o número de núcleos, e as ilhas mantêm mais diversidade que uma única população.
+
+    Args:
+        populacao_inicial (list): Indivíduos distribuídos entre as ilhas (alternadamente).
+        num_ilhas (int): Número de ilhas (processos).
+        num_geracoes (int): Gerações de cada ilha.
+        pm (float | list): Probabilidade de mutação, comum ou uma por ilha.
+        definicoes_hp (dict): Definições dos hiperparâmetros para a mutação.
+        funcao_fitness (callable): Função que recebe um indivíduo e retorna o RMSE
+            (precisa ser serializável com pickle).
+        tamanho_ilha (int): Indivíduos por ilha. Se maior que a fatia da
+            população inicial, a ilha completa a sua com indivíduos aleatórios.
+            Se None, usa o tamanho da fatia.
+        intervalo_migracao (int): Gerações entre duas migrações.
+        num_migrantes (int): Melhores indivíduos enviados a cada vizinha.
+        topologia (str): 'anel' ou 'completa'.
+        semente (int): Semente da execução. Cada ilha sorteia com os seus
+            próprios fluxos de `sementes.FluxosAleatorios` e cada avaliação
+            recebe a semente do seu fenótipo (`sementes.FitnessSemeada`).
+
+    Returns:
+        dict: O melhor indivíduo encontrado entre todas as ilhas.
+    """
+    pms = list(pm) if isinstance(pm, (list, tuple)) else [pm] * num_ilhas
+    if len(pms) != num_ilhas:
+        raise ValueError("É preciso uma probabilidade de mutação por ilha")
+
+    fatias = [populacao_inicial[i::num_ilhas] for i in range(num_ilhas)]
+    tamanhos = [tamanho_ilha or len(fatia) for fatia in fatias]
+    if min(tamanhos) < 3:
+        raise ValueError("Cada ilha precisa de pelo menos 3 indivíduos (tamanho do torneio)")
+
+    funcao_fitness = semear_fitness(funcao_fitness, semente)
+    semente = semente if semente is not None else semente_aleatoria()
+    destinos = [destinos_migracao(i, num_ilhas, topologia) for i in range(num_ilhas)]
+    num_origens = [sum(i in d for d in destinos) for i in range(num_ilhas)]
+
+    caixas_entrada = [multiprocessing.Queue() for _ in range(num_ilhas)]
+    resultados = multiprocessing.Queue()
+    processos = [
+        multiprocessing.Process(
+            target=executar_ilha,
+            args=(i, fatias[i], tamanhos[i], num_geracoes, intervalo_migracao, num_migrantes,
+                  pms[i], definicoes_hp, funcao_fitness, semente, caixas_entrada, destinos[i],
+                  num_origens[i], resultados, redeneural.diretorio_dados),
+        )
+        for i in range(num_ilhas)
+    ]
+
+    populacoes = [None] * num_ilhas
+    historicos = [None] * num_ilhas
+    recebidos = 0
+    try:
+        for processo in processos:
+            processo.start()
+        while recebidos < num_ilhas:
+            try:
+                indice, populacao, historico = resultados.get(timeout=1.0)
+            except queue.Empty:
+                falhas = [p for p in processos if p.exitcode not in (None, 0)]
+                if falhas:
+                    raise RuntimeError(f"{len(falhas)} ilha(s) terminaram com erro")
+                continue
+            populacoes[indice], historicos[indice] = populacao, historico
+            recebidos += 1
+    finally:
+        for processo in processos:
+            if processo.is_alive() and recebidos < num_ilhas:
+                processo.terminate()
+            processo.join()
+
+    melhores = [populacao[0] for populacao in populacoes]
+    for i, melhor in enumerate(melhores):
+        print(f"Ilha {i} (pm={pms[i]}) | Melhor RMSE: {melhor['fitness']:.4f} | "
+              f"Evolução: {[round(valor, 4) for valor in historicos[i]]}")
+    return min(melhores, key=lambda individuo: individuo['fitness'])
+
+
+if __name__ == '__main__':
+    from redeneural import definicoes_hiperparametros
+
+    nome_arquivo_genetico = ARQUIVO_POPULACAO
+    try:
+        with open(nome_arquivo_genetico, 'r', encoding='utf-8') as f:
+            pop_inicial = json.load(f)
+    except FileNotFoundError:
+        print(f"ERRO: Arquivo '{nome_arquivo_genetico}' não encontrado.")
+        exit()
+
+    print("############################ INICIO AG EM ILHAS ##############################")
+
+    melhor_individuo_encontrado = algoritmo_genetico_ilhas(
+        pop_inicial,
+        num_ilhas=4,
+        num_geracoes=50,
+        pm=[0.2, 0.3, 0.4, 0.5],
+        definicoes_hp=definicoes_hiperparametros,
+        tamanho_ilha=10,
+        intervalo_migracao=5,
+        num_migrantes=2,
+        topologia="anel",
+        semente=42,
+    )
+
+    print("\nMelhor indivíduo encontrado:")
+    for nome, valor_gerado in melhor_individuo_encontrado.items():
+        print(f" | {nome}: {valor_gerado}")
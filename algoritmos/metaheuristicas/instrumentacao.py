@@ -0,0 +1,109 @@
+import json
+import math
+import time
+
+from avaliacao import avaliar_lote
+from redeneural import avaliar_com_registro
+
+# Destino atual dos eventos (None = instrumentação desligada)
+_rastreador = None
+
+
+class RastreadorJSONL:
+    """Grava cada evento como uma linha JSON em um arquivo."""
+
+    def __init__(self, caminho):
+        self.arquivo = open(caminho, 'a', encoding='utf-8')
+
+    def __call__(self, evento):
+        self.arquivo.write(json.dumps(evento, ensure_ascii=False, default=_serializar) + "\n")
+        self.arquivo.flush()
+
+    def fechar(self):
+        self.arquivo.close()
+
+
+def _serializar(valor):
+    # tipos NumPy (float64, int64) chegam aqui a partir das métricas
+    if hasattr(valor, "item"):
+        return valor.item()
+    return str(valor)
+
+
+def definir_rastreador(rastreador):
+    """
+    Define o destino dos eventos de instrumentação.
+
+    Args:
+        rastreador (callable | str | None): Função que recebe cada evento (dict),
+            caminho de um arquivo JSONL, ou None para desligar.
+
+    Returns:
+        O rastreador anterior.
+    """
+    global _rastreador
+    anterior = _rastreador
+    if isinstance(rastreador, str):
+        rastreador = RastreadorJSONL(rastreador)
+    _rastreador = rastreador
+    return anterior
+
+
+def ativo():
+    return _rastreador is not None
+
+
+def emitir(tipo, **dados):
+    """Envia um evento ao rastreador atual. Sem rastreador, não faz nada."""
+    if _rastreador is None:
+        return
+    dados["tipo"] = tipo
+    dados["instante"] = time.time()
+    _rastreador(dados)
+
+
+def resumo_fitness(valores):
+    """Melhor, média e pior dos valores finitos, e quantos falharam (inf)."""
+    finitos = [v for v in valores if math.isfinite(v)]
+    return {
+        "melhor": min(finitos) if finitos else float('inf'),
+        "media": sum(finitos) / len(finitos) if finitos else float('inf'),
+        "pior": max(finitos) if finitos else float('inf'),
+        "falhas": len(valores) - len(finitos),
+    }
+
+
+class FitnessInstrumentada:
+    """
+    Função de fitness que emite um evento 'avaliacao' por treino, com os detalhes
+    de `redeneural.avaliar_com_registro`: tempos de treino e predição, épocas
+    (`n_iter_`), parâmetros, pico de memória e exceção, se houver.
+
+    Funciona também no pool de processos: os detalhes são calculados no worker
+    e emitidos no processo principal.
+    """
+
+    def __init__(self, funcao_detalhada=avaliar_com_registro):
+        self.funcao_detalhada = funcao_detalhada
+        self.semente = None
+
+    def semear(self, semente):
+        """Aplica a semente por avaliação na função detalhada (ver `sementes.semear_fitness`)."""
+        from sementes import FitnessSemeada
+
+        self.funcao_detalhada = FitnessSemeada(self.funcao_detalhada, semente)
+        self.semente = semente
+
+    def __call__(self, hiperparametros, **opcoes):
+        rmse, registro = self.funcao_detalhada(hiperparametros, **opcoes)
+        self._emitir(hiperparametros, rmse, registro, opcoes)
+        return rmse
+
+    def avaliar_lote(self, individuos, executor=None, **opcoes):
+        resultados = avaliar_lote(individuos, self.funcao_detalhada, executor, **opcoes)
+        for individuo, (rmse, registro) in zip(individuos, resultados):
+            self._emitir(individuo, rmse, registro, opcoes)
+        return [rmse for rmse, _ in resultados]
+
+    def _emitir(self, hiperparametros, rmse, registro, opcoes):
+        emitir("avaliacao", rmse=rmse, hiperparametros=hiperparametros, **opcoes, **registro)
@@ -0,0 +1,138 @@
+import math
+
+from avaliacao import avaliar_lote
+
+
+class SuccessiveHalving:
+    """
+    Escalonador de avaliação em múltiplas fidelidades (successive halving).
+
+    Todos os candidatos são treinados primeiro com uma fração pequena do
+    orçamento de épocas. A cada nível apenas a melhor fração 1/eta é promovida
+    para o nível seguinte, com eta vezes mais épocas, até a fidelidade total.
+    Candidatos descartados ficam com o RMSE do último nível em que foram
+    avaliados e a fidelidade desse nível; esse RMSE não é comparável ao de
+    um treino completo, e os otimizadores não o usam como fitness.
+
+    O custo é contabilizado em "treinos completos equivalentes" (soma das
+    fidelidades usadas), para comparar com a avaliação tradicional, em que
+    cada candidato custa 1.
+    """
+
+    def __init__(self, eta=3, fidelidade_minima=1 / 9):
+        """
+        Args:
+            eta (int): Fator de redução do número de candidatos a cada nível.
+            fidelidade_minima (float): Fração do orçamento de épocas no primeiro nível.
+        """
+        self.eta = eta
+        self.fidelidade_minima = fidelidade_minima
+        self.custo_total = 0.0
+        self.custo_referencia = 0.0
+
+    def niveis(self):
+        """Fidelidades usadas em cada nível, da menor até 1.0."""
+        niveis = []
+        fidelidade = self.fidelidade_minima
+        while fidelidade < 1.0 - 1e-9:
+            niveis.append(fidelidade)
+            fidelidade *= self.eta
+        niveis.append(1.0)
+        return niveis
+
+    def avaliar(self, candidatos, funcao_fitness, executor=None, **opcoes):
+        """
+        Avalia os candidatos promovendo só os promissores à fidelidade total.
+
+        Args:
+            candidatos (list): Lista de dicionários de hiperparâmetros.
+            funcao_fitness (callable): Função de fitness que aceita o argumento `fidelidade`.
+            executor (Executor): Pool usado em cada nível, ou None.
+            **opcoes: Argumentos extras repassados à função de fitness.
+
+        Returns:
+            tuple: (scores, fidelidades) — o RMSE de cada candidato no maior nível
+            que alcançou e a fidelidade correspondente, na ordem de `candidatos`.
+        """
+        scores = [float('inf')] * len(candidatos)
+        fidelidades = [0.0] * len(candidatos)
+        ativos = list(range(len(candidatos)))
+        niveis = self.niveis()
+
+        for nivel, fidelidade in enumerate(niveis):
+            lote = [candidatos[i] for i in ativos]
+            # na fidelidade total a chamada é a mesma do modo tradicional (compartilha a cache)
+            opcoes_nivel = dict(opcoes) if fidelidade >= 1.0 else dict(opcoes, fidelidade=fidelidade)
+            resultados = avaliar_lote(lote, funcao_fitness, executor, **opcoes_nivel)
+            self.custo_total += fidelidade * len(lote)
+
+            for i, score in zip(ativos, resultados):
+                scores[i] = score
+                fidelidades[i] = fidelidade
+
+            if nivel < len(niveis) - 1:
+                num_promovidos = max(1, len(ativos) // self.eta)
+                ativos = sorted(ativos, key=lambda i: scores[i])[:num_promovidos]
+
+        self.custo_referencia += len(candidatos)
+        return scores, fidelidades
+
+    def relatorio(self):
+        """Compara o custo acumulado com o da avaliação em fidelidade total."""
+        economia = 1.0 - self.custo_total / self.custo_referencia if self.custo_referencia else 0.0
+        return {
+            "custo_treinos_equivalentes": self.custo_total,
+            "custo_fidelidade_total": self.custo_referencia,
+            "economia": economia,
+        }
+
+
+class Hyperband(SuccessiveHalving):
+    """
+    Hyperband: divide os candidatos entre vários successive halving ("brackets")
+    que trocam número de candidatos por fidelidade inicial, protegendo contra
+    configurações que só se destacam com bastante treino. Pode ser usado no
+    lugar de `SuccessiveHalving` como `multifidelidade` dos otimizadores.
+    """
+
+    def __init__(self, eta=3, fidelidade_minima=1 / 27):
+        super().__init__(eta, fidelidade_minima)
+
+    def brackets(self):
+        """Pares (fidelidade inicial, peso) de cada bracket, do mais agressivo ao de fidelidade total."""
+        s_max = int(round(math.log(1.0 / self.fidelidade_minima, self.eta)))
+        return [(self.eta ** -s, math.ceil((s_max + 1) / (s + 1) * self.eta ** s)) for s in range(s_max, -1, -1)]
+
+    def avaliar(self, candidatos, funcao_fitness, executor=None, **opcoes):
+        """
+        Avalia os candidatos divididos entre os brackets, na proporção do número
+        de candidatos que cada bracket receberia no Hyperband original.
+
+        Returns:
+            tuple: (scores, fidelidades), como em `SuccessiveHalving.avaliar`.
+        """
+        scores = [float('inf')] * len(candidatos)
+        fidelidades = [0.0] * len(candidatos)
+        brackets = self.brackets()
+        peso_total = sum(peso for _, peso in brackets)
+
+        inicio = 0
+        acumulado = 0
+        for fidelidade_inicial, peso in brackets:
+            acumulado += peso
+            fim = round(len(candidatos) * acumulado / peso_total)
+            indices = list(range(inicio, fim))
+            inicio = fim
+            if not indices:
+                continue
+            bracket = SuccessiveHalving(self.eta, fidelidade_inicial)
+            scores_bracket, fidelidades_bracket = bracket.avaliar(
+                [candidatos[i] for i in indices], funcao_fitness, executor, **opcoes
+            )
+            self.custo_total += bracket.custo_total
+            self.custo_referencia += bracket.custo_referencia
+            for i, score, fidelidade in zip(indices, scores_bracket, fidelidades_bracket):
+                scores[i] = score
+                fidelidades[i] = fidelidade
+
+        return scores, fidelidades
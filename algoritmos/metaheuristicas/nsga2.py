@@ -0,0 +1,252 @@
+import json
+import math
+import random
+from functools import partial
+
+from avaliacao import avaliar_lote, criar_executor
+from redeneural import avaliar_com_registro
+from sementes import FLUXO_GENETICO, FluxosAleatorios, semear_fitness
+from solucao_inicial import ARQUIVO_POPULACAO, solucao_inicial_genetico
+from utils import cruzamento, mutacao
+
+# Objetivos disponíveis (todos minimizados) e a chave de `registro` de onde cada um vem
+OBJETIVOS = {
+    "rmse": None,
+    "latencia": "latencia_predicao",
+    "num_parametros": "num_parametros",
+}
+
+# Chaves que o NSGA-II acrescenta aos indivíduos e que não são hiperparâmetros
+CHAVES_AVALIACAO = ("fitness", "objetivos", "rank", "aglomeracao")
+
+
+def avaliar_objetivos(hiperparametros, objetivos=("rmse", "num_parametros"), **opcoes):
+    """
+    Treina a rede uma vez e retorna a tupla de objetivos pedidos.
+
+    O RMSE e o custo de inferência vêm da mesma avaliação (o `registro` de
+    `calcular_fitness_rmse`). Se o treino falhar, todos os objetivos são infinitos.
+
+    Returns:
+        tuple: Um valor por objetivo, na ordem de `objetivos`.
+    """
+    rmse, registro = avaliar_com_registro(hiperparametros, **opcoes)
+    if not math.isfinite(rmse) or "erro" in registro:
+        return tuple(float('inf') for _ in objetivos)
+    return tuple(float(rmse) if OBJETIVOS[nome] is None else float(registro[OBJETIVOS[nome]])
+                 for nome in objetivos)
+
+
+def domina(a, b):
+    """True se o vetor de objetivos `a` domina `b` (não é pior em nenhum e é melhor em algum)."""
+    return all(x <= y for x, y in zip(a, b)) and any(x < y for x, y in zip(a, b))
+
+
+def ordenacao_nao_dominada(objetivos):
+    """
+    Ordenação rápida por não dominância (Deb et al., 2002).
+
+    Args:
+        objetivos (list): Um vetor de objetivos por indivíduo.
+
+    Returns:
+        list: As frentes, cada uma uma lista de índices; a primeira é a frente de Pareto.
+    """
+    dominados_por = [[] for _ in objetivos]
+    num_dominantes = [0] * len(objetivos)
+    frentes = [[]]
+    for i, a in enumerate(objetivos):
+        for j, b in enumerate(objetivos):
+            if domina(a, b):
+                dominados_por[i].append(j)
+            elif domina(b, a):
+                num_dominantes[i] += 1
+        if num_dominantes[i] == 0:
+            frentes[0].append(i)
+
+    while frentes[-1]:
+        proxima = []
+        for i in frentes[-1]:
+            for j in dominados_por[i]:
+                num_dominantes[j] -= 1
+                if num_dominantes[j] == 0:
+                    proxima.append(j)
+        frentes.append(proxima)
+    return frentes[:-1]
+
+
+def distancia_aglomeracao(objetivos, frente):
+    """
+    Distância de aglomeração (crowding distance) dos indivíduos de uma frente.
+
+    Os extremos de cada objetivo recebem distância infinita, para que a
+    seleção preserve a amplitude da frente.
+
+    Returns:
+        dict: Índice -> distância.
+    """
+    distancias = {i: 0.0 for i in frente}
+    if len(frente) <= 2:
+        return {i: float('inf') for i in frente}
+    for m in range(len(objetivos[frente[0]])):
+        ordenada = sorted(frente, key=lambda i: objetivos[i][m])
+        minimo, maximo = objetivos[ordenada[0]][m], objetivos[ordenada[-1]][m]
+        distancias[ordenada[0]] = distancias[ordenada[-1]] = float('inf')
+        if maximo == minimo or not math.isfinite(maximo - minimo):
+            continue
+        for anterior, atual, seguinte in zip(ordenada, ordenada[1:], ordenada[2:]):
+            distancias[atual] += (objetivos[seguinte][m] - objetivos[anterior][m]) / (maximo - minimo)
+    return distancias
+
+
+def seleciona_nsga2(populacao_combinada, n):
+    """
+    Substitui `seleciona_melhores` no modo multiobjetivo.
+
+    Preenche a nova população frente a frente; a última frente que não cabe
+    inteira é cortada pelos indivíduos de maior distância de aglomeração. Os
+    indivíduos recebem 'rank' (número da frente) e 'aglomeracao', usados pelo
+    torneio.
+    """
+    objetivos = [individuo['objetivos'] for individuo in populacao_combinada]
+    selecionados = []
+    for rank, frente in enumerate(ordenacao_nao_dominada(objetivos)):
+        distancias = distancia_aglomeracao(objetivos, frente)
+        for i in frente:
+            populacao_combinada[i]['rank'] = rank
+            populacao_combinada[i]['aglomeracao'] = distancias[i]
+        if len(selecionados) + len(frente) > n:
+            frente = sorted(frente, key=lambda i: -distancias[i])[:n - len(selecionados)]
+        selecionados += [populacao_combinada[i] for i in frente]
+        if len(selecionados) >= n:
+            break
+    return selecionados
+
+
+def selecao_torneio_nsga2(populacao, tamanho_torneio=2, rng=random):
+    """Torneio pelo operador de comparação com aglomeração: menor frente, depois maior distância."""
+    torneio = rng.sample(populacao, tamanho_torneio)
+    return min(torneio, key=lambda individuo: (individuo['rank'], -individuo['aglomeracao']))
+
+
+def frente_pareto(populacao):
+    """Indivíduos não dominados da população, ordenados pelo primeiro objetivo."""
+    objetivos = [individuo['objetivos'] for individuo in populacao]
+    frente = ordenacao_nao_dominada(objetivos)[0]
+    return sorted((populacao[i] for i in frente), key=lambda individuo: individuo['objetivos'])
+
+
+def _genes(individuo):
+    return {k: v for k, v in individuo.items() if k not in CHAVES_AVALIACAO}
+
+
+def algoritmo_genetico_multiobjetivo(populacao_inicial, tamanho_populacao, num_geracoes, pm, definicoes_hp,
+                                     objetivos=("rmse", "num_parametros"), funcao_objetivos=None, workers=1,
+                                     semente=None):
+    """
+    Variante NSGA-II do Algoritmo Genético: minimiza o RMSE e o custo de inferência da rede.
+
+    Usa os mesmos cruzamento e mutação de `algoritmo_genetico`, mas a seleção
+    dos sobreviventes é feita por ordenação não dominada e distância de
+    aglomeração (`seleciona_nsga2`) e os pais são escolhidos por torneio
+    binário com o operador de comparação com aglomeração. O resultado é a
+    frente de Pareto, de onde se escolhe o modelo que cabe no orçamento de
+    latência/memória do serviço.
+
+    A latência é medida no processo que treina a rede; com `workers` > 1 os
+    processos competem pela CPU e a medição fica mais ruidosa. O número de
+    parâmetros é determinístico.
+
+    Args:
+        populacao_inicial (list): Lista de dicionários, onde cada dicionário é um indivíduo.
+        tamanho_populacao (int): Tamanho da população.
+        num_geracoes (int): Número de gerações.
+        pm (float): Probabilidade de mutação.
+        definicoes_hp (dict): Definições dos hiperparâmetros para a mutação.
+        objetivos (tuple): Nomes dos objetivos, entre as chaves de `OBJETIVOS`.
+        funcao_objetivos (callable): Função que recebe um indivíduo e retorna a
+            tupla de objetivos. Por padrão, `avaliar_objetivos` com `objetivos`.
+        workers (int): Número de processos usados para avaliar cada lote.
+        semente (int): Se informada, o filho k da geração g usa o fluxo (g, k) de
+            `sementes.FluxosAleatorios` e cada avaliação recebe a semente do seu
+            fenótipo, como em `algoritmo_genetico`. A latência medida continua
+            dependendo da carga da máquina.
+
+    Returns:
+        list: A frente de Pareto final, ordenada pelo primeiro objetivo. Cada
+        indivíduo traz 'objetivos' (tupla) e 'fitness' (o primeiro objetivo).
+    """
+    for nome in objetivos:
+        if nome not in OBJETIVOS:
+            raise ValueError(f"Objetivo '{nome}' não suportado. Use um de {tuple(OBJETIVOS)}.")
+    if funcao_objetivos is None:
+        funcao_objetivos = partial(avaliar_objetivos, objetivos=tuple(objetivos))
+    fluxos = None
+    if semente is not None:
+        fluxos = FluxosAleatorios(semente)
+        funcao_objetivos = semear_fitness(funcao_objetivos, semente)
+
+    def avaliar(individuos):
+        resultados = avaliar_lote(individuos, funcao_objetivos, executor)
+        avaliados = []
+        for individuo, valores in zip(individuos, resultados):
+            avaliado = individuo.copy()
+            avaliado['objetivos'] = tuple(valores)
+            avaliado['fitness'] = valores[0]
+            avaliados.append(avaliado)
+        return avaliados
+
+    executor = criar_executor(workers)
+    try:
+        populacao = seleciona_nsga2(avaliar([_genes(individuo) for individuo in populacao_inicial]), tamanho_populacao)
+
+        for geracao in range(num_geracoes):
+            filhos = []
+            while len(filhos) < tamanho_populacao:
+                rng = random if fluxos is None else fluxos.gerador(FLUXO_GENETICO, geracao, len(filhos))
+                pai1 = _genes(selecao_torneio_nsga2(populacao, rng=rng))
+                pai2 = _genes(selecao_torneio_nsga2(populacao, rng=rng))
+                filhos.append(mutacao(cruzamento(pai1, pai2, rng), pm, definicoes_hp, rng))
+
+            populacao = seleciona_nsga2(populacao + avaliar(filhos), tamanho_populacao)
+
+            frente = [individuo for individuo in populacao if individuo['rank'] == 0]
+            extremos = " | ".join(
+                f"{nome}: {min(ind['objetivos'][m] for ind in frente):.4g}-{max(ind['objetivos'][m] for ind in frente):.4g}"
+                for m, nome in enumerate(objetivos)
+            )
+            print(f"Geração {geracao+1}/{num_geracoes} | Frente de Pareto: {len(frente)} indivíduos | {extremos}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return frente_pareto(populacao)
+
+
+if __name__ == '__main__':
+    from redeneural import definicoes_hiperparametros
+
+    nome_arquivo_genetico = ARQUIVO_POPULACAO
+    try:
+        with open(nome_arquivo_genetico, 'r', encoding='utf-8') as f:
+            pop_inicial = json.load(f)
+    except FileNotFoundError:
+        pop_inicial = solucao_inicial_genetico(definicoes_hiperparametros, 20)
+
+    print("############################ INICIO NSGA-II ##############################")
+
+    frente = algoritmo_genetico_multiobjetivo(
+        pop_inicial,
+        tamanho_populacao=20,
+        num_geracoes=10,
+        pm=0.3,
+        definicoes_hp=definicoes_hiperparametros,
+        objetivos=("rmse", "latencia", "num_parametros"),
+    )
+
+    print("\nFrente de Pareto (RMSE, latência em s, parâmetros):")
+    for individuo in frente:
+        rmse, latencia, num_parametros = individuo['objetivos']
+        camadas = [individuo[f"neuronios_camada_{i+1}"] for i in range(individuo["numero_camadas"])]
+        print(f" | RMSE: {rmse:.4f} | Latência: {latencia * 1e3:.3f} ms | Parâmetros: {num_parametros:.0f} | "
+              f"Camadas: {camadas} | Ativação: {individuo['ativacao']}")
@@ -0,0 +1,164 @@
+import time
+
+from cache_fitness import chave_fenotipo
+
+
+def diversidade_populacao(populacao):
+    """Fração de fenótipos distintos na população (1.0 = todos diferentes)."""
+    if not populacao:
+        return 0.0
+    chaves = {chave_fenotipo({k: v for k, v in individuo.items() if k != 'fitness'}) for individuo in populacao}
+    return len(chaves) / len(populacao)
+
+
+def treinos_executados(funcao_fitness):
+    """
+    Treinos já executados por `funcao_fitness`, quando ela os contabiliza, ou
+    None. Na `FitnessComCache` são as falhas: acertos não treinam redes.
+    """
+    estatisticas = getattr(funcao_fitness, "estatisticas", None)
+    if estatisticas is None:
+        return None
+    return estatisticas().get("falhas")
+
+
+class Orcamento:
+    """
+    Controle de orçamento e de convergência compartilhado pelos otimizadores.
+
+    O Algoritmo Genético e a Têmpera Simulada informam as avaliações feitas e o
+    melhor score de cada geração/nível de temperatura, e consultam `esgotado()`
+    para decidir se continuam. Ao parar, cada algoritmo retorna o melhor
+    resultado encontrado até ali. Todos os critérios são opcionais (None = desligado).
+    """
+
+    def __init__(self, tempo_maximo=None, max_avaliacoes=None, rmse_alvo=None,
+                 paciencia=None, melhora_minima=0.0, diversidade_minima=None):
+        """
+        Args:
+            tempo_maximo (float): Tempo de parede máximo, em segundos.
+            max_avaliacoes (int): Número máximo de avaliações da função de fitness
+                (de treinos executados, ver `acompanhar`).
+            rmse_alvo (float): Para assim que o melhor RMSE for menor ou igual a ele.
+            paciencia (int): Gerações/níveis seguidos sem melhora de pelo menos
+                `melhora_minima` no melhor RMSE antes de parar (estagnação).
+            melhora_minima (float): Redução mínima do RMSE que conta como melhora.
+            diversidade_minima (float): Para se a fração de fenótipos distintos
+                na população cair abaixo desse valor (só no AG).
+        """
+        self.tempo_maximo = tempo_maximo
+        self.max_avaliacoes = max_avaliacoes
+        self.rmse_alvo = rmse_alvo
+        self.paciencia = paciencia
+        self.melhora_minima = melhora_minima
+        self.diversidade_minima = diversidade_minima
+
+        self.inicio = None
+        self.avaliacoes = 0
+        self.melhor = float('inf')
+        self.niveis_sem_melhora = 0
+        self.diversidade = None
+        self._treinos = None  # ver `acompanhar`
+        self._treinos_contados = None
+
+    def iniciar(self):
+        """Marca o início da execução (chamado pelos otimizadores)."""
+        self.inicio = time.perf_counter()
+        return self
+
+    def tempo_decorrido(self):
+        return 0.0 if self.inicio is None else time.perf_counter() - self.inicio
+
+    def acompanhar(self, funcao_fitness):
+        """
+        Passa a contar os treinos de fato executados por `funcao_fitness` (ver
+        `treinos_executados`), em vez das avaliações informadas a `contar`,
+        se a função os contabiliza. Chamado pelos otimizadores antes da
+        primeira avaliação.
+        """
+        self._treinos = lambda: treinos_executados(funcao_fitness)
+        self._treinos_contados = self._treinos()
+
+    def contar(self, num_avaliacoes):
+        """
+        Registra avaliações da função de fitness: os otimizadores informam os
+        treinos completos equivalentes (com multi-fidelidade, a soma das
+        fidelidades). Com `acompanhar` e uma função que contabiliza os treinos,
+        registra os executados desde a última contagem (acertos da cache não contam).
+        """
+        treinos = None if self._treinos is None else self._treinos()
+        if treinos is None:
+            self.avaliacoes += num_avaliacoes
+            return
+        self.avaliacoes += treinos - self._treinos_contados
+        self._treinos_contados = treinos
+
+    def avaliacoes_restantes(self):
+        """Avaliações ainda permitidas, ou None se não há limite."""
+        if self.max_avaliacoes is None:
+            return None
+        # com multi-fidelidade as avaliações são frações de treinos completos
+        return max(0, int(self.max_avaliacoes - self.avaliacoes))
+
+    def atualizar(self, melhor, diversidade=None):
+        """
+        Registra o fim de uma geração ou nível de temperatura.
+
+        Args:
+            melhor (float): Melhor RMSE encontrado até agora.
+            diversidade (float): Diversidade da população (ver `diversidade_populacao`).
+        """
+        if melhor < self.melhor - self.melhora_minima:
+            self.niveis_sem_melhora = 0
+        else:
+            self.niveis_sem_melhora += 1
+        self.melhor = min(self.melhor, melhor)
+        self.diversidade = diversidade
+
+    def esgotado(self, melhor=None):
+        """
+        Verifica os critérios de parada.
+
+        Args:
+            melhor (float): Melhor RMSE atual, se mais recente que o da última `atualizar`.
+
+        Returns:
+            str | None: O motivo da parada, ou None se a execução pode continuar.
+        """
+        melhor = self.melhor if melhor is None else min(self.melhor, melhor)
+        if self.rmse_alvo is not None and melhor <= self.rmse_alvo:
+            return f"RMSE alvo atingido ({melhor:.5f} <= {self.rmse_alvo})"
+        if self.max_avaliacoes is not None and self.avaliacoes >= self.max_avaliacoes:
+            return f"limite de avaliações ({self.avaliacoes:g}/{self.max_avaliacoes})"
+        if self.tempo_maximo is not None and self.tempo_decorrido() >= self.tempo_maximo:
+            return f"limite de tempo ({self.tempo_decorrido():.1f}s/{self.tempo_maximo}s)"
+        if self.paciencia is not None and self.niveis_sem_melhora >= self.paciencia:
+            return f"estagnação ({self.niveis_sem_melhora} gerações/níveis sem melhora)"
+        if (self.diversidade_minima is not None and self.diversidade is not None
+                and self.diversidade < self.diversidade_minima):
+            return f"perda de diversidade ({self.diversidade:.2f} < {self.diversidade_minima})"
+        return None
+
+    def estado(self):
+        """Contadores e tempo decorrido, para gravar em um checkpoint."""
+        return self.resumo()
+
+    def restaurar(self, estado):
+        """
+        Restaura o estado gravado por `estado()`. Chamado depois de `iniciar()`:
+        o relógio continua do tempo já gasto antes da interrupção.
+        """
+        self.inicio = time.perf_counter() - estado["tempo"]
+        self.avaliacoes = estado["avaliacoes"]
+        self.melhor = estado["melhor"]
+        self.niveis_sem_melhora = estado["niveis_sem_melhora"]
+        self.diversidade = estado["diversidade"]
+
+    def resumo(self):
+        return {
+            "tempo": self.tempo_decorrido(),
+            "avaliacoes": self.avaliacoes,
+            "melhor": self.melhor,
+            "niveis_sem_melhora": self.niveis_sem_melhora,
+            "diversidade": self.diversidade,
+        }
@@ -0,0 +1,188 @@
+import numpy as np
+
+
+class PopulacaoVetorizada:
+    """
+    População do Algoritmo Genético representada por arrays NumPy.
+
+    Cada linha de `genes` é um indivíduo e cada coluna um hiperparâmetro, na
+    ordem de `definicoes_hp`. Genes do tipo 'choice' são guardados como o índice
+    da opção escolhida. Os operadores deste módulo trabalham sobre a população
+    inteira de uma vez, o que elimina o custo por indivíduo dos operadores de
+    `utils.py` quando a função objetivo é barata e a população é grande.
+    """
+
+    def __init__(self, genes, definicoes_hp, fitness=None):
+        """
+        Args:
+            genes (np.ndarray): Matriz (n_individuos, n_genes) com os valores codificados.
+            definicoes_hp (dict): Definições dos hiperparâmetros.
+            fitness (np.ndarray): Fitness de cada indivíduo (NaN = não avaliado).
+        """
+        self.genes = np.asarray(genes, dtype=np.float64)
+        self.definicoes_hp = definicoes_hp
+        self.nomes = list(definicoes_hp)
+        if fitness is None:
+            fitness = np.full(len(self.genes), np.nan)
+        self.fitness = np.asarray(fitness, dtype=np.float64)
+
+        tipos = [definicoes_hp[nome]["type"] for nome in self.nomes]
+        self.colunas_float = np.array([tipo == "float" for tipo in tipos])
+        self.colunas_int = np.array([tipo == "int" for tipo in tipos])
+        self.colunas_choice = np.array([tipo == "choice" for tipo in tipos])
+
+        # limites inferiores/superiores; 'choice' usa o intervalo de índices das opções
+        self.minimos = np.array([
+            0 if tipo == "choice" else definicoes_hp[nome]["min"] for nome, tipo in zip(self.nomes, tipos)
+        ], dtype=np.float64)
+        self.maximos = np.array([
+            len(definicoes_hp[nome]["options"]) - 1 if tipo == "choice" else definicoes_hp[nome]["max"]
+            for nome, tipo in zip(self.nomes, tipos)
+        ], dtype=np.float64)
+
+    def __len__(self):
+        return len(self.genes)
+
+    @classmethod
+    def aleatoria(cls, tamanho, definicoes_hp, rng):
+        """Gera uma população uniforme no espaço de busca (equivalente a `gerar_solucao_inicial`)."""
+        populacao = cls(np.zeros((tamanho, len(definicoes_hp))), definicoes_hp)
+        populacao.genes = populacao.valores_aleatorios(tamanho, rng)
+        return populacao
+
+    @classmethod
+    def de_dicts(cls, individuos, definicoes_hp):
+        """Converte uma lista de dicionários (formato de `utils.py`) para a forma vetorizada."""
+        nomes = list(definicoes_hp)
+        genes = np.empty((len(individuos), len(nomes)))
+        for i, individuo in enumerate(individuos):
+            for j, nome in enumerate(nomes):
+                valor = individuo[nome]
+                if definicoes_hp[nome]["type"] == "choice":
+                    valor = definicoes_hp[nome]["options"].index(valor)
+                genes[i, j] = valor
+        fitness = [individuo.get("fitness", np.nan) for individuo in individuos]
+        return cls(genes, definicoes_hp, fitness)
+
+    def para_dicts(self):
+        """Converte a população de volta para a lista de dicionários usada em `utils.py`."""
+        individuos = []
+        for linha, fitness in zip(self.genes, self.fitness):
+            individuo = {}
+            for nome, valor in zip(self.nomes, linha):
+                definicao = self.definicoes_hp[nome]
+                if definicao["type"] == "choice":
+                    individuo[nome] = definicao["options"][int(valor)]
+                elif definicao["type"] == "int":
+                    individuo[nome] = int(valor)
+                else:
+                    individuo[nome] = float(valor)
+            if not np.isnan(fitness):
+                individuo["fitness"] = float(fitness)
+            individuos.append(individuo)
+        return individuos
+
+    def valores_aleatorios(self, num_linhas, rng):
+        """Sorteia uma matriz de valores válidos, respeitando o tipo de cada coluna."""
+        formato = (num_linhas, len(self.nomes))
+        uniformes = rng.uniform(self.minimos, self.maximos, size=formato)
+        inteiros = np.floor(rng.uniform(self.minimos, self.maximos + 1, size=formato))
+        discretas = self.colunas_int | self.colunas_choice
+        return np.where(discretas, np.minimum(inteiros, self.maximos), uniformes)
+
+
+def selecao_torneio(populacao, num_selecionados, rng, tamanho_torneio=3):
+    """
+    Executa `num_selecionados` torneios de uma vez.
+
+    Returns:
+        np.ndarray: Índices dos vencedores.
+    """
+    competidores = rng.integers(0, len(populacao), size=(num_selecionados, tamanho_torneio))
+    vencedores = np.argmin(populacao.fitness[competidores], axis=1)
+    return competidores[np.arange(num_selecionados), vencedores]
+
+
+def cruzamento(genes_pais1, genes_pais2, rng):
+    """Cruzamento uniforme: cada gene do filho vem de um dos pais com probabilidade 0.5."""
+    mascara = rng.random(genes_pais1.shape) < 0.5
+    return np.where(mascara, genes_pais1, genes_pais2)
+
+
+def mutacao(genes, pm, populacao, rng):
+    """
+    Cada gene sofre mutação com probabilidade `pm`, recebendo um valor novo
+    sorteado conforme o tipo da coluna (mesma regra de `utils.mutacao`).
+    """
+    mascara = rng.random(genes.shape) < pm
+    novos_valores = populacao.valores_aleatorios(len(genes), rng)
+    return np.where(mascara, novos_valores, genes)
+
+
+def seleciona_melhores(genes, fitness, n):
+    """Truncamento elitista: mantém os `n` indivíduos de menor fitness."""
+    ordem = np.argsort(fitness, kind="stable")[:n]
+    return genes[ordem], fitness[ordem]
+
+
+def algoritmo_genetico_vetorizado(populacao, tamanho_populacao, num_geracoes, pm,
+                                  funcao_fitness_vetorizada, rng, tamanho_torneio=3):
+    """
+    Versão vetorizada de `algoritmo_genetico`, para funções objetivo baratas.
+
+    Args:
+        populacao (PopulacaoVetorizada): População inicial.
+        tamanho_populacao (int): Tamanho da população.
+        num_geracoes (int): Número de gerações.
+        pm (float): Probabilidade de mutação.
+        funcao_fitness_vetorizada (callable): Recebe uma `PopulacaoVetorizada` e
+            retorna um array com o fitness de cada indivíduo.
+        rng (np.random.Generator): Gerador usado por todos os operadores.
+        tamanho_torneio (int): Número de competidores de cada torneio.
+
+    Returns:
+        PopulacaoVetorizada: A população final, ordenada do melhor para o pior.
+    """
+    if np.isnan(populacao.fitness).any():
+        populacao.fitness = np.asarray(funcao_fitness_vetorizada(populacao), dtype=np.float64)
+
+    for geracao in range(num_geracoes):
+        pais1 = selecao_torneio(populacao, tamanho_populacao, rng, tamanho_torneio)
+        pais2 = selecao_torneio(populacao, tamanho_populacao, rng, tamanho_torneio)
+
+        filhos = cruzamento(populacao.genes[pais1], populacao.genes[pais2], rng)
+        filhos = mutacao(filhos, pm, populacao, rng)
+
+        populacao_nova = PopulacaoVetorizada(filhos, populacao.definicoes_hp)
+        populacao_nova.fitness = np.asarray(funcao_fitness_vetorizada(populacao_nova), dtype=np.float64)
+
+        genes, fitness = seleciona_melhores(
+            np.concatenate([populacao.genes, populacao_nova.genes]),
+            np.concatenate([populacao.fitness, populacao_nova.fitness]),
+            tamanho_populacao,
+        )
+        populacao = PopulacaoVetorizada(genes, populacao.definicoes_hp, fitness)
+
+        print(f"Geração {geracao+1}/{num_geracoes} | Melhor fitness: {populacao.fitness[0]:.4f}")
+
+    return populacao
+
+
+if __name__ == '__main__':
+    from redeneural import definicoes_hiperparametros
+
+    def objetivo_sintetico(populacao):
+        """Objetivo barato no espírito de `utils.avalia_rede_func` (lr ideal 0.01, 2 camadas, 64 neurônios)."""
+        colunas = {nome: j for j, nome in enumerate(populacao.nomes)}
+        genes = populacao.genes
+        neuronios = genes[:, [colunas[f"neuronios_camada_{i}"] for i in range(1, 16)]]
+        return ((genes[:, colunas["taxa_aprendizado"]] - 0.01) ** 2 * 100
+                + (genes[:, colunas["numero_camadas"]] - 2) ** 2 * 0.1
+                + ((neuronios.mean(axis=1) - 64) / 32) ** 2 * 0.05)
+
+    rng = np.random.default_rng(42)
+    populacao_inicial = PopulacaoVetorizada.aleatoria(20000, definicoes_hiperparametros, rng)
+    populacao_final = algoritmo_genetico_vetorizado(
+        populacao_inicial, 20000, 30, 0.05, objetivo_sintetico, rng
+    )
+    print(f"\nMelhor indivíduo: {populacao_final.para_dicts()[0]}")
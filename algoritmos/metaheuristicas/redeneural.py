@@ -1,37 +1,80 @@
-import numpy as np
-from sklearn.datasets import load_diabetes
-from sklearn.model_selection import train_test_split
-from sklearn.neural_network import MLPRegressor
-from sklearn.metrics import mean_squared_error
-from sklearn.preprocessing import StandardScaler
+import time
+
 import warnings
-from sklearn.exceptions import ConvergenceWarning
 
+import numpy as np
+
+from dados import abrir_conjunto
+from espaco_busca import EspacoBusca
 
-warnings.filterwarnings("ignore", category=ConvergenceWarning)
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
-definicoes_hiperparametros = {
+# O scikit-learn só é importado dentro das funções que treinam a rede: importar
+# este módulo (espaço de busca, fitness sintética, CLI) fica barato, e os
+# workers só pagam a importação quando de fato avaliam uma rede.
+
+# Espaço de busca da MLP, usado por todos os otimizadores
+_definicoes = {
     "taxa_aprendizado": {"type": "float", "min": 0.0001, "max": 0.1},
     "numero_camadas": {"type": "int", "min": 1, "max": 15},
     "ativacao": {"type": "choice", "options": ["relu", "tanh", "identity", "logistic"]},
 }
-# Adiciona dinamicamente os hiperparâmetros para o número de neurônios
+# Adiciona dinamicamente os hiperparâmetros para o número de neurônios;
+# a camada i só existe na rede se numero_camadas >= i
 for i in range(1, 16):
-    definicoes_hiperparametros[f"neuronios_camada_{i}"] = {"type": "int", "min": 30, "max": 100}
+    _definicoes[f"neuronios_camada_{i}"] = {"type": "int", "min": 30, "max": 100, "ativo_se": {"numero_camadas": i}}
+definicoes_hiperparametros = EspacoBusca(_definicoes)
+
 
+# Número máximo de épocas de treino na fidelidade total (fidelidade = 1.0)
+MAX_ITER = 500
+
+# Predições repetidas ao medir a latência de inferência (vale a menor, menos sujeita a ruído)
+REPETICOES_LATENCIA = 5
 
 # Variável global para armazenar os dados e evitar recarregamentos desnecessários
 diabetes_data = None
 
+# Diretório com arrays preparados por `dados.preparar_conjunto` (None = Diabetes em memória)
+diretorio_dados = None
+
+
+def usar_conjunto_dados(diretorio):
+    """
+    Passa a usar o conjunto preparado em `diretorio` (memmaps compartilhados
+    entre processos) em vez de carregar o Diabetes em cada processo.
+    Com None, volta ao comportamento padrão.
+    """
+    global diabetes_data, diretorio_dados
+    diretorio_dados = diretorio
+    diabetes_data = None
+
+
+def inicializar_worker(diretorio):
+    """Inicializador dos processos do pool: aponta o worker para o mesmo conjunto de dados."""
+    usar_conjunto_dados(diretorio)
+
 
 def carregar_dados_diabetes():
     """
     Carrega, particiona e pré-processa o dataset Diabetes.
     Utiliza uma cache em memória (variável global) para evitar recargas repetidas,
     o que acelera muito o processo de otimização.
+
+    Se um diretório foi definido com `usar_conjunto_dados`, os arrays já
+    preparados são abertos como memmaps somente leitura, sem cópia por processo.
     """
     global diabetes_data
+    if diabetes_data is None and diretorio_dados is not None:
+        diabetes_data = abrir_conjunto(diretorio_dados)
     if diabetes_data is None:
+        from sklearn.datasets import load_diabetes
+        from sklearn.model_selection import train_test_split
+        from sklearn.preprocessing import StandardScaler
+
         diabetes = load_diabetes()
         X, y = diabetes.data, diabetes.target
 
@@ -48,7 +91,125 @@ def carregar_dados_diabetes():
         
     return diabetes_data
 
-def calcular_fitness_rmse(hiperparametros: dict) -> float:
+def construir_mlp(hiperparametros: dict, fidelidade: float = 1.0, semente: int = 42) -> "MLPRegressor":
+    """
+    Cria o `MLPRegressor` (ainda não treinado) descrito pelos hiperparâmetros.
+    Apenas as `numero_camadas` primeiras camadas são usadas. `semente` é o
+    `random_state` da inicialização dos pesos e da ordem dos mini-lotes.
+    """
+    from sklearn.exceptions import ConvergenceWarning
+    from sklearn.neural_network import MLPRegressor
+
+    warnings.filterwarnings("ignore", category=ConvergenceWarning)
+
+    # Constrói a arquitetura da rede dinamicamente
+    num_camadas_ativas = hiperparametros["numero_camadas"]
+    neuronios_por_camada = [
+        hiperparametros[f"neuronios_camada_{i+1}"] for i in range(num_camadas_ativas)
+    ]
+    hidden_layer_sizes = tuple(neuronios_por_camada)
+
+    return MLPRegressor(
+        hidden_layer_sizes=hidden_layer_sizes,
+        activation=hiperparametros["ativacao"],
+        learning_rate_init=hiperparametros["taxa_aprendizado"],
+        max_iter=max(1, int(round(MAX_ITER * fidelidade))),
+        early_stopping=True,
+        n_iter_no_change=10,
+        random_state=semente
+    )
+
+
+def treinar_incremental(mlp, X_treino, y_treino, max_iter, limiar_poda,
+                        margem_poda=0.1, epocas_minimas_poda=10, semente=42):
+    """
+    Treina a MLP época a época com `partial_fit`, com parada antecipada própria.
+
+    Separa 10% do treino para validação (como o `early_stopping` do
+    scikit-learn) e, a cada época, compara o melhor RMSE de validação com
+    `limiar_poda`. Se após `epocas_minimas_poda` épocas ele ainda estiver acima de
+    `limiar_poda * (1 + margem_poda)`, o candidato claramente não vence o limiar
+    e o treino é abortado.
+
+    Com `limiar_poda` None a regra de poda é desligada e resta só a parada
+    antecipada (usado no treino a partir de pesos pré-treinados). `semente`
+    define a separação da validação.
+
+    Returns:
+        bool: True se o treino foi abortado pela regra de poda.
+    """
+    from sklearn.metrics import mean_squared_error
+    from sklearn.model_selection import train_test_split
+
+    X_tr, X_val, y_tr, y_val = train_test_split(X_treino, y_treino, test_size=0.1, random_state=semente)
+    # a validação é feita aqui; o early_stopping interno não é suportado por partial_fit
+    mlp.set_params(early_stopping=False)
+
+    melhor_rmse_val = float('inf')
+    melhores_pesos = None
+    epocas_sem_melhora = 0
+
+    epocas = 0
+    for epoca in range(max_iter):
+        mlp.partial_fit(X_tr, y_tr)
+        # o `n_iter_` deixado por `partial_fit` varia entre versões do scikit-learn (1 a cada
+        # chamada ou uma época a mais por chamada, contando a de `aplicar_pesos`); a contagem
+        # própria registra só as épocas deste treino
+        epocas += 1
+        mlp.n_iter_ = epocas
+        rmse_val = np.sqrt(mean_squared_error(y_val, mlp.predict(X_val)))
+
+        if rmse_val < melhor_rmse_val - 1e-4:
+            melhor_rmse_val = rmse_val
+            melhores_pesos = ([c.copy() for c in mlp.coefs_], [b.copy() for b in mlp.intercepts_])
+            epocas_sem_melhora = 0
+        else:
+            epocas_sem_melhora += 1
+
+        if (limiar_poda is not None and epoca + 1 >= epocas_minimas_poda
+                and melhor_rmse_val > limiar_poda * (1 + margem_poda)):
+            return True
+        if epocas_sem_melhora >= mlp.n_iter_no_change:
+            break
+
+    # restaura os pesos da melhor época de validação
+    if melhores_pesos is not None:
+        mlp.coefs_, mlp.intercepts_ = melhores_pesos
+    return False
+
+
+def aplicar_pesos(mlp, X_treino, y_treino, pesos):
+    """
+    Inicializa a MLP com pesos já treinados de outra rede de mesma arquitetura.
+
+    O `partial_fit` em uma única amostra só serve para o scikit-learn criar a
+    estrutura interna do modelo (camadas, otimizador); os pesos resultantes
+    são sobrescritos em seguida e o estado do otimizador (momentos do Adam,
+    velocidades do SGD), que veio do gradiente dessa amostra, é zerado. Os
+    momentos da rede de origem não são guardados: o ajuste fino começa com o
+    otimizador zerado, a partir dos pesos copiados.
+
+    Args:
+        pesos (tuple): (coefs, intercepts), como em `mlp.coefs_` e `mlp.intercepts_`.
+    """
+    coefs, intercepts = pesos
+    mlp.set_params(early_stopping=False)
+    mlp.partial_fit(X_treino[:1], y_treino[:1])
+    # cópia no lugar: o otimizador mantém referências aos arrays de parâmetros
+    for destino, origem in zip(mlp.coefs_ + mlp.intercepts_, list(coefs) + list(intercepts)):
+        np.copyto(destino, origem)
+    otimizador = getattr(mlp, "_optimizer", None)
+    for nome in ("ms", "vs", "velocities"):
+        for momento in getattr(otimizador, nome, []):
+            momento.fill(0.0)
+    if hasattr(otimizador, "t"):
+        otimizador.t = 0
+    mlp.t_ = 0
+
+
+def calcular_fitness_rmse(hiperparametros: dict, fidelidade: float = 1.0, limiar_poda: float = None,
+                          registro: dict = None, pesos_iniciais: tuple = None,
+                          pesos_treinados: list = None, semente: int = 42) -> float:
     """
     Função de fitness que treina uma MLP de Regressão e retorna o RMSE.
 
@@ -58,38 +219,71 @@ def calcular_fitness_rmse(hiperparametros: dict) -> float:
 
     Args:
         hiperparametros (dict): Dicionário com os valores dos hiperparâmetros a serem testados.
+        fidelidade (float): Fração do orçamento de épocas (`MAX_ITER`) usada no treino.
+            Valores menores que 1 dão uma estimativa mais barata e mais ruidosa do RMSE.
+        limiar_poda (float): RMSE que o otimizador precisa ver superado (ex: o pior
+            sobrevivente da população). Se informado, o treino é incremental e é
+            abortado assim que o candidato claramente não consegue vencê-lo. O
+            RMSE de teste de um modelo podado não é comparável ao dos demais:
+            o retorno é o maior entre ele e `limiar_poda`, para que o candidato
+            nunca pareça melhor que o limiar que não venceu.
+        registro (dict): Se informado, é preenchido com os detalhes da avaliação
+            (tempos de treino e predição, latência de inferência em um lote do
+            tamanho do conjunto de teste, épocas, parâmetros, pico de memória e
+            erro). Sem ele a medição não é feita. O pico de memória é o do
+            processo (RSS máximo, em KB), disponível apenas em sistemas Unix.
+        pesos_iniciais (tuple): (coefs, intercepts) de uma rede com as mesmas
+            camadas ocultas. Se informado, o treino parte desses pesos em vez de
+            uma inicialização aleatória (ver `repositorio_pesos.RepositorioPesos`).
+        pesos_treinados (list): Se informada, recebe os pesos (coefs, intercepts)
+            da rede treinada, exceto quando o treino foi podado.
+        semente (int): Semente do treino (inicialização dos pesos, mini-lotes e
+            separação da validação). A divisão treino/teste dos dados não muda.
+            `sementes.FitnessSemeada` deriva uma semente por avaliação.
 
     Returns:
         float: O valor do Root Mean Squared Error (RMSE) no conjunto de teste.
                Retorna um valor infinito se ocorrer um erro.
     """
+    from sklearn.metrics import mean_squared_error
+
     try:
         # 1. Garante que os dados estão carregados
         X_treino, X_teste, y_treino, y_teste = carregar_dados_diabetes()
 
-        # 2. Constrói a arquitetura da rede dinamicamente
-        num_camadas_ativas = hiperparametros["numero_camadas"]
-        neuronios_por_camada = [
-            hiperparametros[f"neuronios_camada_{i+1}"] for i in range(num_camadas_ativas)
-        ]
-        hidden_layer_sizes = tuple(neuronios_por_camada)
-
-        # 3. Cria a instância do Regressor MLP
-        mlp = MLPRegressor(
-            hidden_layer_sizes=hidden_layer_sizes,
-            activation=hiperparametros["ativacao"],
-            learning_rate_init=hiperparametros["taxa_aprendizado"],
-            max_iter=500,
-            early_stopping=True,
-            n_iter_no_change=10,
-            random_state=42
-        )
+        # 2. e 3. Constrói a arquitetura da rede e cria a instância do Regressor MLP
+        mlp = construir_mlp(hiperparametros, fidelidade, semente)
 
         # 4. Treina o modelo
-        mlp.fit(X_treino, y_treino)
+        inicio = time.perf_counter()
+        podado = False
+        if pesos_iniciais is not None:
+            aplicar_pesos(mlp, X_treino, y_treino, pesos_iniciais)
+            podado = treinar_incremental(mlp, X_treino, y_treino, mlp.max_iter, limiar_poda, semente=semente)
+        elif limiar_poda is None:
+            mlp.fit(X_treino, y_treino)
+        else:
+            podado = treinar_incremental(mlp, X_treino, y_treino, mlp.max_iter, limiar_poda, semente=semente)
+        fim_treino = time.perf_counter()
 
         # 5. Faz predições e calcula o RMSE
         predicoes = mlp.predict(X_teste)
+
+        if registro is not None:
+            registro["tempo_treino"] = fim_treino - inicio
+            registro["tempo_predicao"] = time.perf_counter() - fim_treino
+            latencias = []
+            for _ in range(REPETICOES_LATENCIA):
+                inicio_predicao = time.perf_counter()
+                mlp.predict(X_teste)
+                latencias.append(time.perf_counter() - inicio_predicao)
+            registro["latencia_predicao"] = min(latencias)
+            registro["n_iter"] = mlp.n_iter_
+            registro["podado"] = podado
+            registro["aquecido"] = pesos_iniciais is not None
+            registro["num_parametros"] = int(
+                sum(c.size for c in mlp.coefs_) + sum(b.size for b in mlp.intercepts_)
+            )
         
         # --- LINHA CORRIGIDA ---
         # Calcula o MSE e depois tira a raiz quadrada para obter o RMSE.
@@ -97,13 +291,56 @@ def calcular_fitness_rmse(hiperparametros: dict) -> float:
         rmse = np.sqrt(mean_squared_error(y_teste, predicoes))
         # -----------------------
 
+        if pesos_treinados is not None and not podado:
+            pesos_treinados.append((mlp.coefs_, mlp.intercepts_))
+
+        if podado:
+            # a poda olha o RMSE de validação; o de teste do modelo parcial pode ficar abaixo do limiar
+            return max(rmse, limiar_poda)
         return rmse
 
     except Exception as e:
         # Penaliza combinações de hiperparâmetros que causam erros
         print(f"Erro durante a avaliação: {e}")
+        if registro is not None:
+            registro["erro"] = repr(e)
         return float('inf')
 
+    finally:
+        if registro is not None and resource is not None:
+            registro["memoria_pico_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def avaliar_com_registro(hiperparametros: dict, **opcoes):
+    """
+    Avalia os hiperparâmetros e retorna também os detalhes da avaliação.
+
+    Por ser uma função de módulo, pode ser executada no pool de processos: os
+    detalhes voltam junto com o resultado, para serem registrados no processo
+    principal (ver `instrumentacao.FitnessInstrumentada`).
+
+    Returns:
+        tuple: (rmse, registro)
+    """
+    registro = {}
+    rmse = calcular_fitness_rmse(hiperparametros, registro=registro, **opcoes)
+    return rmse, registro
+
+def avaliar_com_pesos(hiperparametros: dict, pesos_iniciais: tuple = None, **opcoes):
+    """
+    Avalia os hiperparâmetros e retorna também os pesos da rede treinada.
+
+    Assim como `avaliar_com_registro`, pode ser executada no pool de processos;
+    os pesos voltam ao processo principal para serem guardados.
+
+    Returns:
+        tuple: (rmse, pesos) — pesos é None se o treino falhou ou foi podado.
+    """
+    pesos_treinados = []
+    rmse = calcular_fitness_rmse(hiperparametros, pesos_iniciais=pesos_iniciais,
+                                 pesos_treinados=pesos_treinados, **opcoes)
+    return rmse, (pesos_treinados[0] if pesos_treinados else None)
+
 # --- Bloco de Exemplo de Uso ---
 if __name__ == '__main__':
     print("Iniciando teste da função de fitness...")
@@ -0,0 +1,192 @@
+import math
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+from redeneural import avaliar_com_pesos
+
+ATIVACOES_DIFERENTES = 1.0  # penalidade, na distância, por trocar a função de ativação
+
+
+def forma_camadas(hiperparametros):
+    """Tupla com os neurônios das camadas ocultas ativas (a arquitetura efetiva)."""
+    num_camadas = int(hiperparametros["numero_camadas"])
+    return tuple(int(hiperparametros[f"neuronios_camada_{i+1}"]) for i in range(num_camadas))
+
+
+def distancia(hiperparametros_a, hiperparametros_b):
+    """
+    Distância entre dois candidatos de mesma arquitetura: diferença de ordem de
+    grandeza das taxas de aprendizado, mais uma penalidade se a ativação difere.
+    """
+    d = abs(math.log10(hiperparametros_a["taxa_aprendizado"]) - math.log10(hiperparametros_b["taxa_aprendizado"]))
+    if hiperparametros_a["ativacao"] != hiperparametros_b["ativacao"]:
+        d += ATIVACOES_DIFERENTES
+    return d
+
+
+class RepositorioPesos:
+    """
+    Guarda os pesos treinados de candidatos recentes e da elite, agrupados pela
+    arquitetura das camadas ocultas, e os usa como ponto de partida para novos
+    candidatos com as mesmas camadas.
+
+    Filhos do AG e vizinhos da Têmpera frequentemente diferem dos pais só na
+    taxa de aprendizado ou na ativação. Nesses casos a rede parte dos pesos do
+    candidato guardado mais próximo e treina com só `fracao_epocas` do
+    orçamento de épocas. A instância é chamável e pode ser passada como
+    `funcao_fitness` para o Algoritmo Genético ou para a Têmpera Simulada.
+    """
+
+    def __init__(self, funcao_detalhada=avaliar_com_pesos, max_arquiteturas=64,
+                 max_por_arquitetura=4, fracao_epocas=0.3):
+        """
+        Args:
+            funcao_detalhada (callable): Retorna (rmse, pesos) a partir de
+                (hiperparametros, pesos_iniciais, **opcoes).
+            max_arquiteturas (int): Arquiteturas mantidas (as menos usadas saem primeiro).
+            max_por_arquitetura (int): Redes guardadas por arquitetura; quando
+                cheio, uma nova rede só entra no lugar de uma pior.
+            fracao_epocas (float): Fração da fidelidade usada no treino a partir
+                de pesos guardados.
+        """
+        self.funcao_detalhada = funcao_detalhada
+        self.max_arquiteturas = max_arquiteturas
+        self.max_por_arquitetura = max_por_arquitetura
+        self.fracao_epocas = fracao_epocas
+        # forma -> lista de (rmse, hiperparametros, pesos)
+        self.arquiteturas = OrderedDict()
+        self.semente = None
+        self.concluidas = deque()  # (hiperparametros, rmse, pesos) preenchida pelos callbacks de `submeter`
+
+        self.aquecidos = 0
+        self.do_zero = 0
+
+    def semear(self, semente):
+        """Aplica a semente por avaliação na função detalhada (ver `sementes.semear_fitness`)."""
+        from sementes import FitnessSemeada
+
+        self.funcao_detalhada = FitnessSemeada(self.funcao_detalhada, semente)
+        self.semente = semente
+
+    def pesos_mais_proximos(self, hiperparametros):
+        """Pesos guardados do candidato mais próximo de mesma arquitetura, ou None."""
+        forma = forma_camadas(hiperparametros)
+        entradas = self.arquiteturas.get(forma)
+        if not entradas:
+            return None
+        self.arquiteturas.move_to_end(forma)
+        _, _, pesos = min(entradas, key=lambda e: (distancia(hiperparametros, e[1]), e[0]))
+        return pesos
+
+    def guardar(self, hiperparametros, rmse, pesos):
+        """Guarda os pesos treinados de um candidato, mantendo os melhores por arquitetura."""
+        if pesos is None or not math.isfinite(rmse):
+            return
+        forma = forma_camadas(hiperparametros)
+        entradas = self.arquiteturas.setdefault(forma, [])
+        self.arquiteturas.move_to_end(forma)
+        if len(entradas) >= self.max_por_arquitetura:
+            pior = max(range(len(entradas)), key=lambda i: entradas[i][0])
+            if entradas[pior][0] <= rmse:
+                return
+            entradas.pop(pior)
+        entradas.append((rmse, dict(hiperparametros), pesos))
+        while len(self.arquiteturas) > self.max_arquiteturas:
+            self.arquiteturas.popitem(last=False)
+
+    def aquecera(self, hiperparametros):
+        """
+        True se a avaliação de `hiperparametros` vai partir de pesos guardados.
+
+        Consultado pela `FitnessComCache`: um RMSE de treino aquecido não é o
+        de um treino do zero e não é guardado na cache.
+        """
+        self._guardar_concluidas()
+        return bool(self.arquiteturas.get(forma_camadas(hiperparametros)))
+
+    def _opcoes(self, pesos, opcoes):
+        if pesos is None:
+            self.do_zero += 1
+            return opcoes
+        self.aquecidos += 1
+        opcoes = dict(opcoes)
+        opcoes["fidelidade"] = opcoes.get("fidelidade", 1.0) * self.fracao_epocas
+        return opcoes
+
+    def __call__(self, hiperparametros, **opcoes):
+        self._guardar_concluidas()
+        pesos = self.pesos_mais_proximos(hiperparametros)
+        rmse, pesos_treinados = self.funcao_detalhada(
+            hiperparametros, pesos_iniciais=pesos, **self._opcoes(pesos, opcoes)
+        )
+        self.guardar(hiperparametros, rmse, pesos_treinados)
+        return rmse
+
+    def avaliar_lote(self, individuos, executor=None, **opcoes):
+        """
+        Avalia um lote, cada indivíduo partindo dos pesos guardados mais próximos.
+        Os pesos são escolhidos antes do lote, então indivíduos do mesmo lote
+        não aproveitam os pesos uns dos outros.
+        """
+        self._guardar_concluidas()
+        tarefas = []
+        for individuo in individuos:
+            pesos = self.pesos_mais_proximos(individuo)
+            tarefas.append((individuo, pesos, self._opcoes(pesos, opcoes)))
+
+        if executor is None:
+            resultados = [self.funcao_detalhada(ind, pesos_iniciais=p, **o) for ind, p, o in tarefas]
+        else:
+            futuros = [executor.submit(self.funcao_detalhada, ind, pesos_iniciais=p, **o)
+                       for ind, p, o in tarefas]
+            resultados = [futuro.result() for futuro in futuros]
+
+        for individuo, (rmse, pesos_treinados) in zip(individuos, resultados):
+            self.guardar(individuo, rmse, pesos_treinados)
+        return [rmse for rmse, _ in resultados]
+
+    def submeter(self, hiperparametros, executor=None, **opcoes):
+        """
+        Versão assíncrona de `__call__`, usada por `avaliacao.submeter`.
+
+        O treino roda no `executor`; os pesos treinados são guardados pelo
+        processo principal na próxima chamada (o repositório não é alterado
+        pela thread que conclui o futuro).
+        """
+        self._guardar_concluidas()
+        pesos = self.pesos_mais_proximos(hiperparametros)
+        opcoes = self._opcoes(pesos, opcoes)
+        futuro = Future()
+
+        def concluir(original):
+            if original.exception() is not None:
+                futuro.set_exception(original.exception())
+                return
+            rmse, pesos_treinados = original.result()
+            self.concluidas.append((hiperparametros, rmse, pesos_treinados))
+            futuro.set_result(rmse)
+
+        if executor is None:
+            original = Future()
+            try:
+                original.set_result(self.funcao_detalhada(hiperparametros, pesos_iniciais=pesos, **opcoes))
+            except Exception as e:
+                original.set_exception(e)
+        else:
+            original = executor.submit(self.funcao_detalhada, hiperparametros, pesos_iniciais=pesos, **opcoes)
+        original.add_done_callback(concluir)
+        return futuro
+
+    def _guardar_concluidas(self):
+        while self.concluidas:
+            self.guardar(*self.concluidas.popleft())
+
+    def estatisticas(self):
+        self._guardar_concluidas()
+        total = self.aquecidos + self.do_zero
+        return {
+            "aquecidos": self.aquecidos,
+            "do_zero": self.do_zero,
+            "taxa_aquecimento": self.aquecidos / total if total else 0.0,
+            "arquiteturas": len(self.arquiteturas),
+        }
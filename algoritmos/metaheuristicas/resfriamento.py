@@ -0,0 +1,122 @@
+import math
+import random
+
+from avaliacao import avaliar_lote
+from utils import perturba
+
+
+class ResfriamentoAdaptativo:
+    """
+    Escalonamento de temperatura guiado pela taxa de aceitação, para a Têmpera Simulada.
+
+    Substitui os três parâmetros fixos da têmpera:
+
+    - Temperatura inicial: calibrada a partir de uma amostra de perturbações da
+      solução inicial, de modo que uma piora média seja aceita com probabilidade
+      `aceitacao_inicial` (T0 = -média(Δ+) / ln(aceitacao_inicial)).
+    - Resfriamento: em vez de `T *= taxa_resfriamento`, a temperatura de cada
+      nível é escolhida para aproximar a taxa de aceitação de pioras de um perfil
+      alvo, que decai geometricamente de `aceitacao_inicial` até
+      `aceitacao_final` ao longo de `niveis` níveis. Como a aceitação de uma
+      piora Δ é exp(-Δ/T), a temperatura que leva a taxa observada `a` ao alvo
+      é T * ln(a) / ln(alvo). Se quase tudo foi aceito a temperatura cai mais
+      rápido; se quase nada foi aceito ela sobe (reaquecimento), limitada a T0.
+    - Perturbações por nível: o nível termina assim que `fracao_aceitos` das
+      `max_iter_por_temperatura` perturbações forem aceitas (equilíbrio
+      alcançado), sem gastar treinos em níveis quentes que aceitam quase tudo.
+
+    Assim, poucas avaliações são gastas em níveis onde quase todo movimento é
+    aceito ou quase todo é rejeitado.
+    """
+
+    def __init__(self, aceitacao_inicial=0.8, aceitacao_final=0.02, niveis=20, amostras_calibracao=10,
+                 fracao_aceitos=0.3, fator_minimo=0.5, fator_maximo=2.0):
+        """
+        Args:
+            aceitacao_inicial (float): Taxa de aceitação de pioras desejada no primeiro nível.
+            aceitacao_final (float): Taxa de aceitação de pioras desejada no nível `niveis`.
+            niveis (int): Número de níveis em que o perfil vai de uma taxa à outra.
+            amostras_calibracao (int): Perturbações avaliadas para calibrar T0.
+            fracao_aceitos (float): Fração de `max_iter_por_temperatura` de
+                movimentos aceitos que encerra o nível.
+            fator_minimo (float): Menor fator de mudança da temperatura entre níveis.
+            fator_maximo (float): Maior fator (reaquecimento) entre níveis.
+        """
+        self.aceitacao_inicial = aceitacao_inicial
+        self.aceitacao_final = aceitacao_final
+        self.niveis = niveis
+        self.amostras_calibracao = amostras_calibracao
+        self.fracao_aceitos = fracao_aceitos
+        self.fator_minimo = fator_minimo
+        self.fator_maximo = fator_maximo
+        self.reaquecimentos = 0
+        self.temperatura_inicial = None  # calibrada por `calibrar`
+
+    def calibrar(self, H_inicial, score_inicial, config_hiperparametros, funcao_fitness, executor=None,
+                 rng=random, **opcoes):
+        """
+        Estima a temperatura inicial a partir de perturbações de `H_inicial`.
+
+        As perturbações usam o passo máximo (fator de temperatura 1). As
+        avaliações são devolvidas para que a têmpera aproveite um vizinho melhor.
+        `rng` é o gerador das perturbações (padrão: o módulo `random`).
+
+        Returns:
+            tuple: (temperatura_inicial, candidatos, scores)
+        """
+        candidatos = [perturba(H_inicial, config_hiperparametros, 1.0, 1.0, rng) for _ in range(self.amostras_calibracao)]
+        scores = avaliar_lote(candidatos, funcao_fitness, executor, **opcoes)
+
+        pioras = [s - score_inicial for s in scores if math.isfinite(s) and s > score_inicial]
+        if pioras:
+            temperatura = -(sum(pioras) / len(pioras)) / math.log(self.aceitacao_inicial)
+        else:
+            # nenhuma piora na amostra: supõe pioras típicas de 10% do score inicial
+            escala = 0.1 * abs(score_inicial) if math.isfinite(score_inicial) else 1.0
+            temperatura = -escala / math.log(self.aceitacao_inicial)
+        self.temperatura_inicial = max(temperatura, 1e-6)
+        return self.temperatura_inicial, candidatos, scores
+
+    def estado(self):
+        """Temperatura inicial calibrada e reaquecimentos, para gravar em um checkpoint."""
+        return {"temperatura_inicial": self.temperatura_inicial, "reaquecimentos": self.reaquecimentos}
+
+    def restaurar(self, estado):
+        """Restaura o estado gravado por `estado()`."""
+        self.temperatura_inicial = estado["temperatura_inicial"]
+        self.reaquecimentos = estado["reaquecimentos"]
+
+    def alvo(self, ciclo):
+        """Taxa de aceitação de pioras desejada no nível `ciclo` (1, 2, ...)."""
+        progresso = min(1.0, (ciclo - 1) / max(1, self.niveis - 1))
+        return self.aceitacao_inicial * (self.aceitacao_final / self.aceitacao_inicial) ** progresso
+
+    def nivel_concluido(self, num_aceitos, max_iter_por_temperatura):
+        """True quando o nível já aceitou movimentos suficientes para passar ao próximo."""
+        return num_aceitos >= max(1, math.ceil(self.fracao_aceitos * max_iter_por_temperatura))
+
+    def proxima_temperatura(self, temperatura, temperatura_inicial, ciclo, num_aceitos_piores, num_piores):
+        """
+        Temperatura do nível seguinte.
+
+        Args:
+            temperatura (float): Temperatura do nível que terminou.
+            temperatura_inicial (float): Teto do reaquecimento.
+            ciclo (int): Número do nível que terminou.
+            num_aceitos_piores (int): Pioras aceitas no teste de Metropolis.
+            num_piores (int): Pioras propostas (aceitas ou não).
+        """
+        alvo = self.alvo(ciclo + 1)
+        if num_piores == 0:
+            # só houve melhoras: não há informação sobre a aceitação, resfria o máximo permitido
+            fator = self.fator_minimo
+        else:
+            # suavizada para que 0 ou 100% de aceitação não levem a fatores infinitos
+            taxa = (num_aceitos_piores + 0.5) / (num_piores + 1)
+            fator = math.log(taxa) / math.log(alvo)
+        fator = min(self.fator_maximo, max(self.fator_minimo, fator))
+        nova_temperatura = min(temperatura * fator, temperatura_inicial)
+        # já no teto, um fator > 1 não reaquece de fato
+        if nova_temperatura > temperatura:
+            self.reaquecimentos += 1
+        return nova_temperatura
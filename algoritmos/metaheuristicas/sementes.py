@@ -0,0 +1,130 @@
+import hashlib
+import json
+import random
+
+import numpy as np
+
+from cache_fitness import chave_fenotipo
+
+# Fluxos independentes derivados da semente da execução (primeira chave de `FluxosAleatorios.gerador`)
+FLUXO_INICIAL = 0
+FLUXO_GENETICO = 1
+FLUXO_TEMPERA = 2
+FLUXO_CALIBRACAO = 3
+FLUXO_AVALIACAO = 4
+FLUXO_ESTADO_ESTACIONARIO = 5
+FLUXO_ILHAS = 6
+FLUXO_TEMPERA_PARALELA = 7
+FLUXO_TROCAS = 8
+
+
+def _chave_avaliacao(hiperparametros):
+    # o fenótipo, quando o indivíduo descreve uma MLP; senão, todos os genes
+    try:
+        return chave_fenotipo(hiperparametros)
+    except KeyError:
+        return json.dumps(sorted(hiperparametros.items()), default=str)
+
+
+def semente_aleatoria():
+    """Semente nova, para execuções sem semente que ainda assim usam `FluxosAleatorios`."""
+    return random.SystemRandom().getrandbits(64)
+
+
+class FluxosAleatorios:
+    """
+    Fluxos de números aleatórios reproduzíveis, derivados de uma única semente.
+
+    Cada sorteio da busca usa um gerador próprio, identificado por uma tupla de
+    chaves (fluxo, geração, filho, ...) e derivado com o `SeedSequence` do
+    NumPy, que garante fluxos estatisticamente independentes entre si. Como o
+    gerador depende só da semente e das chaves, e não de quantos números já
+    foram sorteados antes, o resultado não muda com a ordem das avaliações, o
+    número de workers, a cache ou a avaliação distribuída.
+
+    Os geradores são `random.Random`, com a mesma interface do módulo
+    `random` aceita pelos operadores (`rng`) de `utils` e `espaco_busca`.
+    """
+
+    def __init__(self, semente):
+        self.semente = int(semente)
+        self.raiz = np.random.SeedSequence(self.semente)
+
+    def sequencia(self, *chaves):
+        """`SeedSequence` do fluxo identificado por `chaves` (como em `raiz.spawn`)."""
+        return np.random.SeedSequence(self.raiz.entropy, spawn_key=tuple(int(c) for c in chaves))
+
+    def gerador(self, *chaves):
+        """Gerador `random.Random` do fluxo identificado por `chaves`."""
+        estado = self.sequencia(*chaves).generate_state(4)
+        return random.Random(int.from_bytes(estado.tobytes(), "little"))
+
+    def semente_avaliacao(self, hiperparametros):
+        """
+        Semente (inteiro de 32 bits) do treino de um indivíduo.
+
+        É derivada do fenótipo avaliado, e não da posição da avaliação na
+        busca: o mesmo indivíduo recebe a mesma semente em qualquer geração,
+        processo ou máquina, e o valor guardado na cache é exatamente o que
+        uma nova avaliação produziria.
+        """
+        resumo = hashlib.sha256(_chave_avaliacao(hiperparametros).encode()).digest()
+        palavras = np.frombuffer(resumo[:16], dtype=np.uint32)
+        return int(self.sequencia(FLUXO_AVALIACAO, *palavras).generate_state(1)[0])
+
+
+class FitnessSemeada:
+    """
+    Função de fitness com semente por avaliação.
+
+    Repassa à função envolvida a opção `semente` (ex: o `random_state` de
+    `calcular_fitness_rmse`) calculada por `FluxosAleatorios.semente_avaliacao`.
+    É serializável, então roda no pool de processos. Wrappers com
+    `avaliar_lote`, como a `FitnessComCache`, devem envolvê-la, e não o
+    contrário (ver `semear_fitness`).
+    """
+
+    def __init__(self, funcao_fitness, semente):
+        """
+        Args:
+            funcao_fitness (callable): Função que aceita a opção `semente`.
+            semente (int): Semente da execução.
+        """
+        self.funcao_fitness = funcao_fitness
+        self.semente = semente
+        self.fluxos = FluxosAleatorios(semente)
+
+    def __call__(self, hiperparametros, **opcoes):
+        opcoes.setdefault("semente", self.fluxos.semente_avaliacao(hiperparametros))
+        return self.funcao_fitness(hiperparametros, **opcoes)
+
+
+def semear_fitness(funcao_fitness, semente):
+    """
+    Aplica a semente por avaliação a `funcao_fitness`.
+
+    Funções simples são envolvidas em uma `FitnessSemeada`. Funções com
+    `avaliar_lote` (cache, instrumentação, broker) avaliam os lotes por conta
+    própria e precisam expor `semear(semente)`, que aplica a semente na função
+    que elas envolvem (ou nos trabalhos que enviam); o objeto é alterado no
+    lugar e devolvido.
+
+    Raises:
+        ValueError: Se a função já tiver outra semente, ou se tiver
+            `avaliar_lote` sem `semear` (o resultado não seria reproduzível).
+    """
+    if semente is None:
+        return funcao_fitness
+    existente = getattr(funcao_fitness, "semente", None)
+    if existente is not None:
+        if existente != semente:
+            raise ValueError(f"A função de fitness já tem a semente {existente}, diferente de {semente}")
+        return funcao_fitness
+    if not hasattr(funcao_fitness, "avaliar_lote"):
+        return FitnessSemeada(funcao_fitness, semente)
+    semear = getattr(funcao_fitness, "semear", None)
+    if semear is None:
+        raise ValueError(f"{type(funcao_fitness).__name__} tem avaliar_lote, mas não aceita semente "
+                         f"(semear); envolva a função interna em sementes.FitnessSemeada")
+    semear(semente)
+    return funcao_fitness
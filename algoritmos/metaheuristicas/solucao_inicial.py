@@ -1,10 +1,16 @@
 import random
 import json
+import os
 
-def gerar_solucao_inicial(definicoes_hiperparametros):
+# Arquivos padrão das soluções iniciais, ao lado deste módulo
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+ARQUIVO_POPULACAO = os.path.join(DIRETORIO, "populacao_genetico.json")
+ARQUIVO_SOLUCAO_TEMPERA = os.path.join(DIRETORIO, "solucao_tempera.json")
+
+def gerar_solucao_inicial(definicoes_hiperparametros, rng=random):
     """
     Gera um vetor (dicionário) inicial de hiperparâmetros com valores aleatórios
-    baseados em suas definições.
+    baseados em suas definições, sorteados com `rng` (padrão: o módulo `random`).
     """
     solucao = {}
 
@@ -16,21 +22,21 @@ def gerar_solucao_inicial(definicoes_hiperparametros):
             opcoes = definicao_hp.get("options")
             if not isinstance(opcoes, list) or not opcoes:
                 raise ValueError(f"Para o tipo 'choice', a chave 'options' com uma lista não vazia é obrigatória para '{nome_hp}'.")
-            valor = random.choice(opcoes)
+            valor = rng.choice(opcoes)
 
         elif tipo == "int":
             min_val = definicao_hp.get("min")
             max_val = definicao_hp.get("max")
             if min_val is None or max_val is None:
                 raise ValueError(f"Para o tipo 'int', 'min' e 'max' são obrigatórios para '{nome_hp}'.")
-            valor = random.randint(min_val, max_val)
+            valor = rng.randint(min_val, max_val)
 
         elif tipo == "float":
             min_val = definicao_hp.get("min")
             max_val = definicao_hp.get("max")
             if min_val is None or max_val is None:
                 raise ValueError(f"Para o tipo 'float', 'min' e 'max' são obrigatórios para '{nome_hp}'.")
-            valor = random.uniform(min_val, max_val)
+            valor = rng.uniform(min_val, max_val)
             
         else:
             raise ValueError(f"Tipo de hiperparâmetro '{tipo}' não suportado para '{nome_hp}'. Use 'int', 'float' ou 'choice'.")
@@ -39,24 +45,21 @@ def gerar_solucao_inicial(definicoes_hiperparametros):
 
     return solucao
 
-def solucao_inicial_tempera(definicoes_hiperparametros):
+def solucao_inicial_tempera(definicoes_hiperparametros, rng=random):
     """Gera uma única solução inicial para Têmpera Simulada."""
-    return gerar_solucao_inicial(definicoes_hiperparametros)
+    return solucao_inicial_genetico(definicoes_hiperparametros, 1, rng)[0]
 
-def solucao_inicial_genetico(definicoes_hiperparametros, tamanho_populacao: int):
+def solucao_inicial_genetico(definicoes_hiperparametros, tamanho_populacao: int, rng=random):
     """Gera uma lista de soluções (população inicial) para Algoritmo Genético."""
-    return [gerar_solucao_inicial(definicoes_hiperparametros) for _ in range(tamanho_populacao)]
+    # um `EspacoBusca` já valida as definições uma única vez e sorteia o lote inteiro
+    amostrar = getattr(definicoes_hiperparametros, "amostrar", None)
+    if amostrar is not None:
+        return amostrar(tamanho_populacao, rng)
+    return [gerar_solucao_inicial(definicoes_hiperparametros, rng) for _ in range(tamanho_populacao)]
 
 
 if __name__ == '__main__':
-    definicoes_hiperparametros = {
-        "taxa_aprendizado": {"type": "float", "min": 0.0001, "max": 0.1},
-        "numero_camadas": {"type": "int", "min": 1, "max": 15},
-        "ativacao": {"type": "choice", "options": ["relu", "tanh", "identity", "logistic"]},
-    }
-    
-    for i in range(1, 16):
-        definicoes_hiperparametros[f"neuronios_camada_{i}"] = {"type": "int", "min": 30, "max": 100}
+    from redeneural import definicoes_hiperparametros
     
     print("--- Geração de Instâncias Iniciais ---")
     print("\nSolução Inicial Gerada para Têmpera Simulada:")
@@ -65,7 +68,7 @@ if __name__ == '__main__':
     solucao_ts = solucao_inicial_tempera(definicoes_hiperparametros)
     print(solucao_ts)
 
-    nome_arquivo_tempera = "/home/gmarinho/code/topicos-especiais-otimizacao/algoritmos/metaheuristicas/solucao_tempera.json"
+    nome_arquivo_tempera = ARQUIVO_SOLUCAO_TEMPERA
     with open(nome_arquivo_tempera, 'w', encoding='utf-8') as f:
         json.dump(solucao_ts, f, ensure_ascii=False, indent=4)
     print(f"-> Salvo em '{nome_arquivo_tempera}'")
@@ -82,7 +85,7 @@ if __name__ == '__main__':
     for i, individuo in enumerate(populacao_ag):
         print(f"  Indivíduo {i+1}: {individuo}")
 
-    nome_arquivo_genetico = "/home/gmarinho/code/topicos-especiais-otimizacao/algoritmos/metaheuristicas/populacao_genetico.json"
+    nome_arquivo_genetico = ARQUIVO_POPULACAO
     with open(nome_arquivo_genetico, 'w', encoding='utf-8') as f:
         json.dump(populacao_ag, f, ensure_ascii=False, indent=4)
     print(f"-> Salvo em '{nome_arquivo_genetico}'")
\ No newline at end of file
@@ -0,0 +1,112 @@
+import math
+
+import numpy as np
+
+
+class ModeloSubstituto:
+    """
+    Modelo substituto (surrogate) para pré-triagem dos filhos do Algoritmo Genético.
+
+    Uma floresta aleatória é ajustada a todos os pares (hiperparâmetros, RMSE)
+    já avaliados. A cada geração o AG gera `fator_sobregeracao` vezes mais filhos
+    do que o normal, ordena-os pelo RMSE previsto menos um bônus de incerteza
+    (desvio padrão entre as árvores) e envia ao treino real apenas a fração
+    `fracao_avaliada` da população.
+
+    A floresta não é incremental: cada reajuste treina todas as árvores do zero
+    sobre o conjunto inteiro. Por isso ela só é reajustada quando as amostras
+    novas chegam a `fracao_reajuste` das usadas no último ajuste; entre um
+    reajuste e outro, a triagem usa o modelo anterior.
+    """
+
+    def __init__(self, definicoes_hp, fator_sobregeracao=4, fracao_avaliada=0.25,
+                 fator_incerteza=1.0, min_amostras=10, n_estimators=100, random_state=42,
+                 fracao_reajuste=0.25):
+        """
+        Args:
+            definicoes_hp (dict): Definições dos hiperparâmetros (para a codificação).
+            fator_sobregeracao (int): Quantas vezes o tamanho da população é gerado em filhos.
+            fracao_avaliada (float): Fração da população avaliada de verdade a cada geração.
+            fator_incerteza (float): Peso do desvio padrão no bônus de exploração.
+            min_amostras (int): Número de avaliações antes de o modelo passar a ser usado.
+            n_estimators (int): Árvores da floresta aleatória.
+            random_state (int): Semente da floresta.
+            fracao_reajuste (float): Fração de amostras novas, em relação às do
+                último ajuste, que dispara um novo ajuste (0 = a cada amostra nova).
+        """
+        self.opcoes_ativacao = list(definicoes_hp["ativacao"]["options"])
+        self.max_camadas = sum(1 for gene in definicoes_hp if gene.startswith("neuronios_camada_"))
+        self.fator_sobregeracao = fator_sobregeracao
+        self.fracao_avaliada = fracao_avaliada
+        self.fator_incerteza = fator_incerteza
+        self.min_amostras = min_amostras
+        self.fracao_reajuste = fracao_reajuste
+        # importado sob demanda, como em `redeneural`: só quem usa o substituto paga o import
+        from sklearn.ensemble import RandomForestRegressor
+        self.modelo = RandomForestRegressor(n_estimators=n_estimators, random_state=random_state)
+
+        self.X = []
+        self.y = []
+        self.amostras_ajustadas = 0  # tamanho do conjunto no último ajuste (0 = nunca ajustado)
+        self.ajustes = 0
+
+    def codificar(self, individuo):
+        """Codifica o fenótipo efetivo da rede em um vetor numérico."""
+        num_camadas = int(individuo["numero_camadas"])
+        neuronios = [
+            individuo[f"neuronios_camada_{i+1}"] if i < num_camadas else 0
+            for i in range(self.max_camadas)
+        ]
+        ativacao = [1.0 if individuo["ativacao"] == opcao else 0.0 for opcao in self.opcoes_ativacao]
+        return [math.log10(individuo["taxa_aprendizado"]), num_camadas, sum(neuronios)] + ativacao + neuronios
+
+    def registrar(self, individuos, scores):
+        """Acrescenta novas avaliações ao conjunto de treino do substituto."""
+        for individuo, score in zip(individuos, scores):
+            # falhas (inf) não informam nada sobre a superfície de RMSE
+            if math.isfinite(score):
+                self.X.append(self.codificar(individuo))
+                self.y.append(score)
+
+    def estado(self):
+        """Conjunto de treino do substituto, para gravar em um checkpoint."""
+        return {"X": list(self.X), "y": list(self.y)}
+
+    def restaurar(self, estado):
+        """Restaura o conjunto de treino gravado por `estado()`; o modelo é reajustado no próximo uso."""
+        self.X = list(estado["X"])
+        self.y = list(estado["y"])
+        self.amostras_ajustadas = 0
+
+    def pronto(self):
+        return len(self.y) >= self.min_amostras
+
+    def precisa_reajuste(self):
+        """True se nunca houve ajuste ou se as amostras novas já passam de `fracao_reajuste`."""
+        novas = len(self.y) - self.amostras_ajustadas
+        if self.amostras_ajustadas == 0:
+            return novas > 0
+        return novas > 0 and novas >= self.fracao_reajuste * self.amostras_ajustadas
+
+    def pontuar(self, individuos):
+        """
+        Retorna a pontuação de aquisição de cada indivíduo (menor é mais promissor):
+        RMSE previsto menos `fator_incerteza` vezes o desvio entre as árvores.
+        """
+        if self.precisa_reajuste():
+            self.modelo.fit(np.array(self.X), np.array(self.y))
+            self.amostras_ajustadas = len(self.y)
+            self.ajustes += 1
+
+        X = np.array([self.codificar(individuo) for individuo in individuos])
+        previsoes_arvores = np.stack([arvore.predict(X) for arvore in self.modelo.estimators_])
+        media = previsoes_arvores.mean(axis=0)
+        desvio = previsoes_arvores.std(axis=0)
+        return media - self.fator_incerteza * desvio
+
+    def selecionar(self, candidatos, tamanho_populacao):
+        """Escolhe, entre os candidatos, os que serão avaliados com o treino real."""
+        num_avaliados = max(1, int(math.ceil(tamanho_populacao * self.fracao_avaliada)))
+        pontuacoes = self.pontuar(candidatos)
+        ordem = np.argsort(pontuacoes, kind="stable")[:num_avaliados]
+        return [candidatos[i] for i in ordem]
@@ -0,0 +1,180 @@
+import math
+
+from avaliacao import criar_executor
+from redeneural import calcular_fitness_rmse
+from sementes import FLUXO_TEMPERA_PARALELA, FLUXO_TROCAS, FluxosAleatorios, semear_fitness, semente_aleatoria
+from utils import aceita_probabilistico, perturba
+
+
+def escada_temperaturas(temperatura_minima, temperatura_maxima, num_cadeias):
+    """
+    Gera temperaturas em progressão geométrica entre a mínima e a máxima.
+
+    Returns:
+        list: `num_cadeias` temperaturas em ordem crescente.
+    """
+    if num_cadeias == 1:
+        return [temperatura_minima]
+    razao = (temperatura_maxima / temperatura_minima) ** (1.0 / (num_cadeias - 1))
+    return [temperatura_minima * razao ** k for k in range(num_cadeias)]
+
+
+def executar_segmento(H_atual, score_atual, temperatura, temperatura_referencia,
+                      config_hiperparametros, passos, funcao_fitness, rng):
+    """
+    Executa `passos` iterações de Metropolis de uma cadeia a temperatura fixa.
+
+    Roda dentro de um processo do pool; o gerador `rng` recebido (um fluxo de
+    `sementes.FluxosAleatorios`) torna o segmento reprodutível
+    independentemente do processo que o executa.
+
+    Returns:
+        tuple: (H_atual, score_atual, H_melhor, score_melhor, num_aceitos)
+    """
+    H_melhor, score_melhor = H_atual, score_atual
+    num_aceitos = 0
+
+    for _ in range(passos):
+        Hnew = perturba(H_atual, config_hiperparametros, temperatura, temperatura_referencia, rng)
+        score_new = funcao_fitness(Hnew)
+
+        if score_new < score_atual or aceita_probabilistico(score_atual, score_new, temperatura, rng):
+            H_atual, score_atual = Hnew, score_new
+            num_aceitos += 1
+            if score_atual < score_melhor:
+                H_melhor, score_melhor = H_atual, score_atual
+
+    return H_atual, score_atual, H_melhor, score_melhor, num_aceitos
+
+
+def tempera_paralela(
+    hiperparametros_iniciais,
+    temperaturas,
+    config_hiperparametros,
+    num_trocas=20,                         # Rodadas de troca de réplicas
+    passos_por_troca=10,                   # Perturbações de cada cadeia entre trocas
+    funcao_fitness=calcular_fitness_rmse,  # Precisa ser serializável com pickle se workers > 1
+    workers=1,                             # Processos que executam as cadeias
+    semente=None
+):
+    """
+    Têmpera paralela (parallel tempering / replica exchange).
+
+    K cadeias de Metropolis rodam, cada uma em sua temperatura, em processos
+    separados. A cada `passos_por_troca` perturbações, cadeias vizinhas na escada
+    de temperaturas tentam trocar de estado, o que permite às cadeias frias
+    escapar de mínimos locais explorados pelas cadeias quentes. O melhor global é
+    mantido sobre todas as cadeias.
+
+    Args:
+        hiperparametros_iniciais (dict | list): Solução inicial (copiada para todas
+            as cadeias) ou uma lista com uma solução por cadeia.
+        temperaturas (list): Temperatura de cada cadeia (ver `escada_temperaturas`).
+        config_hiperparametros (dict): Espaço/tipo de cada hiperparâmetro.
+        num_trocas (int): Número de rodadas de troca de réplicas.
+        passos_por_troca (int): Perturbações por cadeia entre duas trocas.
+        funcao_fitness (callable): Função que recebe os hiperparâmetros e retorna o RMSE.
+        workers (int): Número de processos. Com 1 as cadeias rodam em série.
+        semente (int): Semente que controla perturbações e trocas. O segmento
+            da cadeia k na rodada r usa o fluxo (r, k) de
+            `sementes.FluxosAleatorios` e cada avaliação recebe a semente do
+            seu fenótipo, então o resultado não depende de `workers`.
+
+    Returns:
+        tuple: (Hbest_global, score_best_global)
+    """
+    num_cadeias = len(temperaturas)
+    if isinstance(hiperparametros_iniciais, dict):
+        estados = [hiperparametros_iniciais.copy() for _ in range(num_cadeias)]
+    else:
+        estados = [H.copy() for H in hiperparametros_iniciais]
+
+    fluxos = FluxosAleatorios(semente if semente is not None else semente_aleatoria())
+    funcao_fitness = semear_fitness(funcao_fitness, semente)
+    rng = fluxos.gerador(FLUXO_TROCAS)
+    # a maior temperatura da escada define a escala das perturbações
+    temperatura_referencia = max(temperaturas)
+
+    executor = criar_executor(workers)
+    try:
+        if executor is None:
+            scores = [funcao_fitness(H) for H in estados]
+        else:
+            scores = list(executor.map(funcao_fitness, estados))
+
+        indice_melhor = min(range(num_cadeias), key=lambda k: scores[k])
+        Hbest_global = estados[indice_melhor].copy()
+        score_best_global = scores[indice_melhor]
+        print(f"Score inicial (melhor entre {num_cadeias} cadeias): {score_best_global:.5f}")
+
+        for rodada in range(num_trocas):
+            argumentos = [
+                (estados[k], scores[k], temperaturas[k], temperatura_referencia,
+                 config_hiperparametros, passos_por_troca, funcao_fitness,
+                 fluxos.gerador(FLUXO_TEMPERA_PARALELA, rodada, k))
+                for k in range(num_cadeias)
+            ]
+            if executor is None:
+                resultados = [executar_segmento(*args) for args in argumentos]
+            else:
+                futuros = [executor.submit(executar_segmento, *args) for args in argumentos]
+                resultados = [futuro.result() for futuro in futuros]
+
+            for k, (H_atual, score_atual, H_melhor, score_melhor, _) in enumerate(resultados):
+                estados[k], scores[k] = H_atual, score_atual
+                if score_melhor < score_best_global:
+                    Hbest_global, score_best_global = H_melhor.copy(), score_melhor
+                    print(f"NOVO MELHOR GLOBAL (cadeia T={temperaturas[k]:.5f}): {score_best_global:.5f}")
+
+            # troca de réplicas entre temperaturas vizinhas, alternando pares pares/ímpares
+            num_trocas_aceitas = 0
+            for k in range(rodada % 2, num_cadeias - 1, 2):
+                delta = (scores[k] - scores[k + 1]) * (1.0 / temperaturas[k] - 1.0 / temperaturas[k + 1])
+                if delta >= 0 or rng.random() < math.exp(delta):
+                    estados[k], estados[k + 1] = estados[k + 1], estados[k]
+                    scores[k], scores[k + 1] = scores[k + 1], scores[k]
+                    num_trocas_aceitas += 1
+
+            aceitos = sum(resultado[4] for resultado in resultados)
+            print(f"Rodada {rodada+1}/{num_trocas} | Aceitos: {aceitos}/{num_cadeias * passos_por_troca}"
+                  f" | Trocas: {num_trocas_aceitas} | Melhor global: {score_best_global:.5f}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    print(f"\n--- Têmpera Paralela Concluída ---")
+    print(f"Melhor conjunto de hiperparâmetros global (Hbest_global): {Hbest_global}")
+    print(f"Melhor score global: {score_best_global:.5f}")
+
+    return Hbest_global, score_best_global
+
+if __name__ == '__main__':
+    import json
+    from redeneural import definicoes_hiperparametros
+    from solucao_inicial import ARQUIVO_SOLUCAO_TEMPERA
+
+    nome_arquivo_tempera = ARQUIVO_SOLUCAO_TEMPERA
+    try:
+        with open(nome_arquivo_tempera, 'r', encoding='utf-8') as f:
+            solucao_inicial = json.load(f)
+    except FileNotFoundError:
+        print(f"ERRO: Arquivo '{nome_arquivo_tempera}' não encontrado.")
+        exit()
+
+    print("############################ INICIO TEMPERA PARALELA ##############################")
+
+    temperaturas = escada_temperaturas(0.1, 50.0, num_cadeias=4)
+    print(f"Temperaturas das cadeias: {[round(t, 4) for t in temperaturas]}")
+
+    melhores_hiperparametros, melhor_score_final = tempera_paralela(
+        solucao_inicial,
+        temperaturas,
+        definicoes_hiperparametros,
+        num_trocas=20,
+        passos_por_troca=10,
+        workers=4,
+        semente=42,
+    )
+
+    for nome, valor_gerado in melhores_hiperparametros.items():
+        print(f" | {nome}: {valor_gerado}")
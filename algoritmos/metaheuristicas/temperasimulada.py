@@ -1,8 +1,20 @@
 import json
-from solucao_inicial import solucao_inicial_tempera
+import math
+import random
+import time
+
+import instrumentacao
+from avaliacao import avaliar_lote, encerrar_executor, iniciar_executor
+from cache_fitness import FitnessComCache
+from checkpoint import carregar_checkpoint, estado_geradores, restaurar_geradores, salvar_checkpoint
+from sementes import FLUXO_CALIBRACAO, FLUXO_TEMPERA, FluxosAleatorios, semear_fitness
+from solucao_inicial import ARQUIVO_SOLUCAO_TEMPERA, solucao_inicial_tempera
 from utils import aceita_probabilistico, perturba
 from redeneural import calcular_fitness_rmse
 
+# Probabilidade de aceitação abaixo da qual um vizinho pode ter o treino abortado (modo `poda`)
+PROB_MINIMA_ACEITACAO = 1e-3
+
 
 def tempera_simulada(
     hiperparametros_inicias,                             
@@ -11,88 +23,341 @@ def tempera_simulada(
     temperatura_minima,                          
     config_hiperparametros,         # dicionario descrevendo o espaço/tipo de cada hiperparâmetro
     max_iter_sem_melhora_global=30, # Parada se não houver melhora global
-    max_iter_por_temperatura=50     # Número de perturbações por nível de temperatura
+    max_iter_por_temperatura=50,    # Número de perturbações por nível de temperatura
+    funcao_fitness=calcular_fitness_rmse, # Função que recebe os hiperparâmetros e retorna o RMSE
+    lote_especulativo=1,            # Vizinhos sorteados e avaliados de uma vez (modo especulativo)
+    workers=1,                      # Processos usados para avaliar o lote especulativo
+    multifidelidade=None,           # SuccessiveHalving aplicado ao lote especulativo
+    poda=False,                     # Aborta o treino de vizinhos que quase certamente seriam rejeitados
+    caminho_checkpoint=None,        # Arquivo onde o estado é gravado ao fim de cada nível de temperatura
+    estado_checkpoint=None,         # Estado lido de um checkpoint (ver `retomar_tempera_simulada`)
+    orcamento=None,                 # Orcamento com limites de tempo/avaliações, RMSE alvo e estagnação
+    resfriamento=None,              # ResfriamentoAdaptativo: calibra T0 e adapta o resfriamento à taxa de aceitação
+    threads_blas=None,              # Threads BLAS de cada worker (ver `avaliacao.criar_executor`)
+    semente=None                    # Semente dos fluxos aleatórios por perturbação e por avaliação (ver `sementes`)
 ):
+    """
+    Têmpera Simulada sobre os hiperparâmetros da rede.
 
-    # avalia o candidato inicial
-    Hbest_global = hiperparametros_inicias.copy()
-    Hbest_iter = hiperparametros_inicias.copy()
-    score_best_iter = calcular_fitness_rmse(Hbest_iter)
-    score_best_global = score_best_iter
+    No modo especulativo (`lote_especulativo` = B > 1), B perturbações de
+    `Hbest_iter` são sorteadas e avaliadas ao mesmo tempo. O teste de Metropolis
+    é aplicado a elas em ordem e, no primeiro vizinho aceito, os candidatos
+    restantes são descartados, pois foram gerados a partir do estado antigo.
+    Como a maioria dos movimentos é rejeitada em temperaturas baixas, quase todo
+    o lote é aproveitado. A cadeia de Markov é a mesma do modo sequencial; apenas
+    a ordem de consumo do gerador aleatório muda quando B > 1.
 
-    print(f"Avaliando configuração inicial hiperparametros_inicias: {hiperparametros_inicias}")
-    print(f"Score inicial (hiperparametros_inicias): {score_best_iter:.5f}")
-    
-    # temperatura é inicializada
-    temperatura = temperatura_inicial
-    
-    iter_sem_melhora_global_count = 0
-    ciclos_resfriamento = 0
+    Com `semente`, a perturbação de índice i do nível c e o seu teste de
+    Metropolis usam o fluxo (c, i) de `sementes.FluxosAleatorios`, e cada
+    avaliação recebe uma semente derivada do fenótipo. Nesse caso a cadeia é
+    exatamente a mesma com qualquer `lote_especulativo`, `workers`, cache ou
+    broker, o que permite validar os modos rápidos contra a execução serial.
+
+    Com `multifidelidade`, o lote especulativo passa por successive halving:
+    vizinhos eliminados na triagem de poucas épocas são rejeitados sem o teste
+    de Metropolis e só os promovidos recebem o treino completo. Faz sentido
+    quando `lote_especulativo` é maior que o `eta` do escalonador.
+
+    Com `poda`, o treino de cada vizinho é abortado quando o RMSE de validação
+    fica claramente acima de `score_best_iter + T * ln(1 / PROB_MINIMA_ACEITACAO)`,
+    valor a partir do qual a chance de aceitação é desprezível.
+
+    Com `caminho_checkpoint`, as soluções atual e melhor, a temperatura, os
+    contadores e o estado dos geradores aleatórios, do `orcamento` e do
+    `resfriamento` (T0 calibrada, reaquecimentos) são gravados ao fim de cada
+    nível de temperatura, o que permite continuar a cadeia exatamente do mesmo
+    ponto com `retomar_tempera_simulada`.
+
+    Com `orcamento`, a execução também para quando o tempo ou as avaliações se
+    esgotam, o RMSE alvo é atingido ou o melhor global estagna por `paciencia`
+    níveis. Tempo e avaliações são verificados a cada lote, inclusive no meio de
+    um nível; o resultado é sempre o melhor global encontrado até a parada.
+
+    Com `resfriamento` (ver `ResfriamentoAdaptativo`), `temperatura_inicial` é
+    calibrada a partir de uma amostra de perturbações da solução inicial e
+    `taxa_resfriamento` é ignorada: a temperatura de cada nível (que pode subir,
+    em reaquecimentos) é escolhida pela taxa de aceitação de pioras do nível
+    anterior, e um nível termina mais cedo quando já aceitou movimentos
+    suficientes. `max_iter_por_temperatura` passa a ser o máximo por nível.
+    """
+
+    fluxos = None
+    if semente is not None:
+        fluxos = FluxosAleatorios(semente)
+        funcao_fitness = semear_fitness(funcao_fitness, semente)
+    if orcamento is not None:
+        # antes da avaliação inicial, para que ela também seja contada
+        orcamento.acompanhar(funcao_fitness)
+
+    def gerador(*chaves):
+        return random if fluxos is None else fluxos.gerador(*chaves)
 
-    # enquanto temperatura não é a minima E ainda não teve 10 iterações sem melhora
-    while temperatura > temperatura_minima and iter_sem_melhora_global_count < max_iter_sem_melhora_global:
-        ciclos_resfriamento += 1
-        print(f"\nCiclo de Resfriamento {ciclos_resfriamento} - Temperatura: {temperatura:.5f}")
+    if estado_checkpoint is None:
+        # avalia o candidato inicial
+        Hbest_global = hiperparametros_inicias.copy()
+        Hbest_iter = hiperparametros_inicias.copy()
+        score_best_iter = funcao_fitness(Hbest_iter)
+        score_best_global = score_best_iter
+
+        print(f"Avaliando configuração inicial hiperparametros_inicias: {hiperparametros_inicias}")
+        print(f"Score inicial (hiperparametros_inicias): {score_best_iter:.5f}")
         
-        num_aceitos_nesta_temp = 0
-        for i_pert in range(max_iter_por_temperatura):
-            
-            # cria e avalia nova solução usando perturbação 
-            Hnew = perturba(Hbest_iter, config_hiperparametros, temperatura, temperatura_inicial)
-            score_new = calcular_fitness_rmse(Hnew)
+        # temperatura é inicializada
+        temperatura = temperatura_inicial
+        
+        iter_sem_melhora_global_count = 0
+        ciclos_resfriamento = 0
+    else:
+        Hbest_global = estado_checkpoint["Hbest_global"]
+        score_best_global = estado_checkpoint["score_best_global"]
+        Hbest_iter = estado_checkpoint["Hbest_iter"]
+        score_best_iter = estado_checkpoint["score_best_iter"]
+        temperatura = estado_checkpoint["temperatura"]
+        iter_sem_melhora_global_count = estado_checkpoint["iter_sem_melhora_global_count"]
+        ciclos_resfriamento = estado_checkpoint["ciclos_resfriamento"]
+        restaurar_geradores(estado_checkpoint["geradores"])
+        if resfriamento is not None and estado_checkpoint.get("resfriamento") is not None:
+            resfriamento.restaurar(estado_checkpoint["resfriamento"])
+            temperatura_inicial = resfriamento.temperatura_inicial
+        print(f"Retomando após o ciclo de resfriamento {ciclos_resfriamento} - Temperatura: {temperatura:.5f}")
+
+    motivo_parada = None
+    if orcamento is not None:
+        orcamento.iniciar()
+        if estado_checkpoint is None:
+            orcamento.contar(1)
+            orcamento.atualizar(score_best_global)
+        elif estado_checkpoint.get("orcamento") is not None:
+            # avaliações, paciência e relógio continuam de onde pararam
+            orcamento.restaurar(estado_checkpoint["orcamento"])
+        else:
+            orcamento.atualizar(score_best_global)
+        motivo_parada = orcamento.esgotado()
+
+    executor, limite_threads = iniciar_executor(workers, threads_blas)
+    try:
+        if resfriamento is not None and estado_checkpoint is None and motivo_parada is None:
+            temperatura_inicial, amostras, scores_amostras = resfriamento.calibrar(
+                Hbest_iter, score_best_iter, config_hiperparametros, funcao_fitness, executor,
+                rng=gerador(FLUXO_CALIBRACAO)
+            )
+            temperatura = temperatura_inicial
+            print(f"Temperatura inicial calibrada com {len(amostras)} perturbações: {temperatura_inicial:.5f}")
+            # as amostras já foram avaliadas: uma melhora é aceita como movimento normal
+            score_amostra, H_amostra = min(zip(scores_amostras, amostras), key=lambda par: par[0])
+            if score_amostra < score_best_iter:
+                Hbest_iter, score_best_iter = H_amostra.copy(), score_amostra
+                Hbest_global, score_best_global = H_amostra.copy(), score_amostra
+                print(f"NOVO MELHOR GLOBAL: {score_best_global:.5f}")
+            if orcamento is not None:
+                orcamento.contar(len(amostras))
+                motivo_parada = orcamento.esgotado(score_best_global)
 
-            # a solução é aceita se for melhor, ou se for pior mas passar no teste probabilístico.
-            is_melhor = score_new < score_best_iter
-            is_aceita_probabilistica = aceita_probabilistico(score_best_iter, score_new, temperatura)
+        # enquanto temperatura não é a minima E ainda não teve 10 iterações sem melhora
+        while (temperatura > temperatura_minima and iter_sem_melhora_global_count < max_iter_sem_melhora_global
+               and motivo_parada is None):
+            ciclos_resfriamento += 1
+            print(f"\nCiclo de Resfriamento {ciclos_resfriamento} - Temperatura: {temperatura:.5f}")
+            
+            num_aceitos_nesta_temp = 0
+            num_melhores_nesta_temp = 0
+            num_avaliados_nesta_temp = 0
+            num_piores_nesta_temp = 0
+            melhorou_global_nesta_temp = False
+            tempo_avaliacao = 0.0
+            inicio_nivel = time.perf_counter()
+            i_pert = 0
+            while i_pert < max_iter_por_temperatura and not (
+                    resfriamento is not None
+                    and resfriamento.nivel_concluido(num_melhores_nesta_temp + num_aceitos_nesta_temp, max_iter_por_temperatura)):
+                
+                # cria e avalia novas soluções usando perturbação (um lote de vizinhos do estado atual)
+                tamanho_lote = min(lote_especulativo, max_iter_por_temperatura - i_pert)
+                if orcamento is not None and orcamento.avaliacoes_restantes() is not None:
+                    tamanho_lote = min(tamanho_lote, orcamento.avaliacoes_restantes())
+                # um gerador por perturbação, também usado no seu teste de Metropolis
+                geradores = [gerador(FLUXO_TEMPERA, ciclos_resfriamento, i_pert + j) for j in range(tamanho_lote)]
+                candidatos = [
+                    perturba(Hbest_iter, config_hiperparametros, temperatura, temperatura_inicial, rng)
+                    for rng in geradores
+                ]
+                opcoes = {}
+                if poda and math.isfinite(score_best_iter):
+                    opcoes["limiar_poda"] = score_best_iter + temperatura * math.log(1.0 / PROB_MINIMA_ACEITACAO)
 
-            if is_melhor or is_aceita_probabilistica:
-                if is_melhor:
-                    print(f"Perturbação. {i_pert+1}: Solução MELHOR ({score_new:.5f} < {score_best_iter:.5f}) ---> ACEITA")
+                inicio_avaliacao = time.perf_counter()
+                if multifidelidade is None:
+                    scores_candidatos = avaliar_lote(candidatos, funcao_fitness, executor, **opcoes)
+                    fidelidades = [1.0] * tamanho_lote
+                    num_treinos = tamanho_lote
                 else:
-                    num_aceitos_nesta_temp += 1
-                    print(f"Perturbação. {i_pert+1}: Solução PIOR ({score_new:.5f} >= {score_best_iter:.5f}) ----> ACEITA (probabilisticamente)")
+                    custo_antes = multifidelidade.custo_total
+                    scores_candidatos, fidelidades = multifidelidade.avaliar(candidatos, funcao_fitness, executor, **opcoes)
+                    num_treinos = multifidelidade.custo_total - custo_antes
+                tempo_avaliacao += time.perf_counter() - inicio_avaliacao
+                num_avaliados_nesta_temp += tamanho_lote
+                if orcamento is not None:
+                    orcamento.contar(num_treinos)
+
+                for Hnew, score_new, fidelidade, rng in zip(candidatos, scores_candidatos, fidelidades, geradores):
+                    i_pert += 1
+
+                    if fidelidade < 1.0:
+                        num_piores_nesta_temp += 1
+                        print(f"Perturbação. {i_pert}: Solução descartada na triagem (RMSE {score_new:.5f} com fidelidade {fidelidade:.3f}) ---> REJEITADA")
+                        continue
+
+                    # a solução é aceita se for melhor, ou se for pior mas passar no teste probabilístico.
+                    is_melhor = score_new < score_best_iter
+                    if not is_melhor:
+                        num_piores_nesta_temp += 1
+                    is_aceita_probabilistica = aceita_probabilistico(score_best_iter, score_new, temperatura, rng)
 
-                # atualiza a melhor solução da iteração atual
-                Hbest_iter = Hnew.copy()
-                score_best_iter = score_new
+                    if is_melhor or is_aceita_probabilistica:
+                        if is_melhor:
+                            num_melhores_nesta_temp += 1
+                            print(f"Perturbação. {i_pert}: Solução MELHOR ({score_new:.5f} < {score_best_iter:.5f}) ---> ACEITA")
+                        else:
+                            num_aceitos_nesta_temp += 1
+                            print(f"Perturbação. {i_pert}: Solução PIOR ({score_new:.5f} >= {score_best_iter:.5f}) ----> ACEITA (probabilisticamente)")
 
-                # após aceitar uma solução, verificamos se ela é um novo melhor global
-                if score_best_iter < score_best_global:
-                    Hbest_global = Hbest_iter.copy()
-                    score_best_global = score_best_iter
-                    iter_sem_melhora_global_count = 0 
-                    print(f"NOVO MELHOR GLOBAL: {score_best_global:.5f}")
+                        # atualiza a melhor solução da iteração atual
+                        Hbest_iter = Hnew.copy()
+                        score_best_iter = score_new
 
+                        # após aceitar uma solução, verificamos se ela é um novo melhor global
+                        if score_best_iter < score_best_global:
+                            Hbest_global = Hbest_iter.copy()
+                            score_best_global = score_best_iter
+                            melhorou_global_nesta_temp = True
+                            print(f"NOVO MELHOR GLOBAL: {score_best_global:.5f}")
+
+                        # o restante do lote partiu do estado anterior e é descartado
+                        break
+
+                    else:
+                        print(f"Perturbação. {i_pert}: Solução PIOR ({score_new:.5f} >= {score_best_iter:.5f}) ---> REJEITADA")
+
+                if orcamento is not None:
+                    motivo_parada = orcamento.esgotado(score_best_global)
+                    if motivo_parada is not None:
+                        break
+
+            if motivo_parada is not None:
+                # nível interrompido no meio: não resfria nem grava checkpoint
+                break
+            
+            print(f"\nResumo da Temperatura {temperatura:.5f}: {num_aceitos_nesta_temp}/{i_pert} soluções foram aceitas.")
+
+            if instrumentacao.ativo():
+                tempo_nivel = time.perf_counter() - inicio_nivel
+                instrumentacao.emitir(
+                    "temperatura",
+                    ciclo=ciclos_resfriamento,
+                    temperatura=temperatura,
+                    aceitos_melhores=num_melhores_nesta_temp,
+                    aceitos_probabilisticos=num_aceitos_nesta_temp,
+                    perturbacoes=i_pert,
+                    pioras_propostas=num_piores_nesta_temp,
+                    avaliados=num_avaliados_nesta_temp,
+                    tempo=tempo_nivel,
+                    tempo_avaliacao=tempo_avaliacao,
+                    tempo_otimizador=tempo_nivel - tempo_avaliacao,
+                    score_atual=score_best_iter,
+                    score_melhor_global=score_best_global,
+                )
+            
+            # aplica resfriamento; o contador só avança em ciclos sem novo melhor global
+            if resfriamento is None:
+                temperatura *= taxa_resfriamento
             else:
-                print(f"Perturbação. {i_pert+1}: Solução PIOR ({score_new:.5f} >= {score_best_iter:.5f}) ---> REJEITADA")
-        
-        print(f"\nResumo da Temperatura {temperatura:.5f}: {num_aceitos_nesta_temp}/{max_iter_por_temperatura} soluções foram aceitas.")
-        
-        # aplica resfriamento
-        temperatura *= taxa_resfriamento
-        iter_sem_melhora_global_count +=1
+                temperatura_anterior = temperatura
+                temperatura = resfriamento.proxima_temperatura(
+                    temperatura, temperatura_inicial, ciclos_resfriamento, num_aceitos_nesta_temp, num_piores_nesta_temp
+                )
+                print(f"Aceitação de pioras: {num_aceitos_nesta_temp}/{num_piores_nesta_temp} "
+                      f"(alvo {resfriamento.alvo(ciclos_resfriamento + 1):.3f}) | "
+                      f"{'Reaquecimento' if temperatura > temperatura_anterior else 'Resfriamento'} para {temperatura:.5f}")
+            if melhorou_global_nesta_temp:
+                iter_sem_melhora_global_count = 0
+            else:
+                iter_sem_melhora_global_count += 1
+
+            if orcamento is not None:
+                orcamento.atualizar(score_best_global)
+                motivo_parada = orcamento.esgotado()
+
+            if caminho_checkpoint is not None:
+                salvar_checkpoint(caminho_checkpoint, {
+                    "algoritmo": "tempera",
+                    "Hbest_global": Hbest_global,
+                    "score_best_global": score_best_global,
+                    "Hbest_iter": Hbest_iter,
+                    "score_best_iter": score_best_iter,
+                    "temperatura": temperatura,
+                    "iter_sem_melhora_global_count": iter_sem_melhora_global_count,
+                    "ciclos_resfriamento": ciclos_resfriamento,
+                    "parametros": {
+                        "temperatura_inicial": temperatura_inicial,
+                        "taxa_resfriamento": taxa_resfriamento,
+                        "temperatura_minima": temperatura_minima,
+                        "max_iter_sem_melhora_global": max_iter_sem_melhora_global,
+                        "max_iter_por_temperatura": max_iter_por_temperatura,
+                    },
+                    "semente": semente,
+                    "geradores": estado_geradores(),
+                    "orcamento": None if orcamento is None else orcamento.estado(),
+                    "resfriamento": None if resfriamento is None else resfriamento.estado(),
+                })
+    finally:
+        encerrar_executor(executor, limite_threads)
 
     if temperatura <= temperatura_minima:
         print(f"\nParada: Temperatura temperatura ({temperatura:.5f}) atingiu ou passou temperatura_minima ({temperatura_minima}).")
     if iter_sem_melhora_global_count >= max_iter_sem_melhora_global:
         print(f"\nParada: Sem melhora global por {max_iter_sem_melhora_global} ciclos de resfriamento.")
+    if motivo_parada is not None:
+        print(f"\nParada: {motivo_parada}.")
+        instrumentacao.emitir("parada", motivo=motivo_parada, **orcamento.resumo())
 
     print(f"\n=====================================================================================================")
     print(f"\n--- Otimização Concluída ---")
     print(f"Melhor conjunto de hiperparâmetros global (Hbest_global): {Hbest_global}")
     print(f"Melhor score global: {score_best_global:.5f}")
+    if multifidelidade is not None:
+        print(f"Custo de avaliação (multi-fidelidade): {multifidelidade.relatorio()}")
+    if resfriamento is not None:
+        print(f"Temperatura inicial: {temperatura_inicial:.5f} | Reaquecimentos: {resfriamento.reaquecimentos}")
 
     return Hbest_global, score_best_global
 
-if __name__ == '__main__':
-    definicoes_hiperparametros = {
-    "taxa_aprendizado": {"type": "float", "min": 0.0001, "max": 0.1},
-    "numero_camadas": {"type": "int", "min": 1, "max": 15},
-    "ativacao": {"type": "choice", "options": ["relu", "tanh", "identity", "logistic"]},
-    }
 
-    for i in range(1, 16):
-        definicoes_hiperparametros[f"neuronios_camada_{i}"] = {"type": "int", "min": 30, "max": 100}
+def retomar_tempera_simulada(caminho_checkpoint, config_hiperparametros, **kwargs):
+    """
+    Continua uma Têmpera Simulada a partir de um checkpoint.
+
+    Os parâmetros do resfriamento vêm do checkpoint; os demais argumentos de
+    `tempera_simulada` (função de fitness, workers, ...) podem ser passados
+    novamente em `kwargs`; a semente gravada no checkpoint é reaproveitada se
+    nenhuma for passada. Um `orcamento` ou `resfriamento` passado em `kwargs`
+    continua do estado gravado no checkpoint.
+
+    Returns:
+        tuple: (Hbest_global, score_best_global)
+    """
+    estado = carregar_checkpoint(caminho_checkpoint)
+    kwargs.setdefault("semente", estado.get("semente"))
+    return tempera_simulada(
+        None,
+        config_hiperparametros=config_hiperparametros,
+        caminho_checkpoint=caminho_checkpoint,
+        estado_checkpoint=estado,
+        **estado["parametros"],
+        **kwargs,
+    )
+
+if __name__ == '__main__':
+    from redeneural import definicoes_hiperparametros
 
     hiperparametros_inicias_exemplo = solucao_inicial_tempera(definicoes_hiperparametros)
 
@@ -104,7 +369,7 @@ if __name__ == '__main__':
 
 
     #LEITURA DO ARQUIVO
-    nome_arquivo_tempera = "algoritmos/metaheuristicas/solucao_tempera.json"
+    nome_arquivo_tempera = ARQUIVO_SOLUCAO_TEMPERA
     try:
         print(f"Lendo população inicial do arquivo '{nome_arquivo_tempera}'...")
         with open(nome_arquivo_tempera, 'r', encoding='utf-8') as f:
@@ -122,7 +387,9 @@ if __name__ == '__main__':
 
     
     print("############################ INICIO TEMPERA SIMULADA ##############################")
-    
+
+    fitness_cache = FitnessComCache(calcular_fitness_rmse, caminho_banco="cache_fitness.sqlite")
+
     melhores_hiperparametros, melhor_score_final = tempera_simulada(
         hiperparametros_inicias_exemplo,
         temperatura_inicial_exemplo,
@@ -130,8 +397,11 @@ if __name__ == '__main__':
         temperatura_minima,
         definicoes_hiperparametros,
         max_iter_sem_melhora_ex,
-        max_iter_por_temp_ex
+        max_iter_por_temp_ex,
+        fitness_cache
     )
+    print(f"Cache de fitness: {fitness_cache.estatisticas()}")
+    fitness_cache.fechar()
 
     for nome, valor_gerado in melhores_hiperparametros.items():
         print(f" | {nome}: {valor_gerado}")
\ No newline at end of file
@@ -0,0 +1,27 @@
+import os
+import random
+import sys
+
+import pytest
+
+# os módulos de `metaheuristicas` importam uns aos outros pelo nome, como nos scripts
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from redeneural import definicoes_hiperparametros  # noqa: E402
+from solucao_inicial import solucao_inicial_genetico  # noqa: E402
+
+
+@pytest.fixture
+def definicoes_hp():
+    return definicoes_hiperparametros
+
+
+@pytest.fixture
+def populacao(definicoes_hp):
+    random.seed(1)
+    return solucao_inicial_genetico(definicoes_hp, 6)
+
+
+@pytest.fixture
+def individuo(populacao):
+    return populacao[0]
@@ -0,0 +1,22 @@
+import os
+
+from algoritmogenetico import algoritmo_genetico
+from avaliacao import VARIAVEIS_THREADS, limitar_threads_blas
+from utils import fitness_sintetica
+
+
+def test_limite_de_threads_e_restaurado(monkeypatch):
+    monkeypatch.setenv("OMP_NUM_THREADS", "3")
+    monkeypatch.delenv("MKL_NUM_THREADS", raising=False)
+    with limitar_threads_blas(1):
+        assert all(os.environ[variavel] == "1" for variavel in VARIAVEIS_THREADS)
+    assert os.environ["OMP_NUM_THREADS"] == "3"
+    assert "MKL_NUM_THREADS" not in os.environ
+    assert limitar_threads_blas(None) is None
+
+
+def test_modo_serial_nao_deixa_o_limite_no_processo(monkeypatch, populacao, definicoes_hp):
+    for variavel in VARIAVEIS_THREADS:
+        monkeypatch.delenv(variavel, raising=False)
+    algoritmo_genetico(populacao, len(populacao), 1, 0.4, definicoes_hp, fitness_sintetica, threads_blas=1)
+    assert not any(variavel in os.environ for variavel in VARIAVEIS_THREADS)
@@ -0,0 +1,24 @@
+from algoritmogenetico import algoritmo_genetico_assincrono
+from benchmark import FitnessCronometrada, executar_cenario
+from utils import fitness_sintetica
+
+
+def test_cenario_com_cache_separa_treinos_de_acertos():
+    registro = executar_cenario("tempera", "sintetica", "cache", 1, 1)
+    assert registro["treinos"] == registro["cache"]["falhas"]
+    assert registro["treinos"] < registro["avaliacoes"]
+
+
+def test_cenario_reprodutivel_com_a_semente():
+    a = executar_cenario("genetico", "sintetica", "serial", 3, 1)
+    b = executar_cenario("genetico", "sintetica", "serial", 3, 1)
+    assert a["melhor"] == b["melhor"] and a["treinos"] == b["treinos"] == a["avaliacoes"]
+
+
+def test_cronometrada_conta_avaliacoes_assincronas(populacao, definicoes_hp):
+    fitness = FitnessCronometrada(fitness_sintetica)
+    algoritmo_genetico_assincrono(populacao, len(populacao), 0.4, definicoes_hp, fitness,
+                                  workers=2, max_avaliacoes=6, semente=1)
+    fitness.registrar_concluidas()
+    assert fitness.avaliacoes == len(populacao) + 6
+    assert fitness.curva
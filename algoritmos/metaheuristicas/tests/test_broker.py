@@ -0,0 +1,99 @@
+import multiprocessing
+import time
+
+import pytest
+
+from avaliacao import submeter
+from broker import (ENDERECO_PADRAO, AvaliadorRemoto, EstadoBroker, conectar, gerar_chave, iniciar_broker,
+                    iniciar_workers_locais)
+from sementes import FitnessSemeada
+from utils import fitness_sintetica
+
+
+def test_ciclo_de_um_trabalho():
+    estado = EstadoBroker()
+    ids = estado.enviar([({"a": 1}, {}), ({"a": 2}, {"semente": 5})])
+    lote = estado.pegar("w1", 10)
+    assert [t[0] for t in lote] == ids
+    assert lote[1][2] == {"semente": 5}
+
+    estado.entregar("w1", [(ids[0], 1.5)])
+    assert estado.coletar(ids) == {ids[0]: 1.5}
+    # resultados coletados saem do broker
+    assert estado.coletar(ids) == {}
+    assert estado.estatisticas()["em_andamento"] == 1
+
+
+def test_desconectar_devolve_trabalhos_a_fila():
+    estado = EstadoBroker()
+    ids = estado.enviar([({"a": 1}, {}), ({"a": 2}, {})])
+    estado.pegar("w1", 1)
+    estado.desconectar("w1")
+    assert estado.estatisticas()["pendentes"] == 2
+    assert estado.reenfileirados == 1
+    # o trabalho devolvido volta para o início da fila
+    assert estado.pegar("w2", 1)[0][0] == ids[0]
+
+
+def test_desconectar_worker_desconhecido_ou_repetido():
+    estado = EstadoBroker()
+    estado.desconectar("nunca_visto")
+    estado.pegar("w1", 1)
+    estado.desconectar("w1")
+    estado.desconectar("w1")
+    assert estado.estatisticas()["workers_ativos"] == 0
+
+
+def test_entrega_duplicada_e_ignorada():
+    estado = EstadoBroker()
+    [id_trabalho] = estado.enviar([({"a": 1}, {})])
+    estado.pegar("w1", 1)
+    estado.entregar("w1", [(id_trabalho, 1.0)])
+    estado.entregar("w1", [(id_trabalho, 2.0)])
+    assert estado.coletar([id_trabalho]) == {id_trabalho: 1.0}
+
+    estado.entregar("w1", [(id_trabalho, 3.0)])
+    assert estado.resultados == {}
+    assert estado.concluidos == 1
+
+
+def test_worker_sem_batimento_perde_o_trabalho():
+    estado = EstadoBroker(timeout_batimento=0.01)
+    [id_trabalho] = estado.enviar([({"a": 1}, {})])
+    estado.pegar("lento", 1)
+    time.sleep(0.05)
+    assert estado.pegar("rapido", 1)[0][0] == id_trabalho
+
+    # o worker "morto" entrega depois: o primeiro resultado vale
+    estado.entregar("lento", [(id_trabalho, 1.0)])
+    estado.entregar("rapido", [(id_trabalho, 2.0)])
+    assert estado.coletar([id_trabalho]) == {id_trabalho: 1.0}
+    assert estado.estatisticas()["pendentes"] == 0
+
+
+def test_broker_local_com_chave_gerada():
+    assert ENDERECO_PADRAO[0] == "127.0.0.1"
+    gerenciador = iniciar_broker(("127.0.0.1", 0))
+    try:
+        assert len(gerenciador.chave) == 32
+        broker = conectar(gerenciador.address, gerenciador.chave)
+        assert broker.enviar([({"a": 1}, {})]) == [0]
+        with pytest.raises(multiprocessing.AuthenticationError):
+            conectar(gerenciador.address, gerar_chave())
+    finally:
+        gerenciador.shutdown()
+
+
+def test_submeter_nao_espera_o_worker(individuo):
+    gerenciador = iniciar_broker(("127.0.0.1", 0))
+    try:
+        avaliador = AvaliadorRemoto(gerenciador.address, gerenciador.chave, intervalo_consulta=0.01, semente=3)
+        futuro = submeter(individuo, avaliador)
+        assert not futuro.done()
+        processos = iniciar_workers_locais(gerenciador.address, 1, gerenciador.chave,
+                                           funcao_fitness=fitness_sintetica, intervalo_espera=0.01)
+        assert futuro.result(timeout=10) == FitnessSemeada(fitness_sintetica, 3)(individuo)
+        for processo in processos:
+            processo.terminate()
+    finally:
+        gerenciador.shutdown()
@@ -0,0 +1,118 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from avaliacao import submeter
+from cache_fitness import FitnessComCache
+from utils import fitness_sintetica
+
+
+class Contadora:
+    """Fitness determinística que conta as chamadas."""
+
+    def __init__(self, valor=1.0, aquecida=False):
+        self.valor = valor
+        self.aquecida = aquecida
+        self.chamadas = 0
+
+    def __call__(self, hiperparametros, **opcoes):
+        self.chamadas += 1
+        return self.valor
+
+    def aquecera(self, hiperparametros):
+        return self.aquecida
+
+
+def test_chave_inclui_opcoes_da_avaliacao(individuo):
+    cache = FitnessComCache(Contadora())
+    assert cache.chave(individuo) != cache.chave(individuo, fidelidade=0.5)
+    assert cache.chave(individuo, fidelidade=0.5) == cache.chave(individuo, fidelidade=0.5)
+
+
+def test_chave_ignora_limiar_de_poda(individuo):
+    cache = FitnessComCache(Contadora())
+    assert cache.chave(individuo) == cache.chave(individuo, limiar_poda=3.0)
+
+
+def test_chave_ignora_genes_de_camadas_inativas(individuo):
+    cache = FitnessComCache(Contadora())
+    inativa = f"neuronios_camada_{individuo['numero_camadas'] + 1}"
+    alterado = dict(individuo, **{inativa: individuo[inativa] + 1})
+    assert cache.chave(individuo) == cache.chave(alterado)
+
+
+def test_acerto_nao_reavalia(individuo):
+    funcao = Contadora()
+    cache = FitnessComCache(funcao)
+    assert cache(individuo) == cache(individuo) == 1.0
+    assert funcao.chamadas == 1
+    assert cache.estatisticas()["acertos_memoria"] == 1
+
+
+def test_disco_guarda_so_valores_completos_e_finitos(tmp_path, populacao):
+    caminho = str(tmp_path / "cache.sqlite")
+    cache = FitnessComCache(Contadora(), caminho_banco=caminho)
+    cache(populacao[0])
+    cache(populacao[1], limiar_poda=2.0)
+    cache.funcao_fitness = Contadora(math.inf)
+    cache(populacao[2])
+    cache.fechar()
+
+    funcao = Contadora(7.0)
+    cache = FitnessComCache(funcao, caminho_banco=caminho)
+    assert cache(populacao[0]) == 1.0
+    assert cache(populacao[1]) == 7.0
+    assert cache(populacao[2]) == 7.0
+    assert cache.estatisticas()["acertos_disco"] == 1
+    assert funcao.chamadas == 2
+    cache.fechar()
+
+
+def test_lote_avalia_fenotipos_repetidos_uma_vez(populacao):
+    funcao = Contadora()
+    cache = FitnessComCache(funcao)
+    lote = populacao[:3] + populacao[:3]
+    assert cache.avaliar_lote(lote) == [1.0] * 6
+    assert funcao.chamadas == 3
+    assert cache.estatisticas()["acertos_memoria"] == 3
+
+
+def test_valor_podado_so_serve_limiar_igual_ou_mais_exigente(individuo):
+    funcao = Contadora()
+    cache = FitnessComCache(funcao)
+    cache(individuo, limiar_poda=2.0)
+    cache(individuo, limiar_poda=1.5)
+    assert funcao.chamadas == 1
+    cache(individuo, limiar_poda=3.0)
+    assert funcao.chamadas == 2
+    cache(individuo)
+    assert funcao.chamadas == 3
+    # o valor completo serve a qualquer limiar
+    cache(individuo, limiar_poda=3.0)
+    assert funcao.chamadas == 3
+
+
+def test_treino_aquecido_nao_e_guardado(individuo):
+    funcao = Contadora(aquecida=True)
+    cache = FitnessComCache(funcao)
+    cache(individuo)
+    cache.avaliar_lote([individuo])
+    assert funcao.chamadas == 2
+    assert cache.estatisticas()["entradas_memoria"] == 0
+
+
+def test_submeter_envia_falhas_ao_executor_e_registra_no_callback(populacao):
+    cache = FitnessComCache(fitness_sintetica)
+    cache.semear(3)
+    with ThreadPoolExecutor(2) as executor:
+        futuros = [submeter(individuo, cache, executor) for individuo in populacao[:2] + populacao[:1]]
+        valores = [futuro.result() for futuro in futuros]
+    # o fenótipo já em treino não é enviado de novo
+    assert valores[0] == valores[2]
+    estatisticas = cache.estatisticas()
+    assert estatisticas["falhas"] == 2
+    assert estatisticas["acertos_memoria"] == 1
+    assert estatisticas["entradas_memoria"] == 2
+    assert cache.em_voo == {}
+
+    futuro = submeter(populacao[1], cache, None)
+    assert futuro.done() and futuro.result() == valores[1]
@@ -0,0 +1,107 @@
+import os
+import random
+
+from algoritmogenetico import algoritmo_genetico, retomar_algoritmo_genetico
+from checkpoint import carregar_checkpoint, salvar_checkpoint
+from orcamento import Orcamento
+from resfriamento import ResfriamentoAdaptativo
+from substituto import ModeloSubstituto
+from temperasimulada import retomar_tempera_simulada, tempera_simulada
+from utils import fitness_sintetica
+
+
+def test_salvar_e_carregar(tmp_path):
+    caminho = str(tmp_path / "estado.pkl")
+    salvar_checkpoint(caminho, {"geracao": 1})
+    salvar_checkpoint(caminho, {"geracao": 2, "populacao": [{"fitness": 0.5}]})
+    assert carregar_checkpoint(caminho) == {"geracao": 2, "populacao": [{"fitness": 0.5}]}
+    assert os.listdir(tmp_path) == ["estado.pkl"]
+
+
+def test_retomar_genetico_da_o_mesmo_resultado(tmp_path, populacao, definicoes_hp):
+    caminho = str(tmp_path / "genetico.pkl")
+    random.seed(3)
+    completo = algoritmo_genetico(populacao, len(populacao), 4, 0.4, definicoes_hp, fitness_sintetica)
+
+    # execução "interrompida" após 2 gerações, depois retomada até 4
+    random.seed(3)
+    algoritmo_genetico(populacao, len(populacao), 2, 0.4, definicoes_hp,
+                       fitness_sintetica, caminho_checkpoint=caminho)
+    estado = carregar_checkpoint(caminho)
+    assert estado["geracao"] == 2
+    estado["num_geracoes"] = 4
+    salvar_checkpoint(caminho, estado)
+
+    random.seed(99)  # o estado dos geradores vem do checkpoint
+    retomado = retomar_algoritmo_genetico(caminho, definicoes_hp, funcao_fitness=fitness_sintetica)
+    assert retomado == completo
+    assert carregar_checkpoint(caminho)["geracao"] == 4
+
+
+def test_retomar_genetico_com_semente(tmp_path, populacao, definicoes_hp):
+    caminho = str(tmp_path / "genetico.pkl")
+    completo = algoritmo_genetico(populacao, len(populacao), 4, 0.4, definicoes_hp,
+                                  fitness_sintetica, semente=3)
+
+    algoritmo_genetico(populacao, len(populacao), 2, 0.4, definicoes_hp,
+                       fitness_sintetica, caminho_checkpoint=caminho, semente=3)
+    estado = carregar_checkpoint(caminho)
+    assert estado["semente"] == 3
+    estado["num_geracoes"] = 4
+    salvar_checkpoint(caminho, estado)
+
+    # a semente gravada no checkpoint é reaproveitada
+    retomado = retomar_algoritmo_genetico(caminho, definicoes_hp, funcao_fitness=fitness_sintetica)
+    assert retomado == completo
+
+
+def test_retomar_genetico_restaura_orcamento_e_substituto(tmp_path, populacao, definicoes_hp):
+    caminho = str(tmp_path / "genetico.pkl")
+    substituto = ModeloSubstituto(definicoes_hp, min_amostras=100)
+    algoritmo_genetico(populacao, len(populacao), 2, 0.4, definicoes_hp, fitness_sintetica,
+                       caminho_checkpoint=caminho, semente=3, substituto=substituto,
+                       orcamento=Orcamento(max_avaliacoes=100))
+    estado = carregar_checkpoint(caminho)
+    assert estado["orcamento"]["avaliacoes"] == 3 * len(populacao)
+    assert len(estado["substituto"]["y"]) == len(substituto.y)
+    estado["num_geracoes"] = 4
+    salvar_checkpoint(caminho, estado)
+
+    orcamento = Orcamento(max_avaliacoes=100)
+    novo_substituto = ModeloSubstituto(definicoes_hp, min_amostras=100)
+    retomar_algoritmo_genetico(caminho, definicoes_hp, funcao_fitness=fitness_sintetica,
+                               orcamento=orcamento, substituto=novo_substituto)
+    assert orcamento.avaliacoes == 5 * len(populacao)
+    assert orcamento.tempo_decorrido() >= estado["orcamento"]["tempo"]
+    assert novo_substituto.y[:len(substituto.y)] == substituto.y
+
+
+def test_retomar_tempera_restaura_resfriamento_e_orcamento(tmp_path, individuo, definicoes_hp):
+    caminho = str(tmp_path / "tempera.pkl")
+    opcoes = {"temperatura_minima": 1e-6, "max_iter_sem_melhora_global": 100, "max_iter_por_temperatura": 4,
+              "funcao_fitness": fitness_sintetica, "semente": 5}
+    resfriamento = ResfriamentoAdaptativo(amostras_calibracao=4)
+    tempera_simulada(individuo, 1.0, 0.5, config_hiperparametros=definicoes_hp, caminho_checkpoint=caminho,
+                     resfriamento=resfriamento, orcamento=Orcamento(max_avaliacoes=20), **opcoes)
+    estado = carregar_checkpoint(caminho)
+    assert estado["resfriamento"]["temperatura_inicial"] == resfriamento.temperatura_inicial
+    assert estado["parametros"]["temperatura_inicial"] == resfriamento.temperatura_inicial
+
+    gastas = estado["orcamento"]["avaliacoes"]
+    assert gastas > 0
+
+    avaliados = []
+
+    def contar(hiperparametros, **opcoes):
+        avaliados.append(hiperparametros)
+        return fitness_sintetica(hiperparametros, **opcoes)
+
+    novo_resfriamento = ResfriamentoAdaptativo(amostras_calibracao=4)
+    orcamento = Orcamento(max_avaliacoes=40)
+    retomar_tempera_simulada(caminho, definicoes_hp, funcao_fitness=contar,
+                             resfriamento=novo_resfriamento, orcamento=orcamento)
+    assert novo_resfriamento.temperatura_inicial == resfriamento.temperatura_inicial
+    assert novo_resfriamento.reaquecimentos >= estado["resfriamento"]["reaquecimentos"]
+    # o orçamento continua das avaliações já gastas, e não de zero
+    assert orcamento.avaliacoes == 40
+    assert len(avaliados) == 40 - gastas
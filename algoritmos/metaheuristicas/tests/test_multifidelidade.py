@@ -0,0 +1,29 @@
+import pytest
+
+from algoritmogenetico import algoritmo_genetico
+from multifidelidade import Hyperband, SuccessiveHalving
+from utils import fitness_sintetica
+
+
+def otimista_em_baixa_fidelidade(hiperparametros, fidelidade=1.0, **opcoes):
+    # um RMSE parcial melhor que qualquer treino completo
+    return -1.0 if fidelidade < 1.0 else fitness_sintetica(hiperparametros, **opcoes)
+
+
+@pytest.mark.parametrize("escalonador", [SuccessiveHalving(), Hyperband()])
+def test_filhos_descartados_nao_sobrevivem(escalonador, populacao, definicoes_hp):
+    melhor = algoritmo_genetico(populacao, len(populacao), 3, 0.4, definicoes_hp, otimista_em_baixa_fidelidade,
+                                multifidelidade=escalonador, semente=4)
+    assert melhor["fitness"] >= 0.0
+
+
+def test_hyperband_divide_os_candidatos_entre_os_brackets(populacao):
+    hyperband = Hyperband()
+    candidatos = populacao * 4
+    scores, fidelidades = hyperband.avaliar(candidatos, fitness_sintetica, semente=1)
+    assert len(scores) == len(candidatos)
+    # o bracket mais agressivo começa em 1/27 e o último treina todos com fidelidade total
+    assert min(fidelidades) == pytest.approx(1 / 27)
+    assert fidelidades[-1] == 1.0
+    assert hyperband.custo_referencia == len(candidatos)
+    assert hyperband.custo_total < len(candidatos)
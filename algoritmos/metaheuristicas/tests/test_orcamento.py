@@ -0,0 +1,40 @@
+import pytest
+
+from algoritmogenetico import algoritmo_genetico, algoritmo_genetico_assincrono
+from cache_fitness import FitnessComCache
+from multifidelidade import SuccessiveHalving
+from orcamento import Orcamento
+from utils import fitness_sintetica
+
+
+def test_contar_sem_acompanhar_soma_as_avaliacoes():
+    orcamento = Orcamento(max_avaliacoes=10)
+    orcamento.acompanhar(fitness_sintetica)
+    orcamento.contar(4)
+    assert orcamento.avaliacoes_restantes() == 6
+
+
+def test_genetico_nao_conta_acertos_da_cache(populacao, definicoes_hp):
+    cache = FitnessComCache(fitness_sintetica)
+    orcamento = Orcamento()
+    algoritmo_genetico(populacao + populacao, len(populacao), 3, 0.4, definicoes_hp, cache,
+                       orcamento=orcamento, semente=2)
+    assert cache.acertos_memoria > 0
+    assert orcamento.avaliacoes == cache.estatisticas()["falhas"]
+
+
+def test_genetico_assincrono_nao_conta_acertos_da_cache(populacao, definicoes_hp):
+    cache = FitnessComCache(fitness_sintetica)
+    orcamento = Orcamento()
+    algoritmo_genetico_assincrono(populacao + populacao, len(populacao), 0.4, definicoes_hp, cache,
+                                  max_avaliacoes=12, orcamento=orcamento, semente=2)
+    assert orcamento.avaliacoes == cache.estatisticas()["falhas"]
+
+
+def test_genetico_conta_o_custo_da_multifidelidade(populacao, definicoes_hp):
+    escalonador = SuccessiveHalving()
+    orcamento = Orcamento()
+    algoritmo_genetico(populacao, len(populacao), 2, 0.4, definicoes_hp, fitness_sintetica,
+                       multifidelidade=escalonador, orcamento=orcamento, semente=2)
+    assert orcamento.avaliacoes == pytest.approx(len(populacao) + escalonador.custo_total)
+    assert orcamento.avaliacoes < 3 * len(populacao)
@@ -0,0 +1,14 @@
+import redeneural
+from redeneural import calcular_fitness_rmse
+
+
+def test_candidato_podado_nao_fica_abaixo_do_limiar(monkeypatch, individuo):
+    def treinar_uma_epoca(mlp, X_treino, y_treino, max_iter, limiar_poda, **opcoes):
+        mlp.set_params(early_stopping=False)
+        mlp.partial_fit(X_treino, y_treino)
+        return True
+
+    monkeypatch.setattr(redeneural, "treinar_incremental", treinar_uma_epoca)
+    registro = {}
+    assert calcular_fitness_rmse(individuo, limiar_poda=1e6, registro=registro) == 1e6
+    assert registro["podado"]
@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from avaliacao import submeter
+from cache_fitness import FitnessComCache
+from repositorio_pesos import RepositorioPesos
+from sementes import FluxosAleatorios, semear_fitness
+
+
+class TreinoFalso:
+    """Registra as chamadas e devolve (rmse, pesos) sem treinar."""
+
+    def __init__(self):
+        self.chamadas = []
+
+    def __call__(self, hiperparametros, pesos_iniciais=None, **opcoes):
+        self.chamadas.append((pesos_iniciais, opcoes))
+        return 1.0 + len(self.chamadas), ("pesos", len(self.chamadas))
+
+
+def test_semear_repassa_a_semente_do_fenotipo(individuo):
+    treino = TreinoFalso()
+    repositorio = semear_fitness(RepositorioPesos(treino), 5)
+    assert repositorio.semente == 5
+    repositorio(individuo)
+    assert treino.chamadas[0][1]["semente"] == FluxosAleatorios(5).semente_avaliacao(individuo)
+
+
+def test_submeter_nao_bloqueia_e_guarda_os_pesos(individuo):
+    treino = TreinoFalso()
+    repositorio = RepositorioPesos(treino)
+    with ThreadPoolExecutor(1) as executor:
+        futuro = submeter(individuo, repositorio, executor)
+        assert futuro.result() == 2.0
+    assert not repositorio.arquiteturas
+    # os pesos entram no repositório pela thread principal, na chamada seguinte
+    repositorio(dict(individuo, taxa_aprendizado=individuo["taxa_aprendizado"] * 2))
+    assert treino.chamadas[1][0] == ("pesos", 1)
+    assert repositorio.estatisticas()["aquecidos"] == 1
+
+
+def test_cache_nao_guarda_treino_aquecido_submetido(individuo):
+    treino = TreinoFalso()
+    cache = FitnessComCache(RepositorioPesos(treino))
+    with ThreadPoolExecutor(1) as executor:
+        submeter(individuo, cache, executor).result()
+        cache.estatisticas()
+        vizinho = dict(individuo, ativacao="tanh" if individuo["ativacao"] != "tanh" else "relu")
+        submeter(vizinho, cache, executor).result()
+    assert cache.estatisticas()["entradas_memoria"] == 1
@@ -0,0 +1,134 @@
+import pytest
+
+from algoritmogenetico import algoritmo_genetico
+from benchmark import FitnessCronometrada
+from broker import AvaliadorRemoto, iniciar_broker, iniciar_workers_locais
+from cache_fitness import FitnessComCache
+from instrumentacao import FitnessInstrumentada
+from repositorio_pesos import RepositorioPesos
+from sementes import FitnessSemeada, FluxosAleatorios, semear_fitness
+from temperasimulada import tempera_simulada
+from treino_lote import MotorTreinoLote
+from utils import fitness_sintetica
+from validacao_cruzada import FitnessKFold
+
+
+def test_gerador_depende_so_da_semente_e_das_chaves():
+    fluxos = FluxosAleatorios(7)
+    primeiro = fluxos.gerador(1, 2).random()
+    fluxos.gerador(1, 3).random()
+    assert fluxos.gerador(1, 2).random() == primeiro
+    assert FluxosAleatorios(7).gerador(1, 2).random() == primeiro
+    assert FluxosAleatorios(8).gerador(1, 2).random() != primeiro
+
+
+def test_semente_avaliacao_depende_do_fenotipo(individuo):
+    fluxos = FluxosAleatorios(7)
+    inativa = f"neuronios_camada_{individuo['numero_camadas'] + 1}"
+    alterado = dict(individuo, **{inativa: individuo[inativa] + 1})
+    assert fluxos.semente_avaliacao(individuo) == fluxos.semente_avaliacao(alterado)
+    assert fluxos.semente_avaliacao(individuo) != FluxosAleatorios(8).semente_avaliacao(individuo)
+
+
+def test_semear_fitness():
+    assert semear_fitness(fitness_sintetica, None) is fitness_sintetica
+    semeada = semear_fitness(fitness_sintetica, 3)
+    assert isinstance(semeada, FitnessSemeada)
+    assert semear_fitness(semeada, 3) is semeada
+    with pytest.raises(ValueError):
+        semear_fitness(semeada, 4)
+
+    cache = FitnessComCache(fitness_sintetica)
+    assert semear_fitness(cache, 3) is cache
+    assert cache.semente == 3
+
+
+def test_avaliar_lote_sem_semear_e_rejeitado():
+    class Lote:
+        def __call__(self, hiperparametros, **opcoes):
+            return 0.0
+
+        def avaliar_lote(self, individuos, executor=None, **opcoes):
+            return [0.0] * len(individuos)
+
+    with pytest.raises(ValueError):
+        semear_fitness(Lote(), 3)
+
+
+def sintetica_com_registro(hiperparametros, **opcoes):
+    return fitness_sintetica(hiperparametros, **opcoes), {}
+
+
+def sintetica_com_pesos(hiperparametros, pesos_iniciais=None, **opcoes):
+    return fitness_sintetica(hiperparametros, **opcoes), None
+
+
+@pytest.mark.parametrize("criar", [
+    lambda: FitnessComCache(fitness_sintetica),
+    lambda: FitnessInstrumentada(sintetica_com_registro),
+    lambda: RepositorioPesos(sintetica_com_pesos),
+    lambda: FitnessCronometrada(fitness_sintetica),
+    lambda: FitnessCronometrada(FitnessComCache(fitness_sintetica)),
+])
+def test_wrappers_semeados_avaliam_como_a_fitness_semeada(criar, populacao):
+    referencia = FitnessSemeada(fitness_sintetica, 3)
+    esperado = [referencia(ind) for ind in populacao]
+    fitness = semear_fitness(criar(), 3)
+    assert fitness.semente == 3
+    assert [fitness(ind) for ind in populacao[:2]] == esperado[:2]
+    assert fitness.avaliar_lote(populacao[2:]) == esperado[2:]
+    with pytest.raises(ValueError):
+        semear_fitness(fitness, 4)
+
+
+def test_wrappers_de_treino_real_aceitam_semente():
+    motor = semear_fitness(MotorTreinoLote(), 3)
+    assert motor.semente == 3
+    with pytest.raises(ValueError):
+        semear_fitness(motor, 4)
+
+    # sem `avaliar_lote`, a validação cruzada é envolvida como uma função simples
+    kfold = semear_fitness(FitnessKFold(k=2), 3)
+    assert isinstance(kfold, FitnessSemeada) and kfold.semente == 3
+
+
+def test_avaliador_remoto_semeado(populacao):
+    gerenciador = iniciar_broker(("127.0.0.1", 0))
+    try:
+        processos = iniciar_workers_locais(gerenciador.address, 1, gerenciador.chave,
+                                           funcao_fitness=fitness_sintetica, intervalo_espera=0.01)
+        avaliador = semear_fitness(AvaliadorRemoto(gerenciador.address, gerenciador.chave), 3)
+        referencia = FitnessSemeada(fitness_sintetica, 3)
+        assert avaliador.avaliar_lote(populacao) == [referencia(ind) for ind in populacao]
+        with pytest.raises(ValueError):
+            semear_fitness(avaliador, 4)
+        for processo in processos:
+            processo.terminate()
+    finally:
+        gerenciador.shutdown()
+
+
+def executar_genetico(populacao, definicoes_hp, **kwargs):
+    return algoritmo_genetico(populacao, len(populacao), 3, 0.4, definicoes_hp, semente=11, **kwargs)
+
+
+def test_genetico_igual_em_serie_com_workers_e_com_cache(populacao, definicoes_hp):
+    referencia = executar_genetico(populacao, definicoes_hp, funcao_fitness=fitness_sintetica)
+    com_workers = executar_genetico(populacao, definicoes_hp, funcao_fitness=fitness_sintetica, workers=2)
+    cache = FitnessComCache(fitness_sintetica)
+    com_cache = executar_genetico(populacao, definicoes_hp, funcao_fitness=cache, workers=2)
+    assert referencia == com_workers == com_cache
+
+
+def test_genetico_sem_semente_varia(populacao, definicoes_hp):
+    a = algoritmo_genetico(populacao, len(populacao), 2, 0.4, definicoes_hp, fitness_sintetica)
+    b = algoritmo_genetico(populacao, len(populacao), 2, 0.4, definicoes_hp, fitness_sintetica)
+    assert a["fitness"] != b["fitness"]
+
+
+def test_tempera_igual_com_lote_especulativo(individuo, definicoes_hp):
+    def executar(**kwargs):
+        return tempera_simulada(individuo, 1.0, 0.5, 0.1, definicoes_hp, max_iter_por_temperatura=8,
+                                funcao_fitness=fitness_sintetica, semente=5, **kwargs)
+
+    assert executar() == executar(lote_especulativo=4) == executar(lote_especulativo=4, workers=2)
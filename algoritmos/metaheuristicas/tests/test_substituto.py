@@ -0,0 +1,28 @@
+from substituto import ModeloSubstituto
+from utils import fitness_sintetica
+
+
+def test_reajuste_so_com_amostras_novas_suficientes(populacao, definicoes_hp):
+    substituto = ModeloSubstituto(definicoes_hp, min_amostras=1, n_estimators=5, fracao_reajuste=0.5)
+    substituto.registrar(populacao[:4], [fitness_sintetica(ind, semente=1) for ind in populacao[:4]])
+    substituto.selecionar(populacao, 2)
+    assert substituto.ajustes == 1
+
+    # uma amostra nova é menos da metade das 4 já usadas: mantém o modelo
+    substituto.registrar(populacao[4:5], [1.0])
+    substituto.selecionar(populacao, 2)
+    assert substituto.ajustes == 1
+
+    substituto.registrar(populacao[5:6], [2.0])
+    substituto.selecionar(populacao, 2)
+    assert substituto.ajustes == 2
+    assert substituto.amostras_ajustadas == 6
+
+
+def test_restaurar_reajusta_no_proximo_uso(populacao, definicoes_hp):
+    substituto = ModeloSubstituto(definicoes_hp, min_amostras=1, n_estimators=5)
+    substituto.registrar(populacao, [float(i) for i in range(len(populacao))])
+    novo = ModeloSubstituto(definicoes_hp, min_amostras=1, n_estimators=5)
+    novo.restaurar(substituto.estado())
+    assert novo.precisa_reajuste()
+    assert novo.selecionar(populacao, 4) == substituto.selecionar(populacao, 4)
@@ -0,0 +1,43 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from avaliacao import submeter
+from sementes import semear_fitness
+from treino_lote import MotorTreinoLote, treinar_grupo
+
+
+def mesma_arquitetura(populacao):
+    return [dict(individuo, numero_camadas=1, ativacao="relu") for individuo in populacao[:4]]
+
+
+def test_rmse_nao_depende_da_composicao_do_lote(populacao):
+    individuos = mesma_arquitetura(populacao)
+    motor = semear_fitness(MotorTreinoLote(), 7)
+    assert motor.semente == 7
+    em_lote = motor.avaliar_lote(individuos, fidelidade=0.05)
+    assert em_lote == [motor(individuo, fidelidade=0.05) for individuo in individuos]
+    assert em_lote != MotorTreinoLote().avaliar_lote(individuos, fidelidade=0.05)
+
+
+def test_rede_divergente_recebe_infinito(populacao):
+    individuos = [dict(individuo, taxa_aprendizado=taxa)
+                  for individuo, taxa in zip(mesma_arquitetura(populacao), (0.01, 1e300))]
+    estavel, divergente = treinar_grupo(individuos, fidelidade=0.05)
+    assert math.isfinite(estavel)
+    assert divergente == float('inf')
+
+
+def test_rede_podada_nao_fica_abaixo_do_limiar(populacao):
+    individuos = mesma_arquitetura(populacao)
+    sem_poda = treinar_grupo(individuos, fidelidade=0.1)
+    limiar = min(sem_poda) / 2
+    podados = treinar_grupo(individuos, fidelidade=0.1, limiar_poda=limiar, epocas_minimas_poda=1)
+    assert all(rmse >= limiar for rmse in podados)
+
+
+def test_submeter_usa_o_executor(populacao):
+    motor = semear_fitness(MotorTreinoLote(), 7)
+    individuo = mesma_arquitetura(populacao)[0]
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        futuro = submeter(individuo, motor, executor, fidelidade=0.05)
+        assert futuro.result() == motor(individuo, fidelidade=0.05)
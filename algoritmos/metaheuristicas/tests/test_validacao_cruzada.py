@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import validacao_cruzada
+from sementes import FitnessSemeada, FluxosAleatorios
+from validacao_cruzada import FitnessKFold, avaliar_kfold
+
+
+class MLPFalsa:
+    """Prevê uma constante, para testar a validação sem treinar redes."""
+
+    def __init__(self, constante):
+        self.constante = constante
+
+    def fit(self, X, y):
+        return self
+
+    def predict(self, X):
+        return np.full(len(X), self.constante)
+
+
+@pytest.fixture
+def sementes_usadas(monkeypatch):
+    sementes = []
+
+    def construir_mlp(hiperparametros, fidelidade=1.0, semente=42):
+        sementes.append(semente)
+        return MLPFalsa(hiperparametros["constante"])
+
+    monkeypatch.setattr(validacao_cruzada, "construir_mlp", construir_mlp)
+    return sementes
+
+
+def test_semente_chega_a_todos_os_folds(sementes_usadas):
+    avaliar_kfold({"constante": 0.0}, k=3)
+    avaliar_kfold({"constante": 0.0}, k=3, semente=9)
+    assert sementes_usadas == [42, 42, 42, 9, 9, 9]
+
+
+def test_limiar_aborta_os_folds_restantes(sementes_usadas):
+    resultado = avaliar_kfold({"constante": 1e6}, k=5, limiar=1.0, folds_minimos=2)
+    assert resultado["abortado"]
+    assert resultado["folds_concluidos"] == 2
+    assert len(sementes_usadas) == 2
+
+
+def test_sem_limiar_todos_os_folds_sao_treinados(sementes_usadas):
+    resultado = avaliar_kfold({"constante": 1e6}, k=4)
+    assert not resultado["abortado"]
+    assert resultado["folds_concluidos"] == 4
+    assert resultado["rmse"] == pytest.approx(np.mean(resultado["rmses_folds"]))
+
+
+def test_resultado_nao_depende_do_executor(sementes_usadas):
+    serial = avaliar_kfold({"constante": 0.5}, k=4)
+    with ThreadPoolExecutor(4) as executor:
+        paralelo = avaliar_kfold({"constante": 0.5}, k=4, executor=executor)
+    assert serial["rmses_folds"] == paralelo["rmses_folds"]
+
+
+def test_fitness_kfold_retorna_a_media(sementes_usadas):
+    fitness = FitnessKFold(k=3)
+    assert fitness({"constante": 0.5}) == fitness.ultimo_resultado["rmse"]
+    assert fitness.ultimo_resultado["folds_concluidos"] == 3
+
+
+def test_fitness_kfold_usa_semente_padrao_ou_do_fenotipo(sementes_usadas):
+    hp = {"constante": 0.0}
+    FitnessKFold(k=2)(hp)
+    assert sementes_usadas == [42, 42]
+
+    FitnessSemeada(FitnessKFold(k=2), 5)(hp)
+    esperada = FluxosAleatorios(5).semente_avaliacao(hp)
+    assert sementes_usadas[2:] == [esperada, esperada]
+
+
+def test_fitness_kfold_preenche_o_registro(sementes_usadas):
+    registro = {}
+    rmse = FitnessKFold(k=3)({"constante": 0.5}, registro=registro)
+    assert rmse == pytest.approx(np.mean(registro["rmses_folds"]))
+    assert len(registro["rmses_folds"]) == registro["folds_concluidos"] == 3
+    assert registro["variancia"] == pytest.approx(np.var(registro["rmses_folds"], ddof=1))
+    assert not registro["abortado"]
@@ -0,0 +1,294 @@
+from collections import defaultdict
+from concurrent.futures import Future
+
+import numpy as np
+
+from avaliacao import encadear
+from redeneural import MAX_ITER, carregar_dados_diabetes
+from repositorio_pesos import forma_camadas
+
+# Mesmos padrões do `MLPRegressor` usado em `calcular_fitness_rmse`
+TAMANHO_LOTE = 200
+ALPHA = 1e-4
+FRACAO_VALIDACAO = 0.1
+EPOCAS_SEM_MELHORA = 10
+TOLERANCIA = 1e-4  # melhora mínima do R² de validação, como o `tol` do scikit-learn
+BETA1, BETA2, EPSILON = 0.9, 0.999, 1e-8
+SEMENTE_GRUPO = 42  # como o `random_state` padrão de `calcular_fitness_rmse`
+
+
+def _ativar(z, ativacao):
+    if ativacao == "logistic":
+        return 1.0 / (1.0 + np.exp(-np.clip(z, -500, 500)))
+    if ativacao == "tanh":
+        return np.tanh(z)
+    if ativacao == "relu":
+        return np.maximum(z, 0.0)
+    return z
+
+
+def _derivada(a, ativacao):
+    # derivada em função do valor já ativado, como no scikit-learn
+    if ativacao == "logistic":
+        return a * (1.0 - a)
+    if ativacao == "tanh":
+        return 1.0 - a * a
+    if ativacao == "relu":
+        return (a > 0).astype(a.dtype)
+    return np.ones_like(a)
+
+
+class GrupoMLP:
+    """
+    G redes com as mesmas camadas e ativação, treinadas juntas.
+
+    Os pesos de cada camada são empilhados em um tensor (G, entrada, saída) e
+    todas as redes avançam com multiplicações de matrizes em lote; só a taxa de
+    aprendizado muda de uma rede para outra.
+    """
+
+    def __init__(self, individuos, num_entradas, semente=SEMENTE_GRUPO):
+        self.G = len(individuos)
+        self.ativacao = individuos[0]["ativacao"]
+        self.taxas = np.array([float(ind["taxa_aprendizado"]) for ind in individuos])
+        larguras = [num_entradas] + list(forma_camadas(individuos[0])) + [1]
+
+        # inicialização de Glorot, como no scikit-learn; com a mesma semente, redes
+        # de mesma arquitetura partem dos mesmos pesos (como com random_state=42)
+        fator = 2.0 if self.ativacao == "logistic" else 6.0
+        rng = np.random.default_rng(semente)
+        self.pesos, self.vieses = [], []
+        for entrada, saida in zip(larguras[:-1], larguras[1:]):
+            limite = np.sqrt(fator / (entrada + saida))
+            W = rng.uniform(-limite, limite, (entrada, saida))
+            b = rng.uniform(-limite, limite, saida)
+            self.pesos.append(np.repeat(W[None], self.G, axis=0))
+            self.vieses.append(np.repeat(b[None], self.G, axis=0))
+
+        self.parametros = self.pesos + self.vieses
+        self.momentos1 = [np.zeros_like(p) for p in self.parametros]
+        self.momentos2 = [np.zeros_like(p) for p in self.parametros]
+        self.passo = 0
+
+    def propagar(self, X):
+        """Retorna as ativações de todas as camadas, cada uma com forma (G, n, largura)."""
+        ativacoes = [np.broadcast_to(X, (self.G,) + X.shape)]
+        for l, (W, b) in enumerate(zip(self.pesos, self.vieses)):
+            z = np.matmul(ativacoes[-1], W) + b[:, None, :]
+            if l < len(self.pesos) - 1:
+                z = _ativar(z, self.ativacao)
+            ativacoes.append(z)
+        return ativacoes
+
+    def prever(self, X):
+        return self.propagar(X)[-1][:, :, 0]
+
+    def passo_adam(self, X, y):
+        """Um passo de Adam em um mini-lote, para todas as redes do grupo."""
+        n = len(X)
+        ativacoes = self.propagar(X)
+        delta = ativacoes[-1] - y[None, :, None]
+        gradientes_W = [None] * len(self.pesos)
+        gradientes_b = [None] * len(self.vieses)
+        for l in range(len(self.pesos) - 1, -1, -1):
+            gradientes_W[l] = (np.matmul(ativacoes[l].transpose(0, 2, 1), delta) + ALPHA * self.pesos[l]) / n
+            gradientes_b[l] = delta.mean(axis=1)
+            if l > 0:
+                delta = np.matmul(delta, self.pesos[l].transpose(0, 2, 1)) * _derivada(ativacoes[l], self.ativacao)
+
+        self.passo += 1
+        taxas = self.taxas * np.sqrt(1 - BETA2 ** self.passo) / (1 - BETA1 ** self.passo)
+        for p, g, m, v in zip(self.parametros, gradientes_W + gradientes_b, self.momentos1, self.momentos2):
+            # operações no lugar, sem temporários do tamanho dos tensores de pesos
+            m *= BETA1
+            m += (1 - BETA1) * g
+            v *= BETA2
+            g *= g
+            v += (1 - BETA2) * g
+            np.sqrt(v, out=g)
+            g += EPSILON
+            np.divide(m, g, out=g)
+            g *= taxas.reshape((-1,) + (1,) * (p.ndim - 1))
+            p -= g
+
+    def selecionar(self, selecao):
+        """Mantém só as redes de `selecao` (máscara booleana), liberando o custo das demais."""
+        self.G = int(selecao.sum())
+        self.taxas = self.taxas[selecao]
+        self.definir_parametros([p[selecao] for p in self.parametros])
+        self.momentos1 = [m[selecao] for m in self.momentos1]
+        self.momentos2 = [v[selecao] for v in self.momentos2]
+
+    def definir_parametros(self, parametros):
+        self.G = len(parametros[0])
+        self.parametros = parametros
+        self.pesos, self.vieses = parametros[:len(self.pesos)], parametros[len(self.pesos):]
+
+
+def treinar_grupo(individuos, fidelidade=1.0, limiar_poda=None, semente=SEMENTE_GRUPO,
+                  margem_poda=0.1, epocas_minimas_poda=10):
+    """
+    Treina um grupo de redes de mesma arquitetura e retorna o RMSE de teste de cada uma.
+
+    Reproduz o protocolo de `calcular_fitness_rmse`: Adam com mini-lotes de 200,
+    regularização L2 `alpha`, até `MAX_ITER * fidelidade` épocas e parada
+    antecipada por rede (R² em 10% do treino, paciência de 10 épocas),
+    restaurando os pesos da melhor época. Com `limiar_poda`, aplica a mesma
+    regra de poda de `treinar_incremental` (e o mesmo piso `limiar_poda` no
+    RMSE das redes podadas). Redes que param saem do grupo, e as demais
+    continuam sem o custo delas.
+
+    Os valores não são idênticos aos do `MLPRegressor` (sorteios diferentes),
+    mas seguem o mesmo contrato: RMSE no conjunto de teste, ou infinito se o
+    treino divergir. Uma rede cuja perda de validação deixa de ser finita sai
+    do grupo na hora, e uma rede que nunca melhorou a validação (os pesos
+    guardados ainda seriam os iniciais) também recebe infinito.
+
+    Returns:
+        list: O RMSE de cada indivíduo, na ordem recebida.
+    """
+    from sklearn.model_selection import train_test_split
+
+    X_treino, X_teste, y_treino, y_teste = carregar_dados_diabetes()
+    X_tr, X_val, y_tr, y_val = train_test_split(
+        np.asarray(X_treino), np.asarray(y_treino), test_size=FRACAO_VALIDACAO, random_state=semente
+    )
+    grupo = GrupoMLP(individuos, X_tr.shape[1], semente)
+    max_iter = max(1, int(round(MAX_ITER * fidelidade)))
+    rng = np.random.default_rng(semente)
+
+    # estado das redes ainda em treino; `indices` aponta para a posição original
+    indices = np.arange(grupo.G)
+    variancia_val = np.var(y_val)
+    melhor_r2_val = np.full(grupo.G, -np.inf)
+    melhor_rmse_val = np.full(grupo.G, np.inf)
+    sem_melhora = np.zeros(grupo.G, dtype=int)
+    melhores = [p.copy() for p in grupo.parametros]
+    atualizadas = np.zeros(grupo.G, dtype=bool)
+    divergiram = np.zeros(grupo.G, dtype=bool)
+    podadas = np.zeros(grupo.G, dtype=bool)
+
+    with np.errstate(over='ignore', invalid='ignore'):
+        for epoca in range(max_iter):
+            ordem = rng.permutation(len(X_tr))
+            for inicio in range(0, len(ordem), TAMANHO_LOTE):
+                lote = ordem[inicio:inicio + TAMANHO_LOTE]
+                grupo.passo_adam(X_tr[lote], y_tr[lote])
+
+            mse_val = np.mean((grupo.prever(X_val) - y_val[None, :]) ** 2, axis=1)
+            r2_val = 1.0 - mse_val / variancia_val
+            melhorou = r2_val > melhor_r2_val + TOLERANCIA
+            melhor_r2_val = np.where(melhorou, r2_val, melhor_r2_val)
+            melhor_rmse_val = np.where(melhorou, np.sqrt(mse_val), melhor_rmse_val)
+            sem_melhora = np.where(melhorou, 0, sem_melhora + 1)
+            for p, melhor in zip(grupo.parametros, melhores):
+                melhor[indices[melhorou]] = p[melhorou]
+            atualizadas[indices[melhorou]] = True
+
+            nao_finita = ~np.isfinite(mse_val)
+            divergiram[indices[nao_finita]] = True
+            parar = (sem_melhora >= EPOCAS_SEM_MELHORA) | nao_finita
+            if limiar_poda is not None and epoca + 1 >= epocas_minimas_poda:
+                poda = melhor_rmse_val > limiar_poda * (1 + margem_poda)
+                podadas[indices[poda & ~parar]] = True
+                parar |= poda
+            if parar.all():
+                break
+            if parar.any():
+                continuar = ~parar
+                grupo.selecionar(continuar)
+                indices = indices[continuar]
+                melhor_r2_val = melhor_r2_val[continuar]
+                melhor_rmse_val = melhor_rmse_val[continuar]
+                sem_melhora = sem_melhora[continuar]
+
+        # grupo completo, cada rede com os pesos da sua melhor época de validação
+        grupo.definir_parametros(melhores)
+        predicoes = grupo.prever(np.asarray(X_teste))
+        rmses = np.sqrt(np.mean((predicoes - np.asarray(y_teste)[None, :]) ** 2, axis=1))
+
+    validas = atualizadas & ~divergiram & np.isfinite(rmses)
+    if limiar_poda is not None:
+        # como em `calcular_fitness_rmse`: uma rede podada não volta melhor que o limiar
+        rmses = np.where(podadas, np.maximum(rmses, limiar_poda), rmses)
+    return [float(r) if valida else float('inf') for r, valida in zip(rmses, validas)]
+
+
+class MotorTreinoLote:
+    """
+    Função de fitness que treina as MLPs de um lote em NumPy, várias de uma vez.
+
+    Os candidatos são agrupados por arquitetura (camadas ocultas e ativação) e
+    cada grupo é treinado como um único conjunto de tensores (ver `GrupoMLP`).
+    Mesmo grupos de uma rede só evitam o custo fixo por modelo do scikit-learn,
+    que domina em redes pequenas no dataset de 331 linhas. Com um executor,
+    cada grupo é treinado em um processo do pool. Pode ser passada como
+    `funcao_fitness` para o Algoritmo Genético ou para a Têmpera Simulada.
+
+    As redes de um grupo não interferem umas nas outras: o RMSE de cada uma
+    depende só dos seus hiperparâmetros e da semente do grupo. Sem semente, todos
+    os grupos usam `SEMENTE_GRUPO`; com `semear(semente)`, cada arquitetura
+    recebe uma semente derivada da semente da execução
+    (`sementes.FluxosAleatorios`), qualquer que seja a composição do lote.
+    """
+
+    def __init__(self, semente=None):
+        self.semente = None
+        self.fluxos = None
+        if semente is not None:
+            self.semear(semente)
+
+    def semear(self, semente):
+        """Deriva a semente de cada grupo da semente da execução (ver `sementes.semear_fitness`)."""
+        from sementes import FluxosAleatorios
+
+        self.semente = semente
+        self.fluxos = FluxosAleatorios(semente)
+
+    def semente_grupo(self, individuo):
+        if self.fluxos is None:
+            return SEMENTE_GRUPO
+        arquitetura = {"camadas": list(forma_camadas(individuo)), "ativacao": individuo["ativacao"]}
+        return self.fluxos.semente_avaliacao(arquitetura)
+
+    def __call__(self, hiperparametros, fidelidade=1.0, limiar_poda=None, semente=None):
+        return self.avaliar_lote([hiperparametros], None, fidelidade, limiar_poda, semente)[0]
+
+    def avaliar_lote(self, individuos, executor=None, fidelidade=1.0, limiar_poda=None, semente=None):
+        """`semente`, se informada (ex: por um worker do broker), vale para todos os grupos."""
+        grupos = defaultdict(list)
+        for indice, individuo in enumerate(individuos):
+            grupos[(forma_camadas(individuo), individuo["ativacao"])].append(indice)
+
+        argumentos = [
+            ([individuos[i] for i in indices], fidelidade, limiar_poda,
+             self.semente_grupo(individuos[indices[0]]) if semente is None else semente)
+            for indices in grupos.values()
+        ]
+        if executor is None:
+            resultados = [treinar_grupo(*args) for args in argumentos]
+        else:
+            futuros = [executor.submit(treinar_grupo, *args) for args in argumentos]
+            resultados = [futuro.result() for futuro in futuros]
+
+        rmses = [None] * len(individuos)
+        for indices, valores in zip(grupos.values(), resultados):
+            for i, valor in zip(indices, valores):
+                rmses[i] = valor
+        return rmses
+
+    def submeter(self, hiperparametros, executor=None, fidelidade=1.0, limiar_poda=None, semente=None):
+        """
+        Versão assíncrona de `__call__`, usada por `avaliacao.submeter`: a rede é
+        treinada como um grupo de uma rede só em um processo do `executor`.
+        """
+        argumentos = ([hiperparametros], fidelidade, limiar_poda,
+                      self.semente_grupo(hiperparametros) if semente is None else semente)
+        if executor is None:
+            futuro = Future()
+            try:
+                futuro.set_result(treinar_grupo(*argumentos)[0])
+            except Exception as e:
+                futuro.set_exception(e)
+            return futuro
+        return encadear(executor.submit(treinar_grupo, *argumentos), lambda valores: valores[0])
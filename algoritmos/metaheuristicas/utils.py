@@ -4,20 +4,22 @@ import random
 import numpy as np
 
 ############ Funções da Têmpera Simulada ##############
-def aceita_probabilistico(score_atual, score_novo, temperatura):
+def aceita_probabilistico(score_atual, score_novo, temperatura, rng=random):
     """
     Decide se aceita uma nova solução (pior) com base na probabilidade.
     Assume score_novo >= score_atual.
     A métrica de score deve ser tal que menor é melhor (ex: perda, erro).
+    `rng` é o gerador do sorteio (o módulo `random` ou um `random.Random`).
     """
     if temperatura <= 1e-9: # para evitar divisão por zero
         return False
 
-    probabilidade = math.exp((score_atual - score_novo) / temperatura)
-    return random.random() < probabilidade
+    # limita o expoente em 0: soluções melhores teriam probabilidade > 1 (e overflow em exp)
+    probabilidade = math.exp(min(0.0, (score_atual - score_novo) / temperatura))
+    return rng.random() < probabilidade
 
 
-def avalia_rede_func(hiperparametros, X_train, y_train):
+def avalia_rede_func(hiperparametros, X_train, y_train, rng=random):
     """
     PLACEHOLDER para AvaliaRede(). Não implementada para resumo     
     """
@@ -35,15 +37,43 @@ def avalia_rede_func(hiperparametros, X_train, y_train):
         if hiperparametros['ativacao'] == 'relu': score -= 0.01 # pequena bonificação
         elif hiperparametros['ativacao'] == 'tanh': score += 0.005
     
-    score += random.uniform(-0.001, 0.001)
+    score += rng.uniform(-0.001, 0.001)
     # Garante que o score não seja negativo se a função objetivo assim o exigir
     # print(f"    [avalia_rede_placeholder] Score gerado: {max(0, score):.5f}")
     return max(0, score) # Retorna o score (menor é melhor)
 
 
-def perturba(H_atual, config_hiperparametros, temperatura_atual, temperatura_inicial):
+def fitness_sintetica(hiperparametros, **opcoes):
+    """
+    Função de fitness barata com a mesma interface de `calcular_fitness_rmse`.
+
+    Traduz o dicionário de hiperparâmetros da MLP para as chaves esperadas por
+    `avalia_rede_func` (lr, camadas, neuronios médios das camadas ativas, ativacao).
+    Opções como `fidelidade` são aceitas e ignoradas; com `semente`, o ruído
+    da avaliação vem de um gerador próprio, como o `random_state` do treino
+    real. Útil em testes rápidos e benchmarks dos otimizadores.
+    """
+    num_camadas = hiperparametros["numero_camadas"]
+    neuronios = [hiperparametros[f"neuronios_camada_{i+1}"] for i in range(num_camadas)]
+    hiperparametros_placeholder = {
+        "lr": hiperparametros["taxa_aprendizado"],
+        "camadas": num_camadas,
+        "neuronios": sum(neuronios) / len(neuronios),
+        "ativacao": hiperparametros["ativacao"],
+    }
+    semente = opcoes.get("semente")
+    rng = random if semente is None else random.Random(semente)
+    return avalia_rede_func(hiperparametros_placeholder, None, None, rng)
+
+
+def perturba(H_atual, config_hiperparametros, temperatura_atual, temperatura_inicial, rng=random):
+    # espaços condicionais (`EspacoBusca`) perturbam apenas genes ativos
+    perturbar = getattr(config_hiperparametros, "perturbar", None)
+    if perturbar is not None:
+        return perturbar(H_atual, temperatura_atual, temperatura_inicial, rng)
+
     H_novo = H_atual.copy()
-    param_para_perturbar = random.choice(list(config_hiperparametros.keys()))
+    param_para_perturbar = rng.choice(list(config_hiperparametros.keys()))
     config_param = config_hiperparametros[param_para_perturbar]
     valor_atual = H_novo[param_para_perturbar]
 
@@ -52,18 +82,18 @@ def perturba(H_atual, config_hiperparametros, temperatura_atual, temperatura_ini
     
     # Passamos o NOME do parâmetro para as funções auxiliares
     if tipo == 'float':
-        novo_valor = _perturbar_float(param_para_perturbar, valor_atual, config_param, fator_temperatura)
+        novo_valor = _perturbar_float(param_para_perturbar, valor_atual, config_param, fator_temperatura, rng)
     elif tipo == 'int':
-        novo_valor = _perturbar_int(param_para_perturbar, valor_atual, config_param, fator_temperatura)
+        novo_valor = _perturbar_int(param_para_perturbar, valor_atual, config_param, fator_temperatura, rng)
     elif tipo == 'choice':
-        novo_valor = _perturbar_choice(valor_atual, config_param)
+        novo_valor = _perturbar_choice(valor_atual, config_param, rng)
     else:
         raise ValueError(f"Tipo de hiperparâmetro desconhecido: {tipo}")
 
     H_novo[param_para_perturbar] = novo_valor
     return H_novo
 
-def _perturbar_float(param_name, valor_atual, config_param, fator_temperatura):
+def _perturbar_float(param_name, valor_atual, config_param, fator_temperatura, rng=random):
     min_val, max_val = config_param['min'], config_param['max']
 
     if param_name == 'lr':
@@ -72,12 +102,12 @@ def _perturbar_float(param_name, valor_atual, config_param, fator_temperatura):
         sigma_base = (max_val - min_val) * 0.1
 
     sigma_atual = sigma_base * fator_temperatura + 1e-9
-    perturbacao = random.gauss(0, sigma_atual)
+    perturbacao = rng.gauss(0, sigma_atual)
     novo_valor = valor_atual + perturbacao
     
     return np.clip(novo_valor, min_val, max_val)
 
-def _perturbar_int(param_name, valor_atual, config_param, fator_temperatura):
+def _perturbar_int(param_name, valor_atual, config_param, fator_temperatura, rng=random):
     min_val, max_val = config_param['min'], config_param['max']
     
     if param_name == 'camadas':
@@ -88,15 +118,15 @@ def _perturbar_int(param_name, valor_atual, config_param, fator_temperatura):
         passo_maximo = max(1, (max_val - min_val) // 10)
 
     range_atual = max(1, int(round(passo_maximo * fator_temperatura)))
-    mudanca = random.randint(-range_atual, range_atual)
+    mudanca = rng.randint(-range_atual, range_atual)
     
     if mudanca == 0 and min_val < max_val:
-        mudanca = random.choice([-1, 1])
+        mudanca = rng.choice([-1, 1])
 
     novo_valor = valor_atual + mudanca
     return int(np.clip(novo_valor, min_val, max_val))
 
-def _perturbar_choice(valor_atual, config_param):
+def _perturbar_choice(valor_atual, config_param, rng=random):
     opcoes = config_param['options']
     if len(opcoes) <= 1:
         return valor_atual
@@ -105,7 +135,7 @@ def _perturbar_choice(valor_atual, config_param):
     if not opcoes_validas:
         return valor_atual
         
-    return random.choice(opcoes_validas)
+    return rng.choice(opcoes_validas)
 
 
 ############ Funções do Algoritmo Genético ##############
@@ -116,15 +146,15 @@ def calcular_fitness(individuo, parametros, target):
     return avalia_rede_func(individuo, parametros, target)
 
 
-def selecao_torneio(populacao, tamanho_torneio=3):
+def selecao_torneio(populacao, tamanho_torneio=3, rng=random):
     """
     Seleciona um pai da população usando seleção por torneio.
     """
-    torneio = random.sample(populacao, tamanho_torneio)
+    torneio = rng.sample(populacao, tamanho_torneio)
     vencedor = min(torneio, key=lambda individuo: individuo['fitness'])
     return vencedor
 
-def cruzamento(pai1, pai2):
+def cruzamento(pai1, pai2, rng=random):
     """
     Para cada gene (hiperparâmetro), o filho herda o valor de um dos pais aleatoriamente.
     """
@@ -132,29 +162,34 @@ def cruzamento(pai1, pai2):
     # Itera sobre todos os hiperparâmetros (genes)
     for gene in pai1:
         if gene != 'fitness': # Não cruza o valor de fitness
-            if random.random() < 0.5:
+            if rng.random() < 0.5:
                 filho[gene] = pai1[gene]
             else:
                 filho[gene] = pai2[gene]
     return filho
 
-def mutacao(individuo, pm, definicoes_hiperparametros):
+def mutacao(individuo, pm, definicoes_hiperparametros, rng=random):
     """
     Para cada gene, há uma probabilidade 'pm' de que ele sofra mutação.
+    Com um `EspacoBusca`, só os genes ativos podem sofrer mutação.
     """
+    mutar = getattr(definicoes_hiperparametros, "mutar", None)
+    if mutar is not None:
+        return mutar(individuo, pm, rng)
+
     individuo_mutado = individuo.copy()
     for gene in individuo_mutado:
-        if random.random() < pm:
+        if rng.random() < pm:
             
             definicao_gene = definicoes_hiperparametros[gene]
             tipo = definicao_gene.get("type")
             
             if tipo == "int":
-                individuo_mutado[gene] = random.randint(definicao_gene["min"], definicao_gene["max"])
+                individuo_mutado[gene] = rng.randint(definicao_gene["min"], definicao_gene["max"])
             elif tipo == "float":
-                individuo_mutado[gene] = random.uniform(definicao_gene["min"], definicao_gene["max"])
+                individuo_mutado[gene] = rng.uniform(definicao_gene["min"], definicao_gene["max"])
             elif tipo == "choice":
-                individuo_mutado[gene] = random.choice(definicao_gene["options"])
+                individuo_mutado[gene] = rng.choice(definicao_gene["options"])
 
     return individuo_mutado
 
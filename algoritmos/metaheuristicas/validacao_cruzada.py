@@ -0,0 +1,153 @@
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import numpy as np
+
+from avaliacao import criar_executor
+from redeneural import carregar_dados_diabetes, construir_mlp
+
+# Semente da divisão em folds: fixa, para que todos os candidatos sejam comparados nos mesmos folds
+SEMENTE_FOLDS = 42
+
+
+def treinar_fold(hiperparametros, indice_fold, k, fidelidade=1.0, semente=42):
+    """
+    Treina a MLP nos k-1 folds restantes do conjunto de treino e retorna o RMSE
+    no fold `indice_fold`. O conjunto de teste não é usado.
+
+    `semente` é o `random_state` da MLP (inicialização dos pesos e mini-lotes);
+    a divisão em folds usa sempre `SEMENTE_FOLDS`.
+    """
+    # importados sob demanda, como em `redeneural`
+    from sklearn.metrics import mean_squared_error
+    from sklearn.model_selection import KFold
+
+    X_treino, _, y_treino, _ = carregar_dados_diabetes()
+    divisoes = KFold(n_splits=k, shuffle=True, random_state=SEMENTE_FOLDS).split(X_treino)
+    indices_ajuste, indices_validacao = next(
+        divisao for i, divisao in enumerate(divisoes) if i == indice_fold
+    )
+
+    mlp = construir_mlp(hiperparametros, fidelidade, semente)
+    mlp.fit(X_treino[indices_ajuste], y_treino[indices_ajuste])
+    predicoes = mlp.predict(X_treino[indices_validacao])
+    return float(np.sqrt(mean_squared_error(y_treino[indices_validacao], predicoes)))
+
+
+def avaliar_kfold(hiperparametros, k=5, limiar=None, executor=None, fidelidade=1.0, folds_minimos=2, semente=42):
+    """
+    Avalia os hiperparâmetros com validação cruzada k-fold no conjunto de treino.
+
+    Com `executor`, os folds treinam em paralelo. Se `limiar` for informado
+    (ex: o pior sobrevivente do AG), a avaliação é encerrada assim que a média
+    dos folds já concluídos (pelo menos `folds_minimos`) passa do limiar: o
+    candidato não teria como ser aproveitado pelo otimizador.
+
+    No modo serial os folds restantes não são treinados. Com `executor`, só os
+    folds que ainda estão na fila são cancelados; os que já estão treinando
+    terminam em segundo plano (o resultado é descartado). A economia de CPU,
+    portanto, só existe quando o executor tem menos workers que `k`.
+
+    `semente` é repassada a `treinar_fold` (a mesma em todos os folds).
+
+    Returns:
+        dict: rmse (média dos folds concluídos), rmses_folds (na ordem dos
+              folds), variancia, folds_concluidos e abortado.
+    """
+    rmses = []
+    folds = []
+    abortado = False
+
+    def deve_abortar():
+        return (limiar is not None and len(rmses) >= folds_minimos
+                and len(rmses) < k and float(np.mean(rmses)) > limiar)
+
+    try:
+        if executor is None:
+            for indice_fold in range(k):
+                rmses.append(treinar_fold(hiperparametros, indice_fold, k, fidelidade, semente))
+                folds.append(indice_fold)
+                if deve_abortar():
+                    abortado = True
+                    break
+        else:
+            indices = {
+                executor.submit(treinar_fold, hiperparametros, indice_fold, k, fidelidade, semente): indice_fold
+                for indice_fold in range(k)
+            }
+            pendentes = set(indices)
+            while pendentes:
+                concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    rmses.append(futuro.result())
+                    folds.append(indices[futuro])
+                if deve_abortar():
+                    abortado = True
+                    # `cancel` só tem efeito em folds que ainda não começaram
+                    for futuro in pendentes:
+                        futuro.cancel()
+                    break
+    except Exception as e:
+        # mesma convenção de `calcular_fitness_rmse`: erros viram RMSE infinito
+        print(f"Erro durante a avaliação: {e}")
+        return {"rmse": float('inf'), "rmses_folds": rmses, "variancia": float('nan'),
+                "folds_concluidos": len(rmses), "abortado": False}
+
+    # ordena pelo índice do fold, para que o resultado não dependa da ordem de término
+    rmses = [rmse for _, rmse in sorted(zip(folds, rmses))]
+    return {
+        "rmse": float(np.mean(rmses)),
+        "rmses_folds": rmses,
+        "variancia": float(np.var(rmses, ddof=1)) if len(rmses) > 1 else 0.0,
+        "folds_concluidos": len(rmses),
+        "abortado": abortado,
+    }
+
+
+class FitnessKFold:
+    """
+    Função de fitness baseada em validação cruzada k-fold, com a mesma interface
+    de `calcular_fitness_rmse`. O `limiar_poda` enviado pelos otimizadores (modo
+    `poda` do AG e da Têmpera) é usado para cancelar os folds restantes (os que
+    ainda não começaram, ver `avaliar_kfold`); com `workers_folds` >= `k` todos
+    os folds já estão em treino e a poda não economiza CPU.
+
+    A opção `semente` (ex: de `sementes.FitnessSemeada`) é o `random_state` das
+    MLPs dos folds. Os detalhes da avaliação (scores por fold, variância, folds
+    concluídos e se foi abortada) são gravados no dicionário `registro`, se
+    informado, como em `calcular_fitness_rmse`; o último resultado detalhado
+    também fica em `ultimo_resultado`.
+    """
+
+    def __init__(self, k=5, workers_folds=1, folds_minimos=2):
+        """
+        Args:
+            k (int): Número de folds.
+            workers_folds (int): Processos que treinam os folds de um candidato em paralelo.
+            folds_minimos (int): Folds concluídos antes que a média possa abortar o resto.
+        """
+        self.k = k
+        self.workers_folds = workers_folds
+        self.folds_minimos = folds_minimos
+        self.executor = None
+        self.ultimo_resultado = None
+
+    def __call__(self, hiperparametros, limiar_poda=None, fidelidade=1.0, semente=42, registro=None):
+        if self.executor is None and self.workers_folds > 1:
+            self.executor = criar_executor(self.workers_folds)
+        self.ultimo_resultado = avaliar_kfold(
+            hiperparametros, self.k, limiar_poda, self.executor, fidelidade, self.folds_minimos, semente
+        )
+        if registro is not None:
+            registro.update({chave: valor for chave, valor in self.ultimo_resultado.items() if chave != "rmse"})
+        return self.ultimo_resultado["rmse"]
+
+    def __getstate__(self):
+        # o pool não é serializável; cada processo cria o seu se precisar
+        estado = self.__dict__.copy()
+        estado["executor"] = None
+        return estado
+
+    def fechar(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None